@@ -4,12 +4,19 @@ from fastapi import APIRouter, FastAPI
 
 from app.core.config import settings
 
-from . import auth, v1
+from . import async_auth, auth, metrics, v1
 
 log = logging.getLogger('uvicorn')
 router = APIRouter(prefix=settings.API_PREFIX)
 router.include_router(auth.router)
 router.include_router(v1.router)
+router.include_router(metrics.router)
+
+async_router = APIRouter(prefix=settings.API_PREFIX)
+async_router.include_router(async_auth.router)
+
+if settings.ASYNC_DATABASE_ENABLED:
+    v1.override_routes(router, async_router)
 
 
 def register_api(app: FastAPI) -> None:
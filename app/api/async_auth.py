@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app import schemas
+from app.core.timing import TimedRoute
+from app.services import (
+    AsyncAuthenticationService,
+    AsyncRefreshTokenService,
+    TokenService,
+)
+
+router = APIRouter(
+    prefix='/auth', tags=['Authentication'], route_class=TimedRoute
+)
+
+
+@router.post(
+    '/token',
+    response_model=schemas.Token,
+    summary='Generate access token',
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if user is inactive'
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            'description': 'Too many login attempts for the user or client'
+        },
+    },
+)
+async def login_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    auth_service: AsyncAuthenticationService = Depends(),
+    token_service: TokenService = Depends(),
+    refresh_token_service: AsyncRefreshTokenService = Depends(),
+):
+    client_host = request.client.host if request.client else None
+    user = await auth_service.authenticate(
+        form_data.username, form_data.password, client_host
+    )
+    claims = token_service.user_claims(user)
+    refresh_token = await refresh_token_service.issue(user)
+    return {
+        'access_token': token_service.generate_access_token(claims),
+        'refresh_token': refresh_token,
+        'token_type': 'bearer',
+    }
+
+
+@router.post(
+    '/refresh',
+    response_model=schemas.Token,
+    summary='Exchange a refresh token for new access and refresh tokens',
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            'description': 'Invalid, expired or already used refresh token'
+        },
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if user is inactive'
+        },
+    },
+)
+async def refresh_access_token(
+    payload: schemas.RefreshTokenIn,
+    token_service: TokenService = Depends(),
+    refresh_token_service: AsyncRefreshTokenService = Depends(),
+):
+    user, refresh_token = await refresh_token_service.rotate(
+        payload.refresh_token
+    )
+    claims = token_service.user_claims(user)
+    return {
+        'access_token': token_service.generate_access_token(claims),
+        'refresh_token': refresh_token,
+        'token_type': 'bearer',
+    }
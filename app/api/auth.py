@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import schemas
-from app.services import AuthenticationService, TokenService
+from app.core.timing import TimedRoute
+from app.services import (
+    AuthenticationService,
+    RefreshTokenService,
+    TokenService,
+)
 
-router = APIRouter(prefix='/auth', tags=['Authentication'])
+router = APIRouter(
+    prefix='/auth', tags=['Authentication'], route_class=TimedRoute
+)
 
 
 @router.post(
@@ -16,16 +24,53 @@ router = APIRouter(prefix='/auth', tags=['Authentication'])
         status.HTTP_403_FORBIDDEN: {
             'description': 'Permission denied if user is inactive'
         },
+        status.HTTP_429_TOO_MANY_REQUESTS: {
+            'description': 'Too many login attempts for the user or client'
+        },
     },
 )
-def login_access_token(
+async def login_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     auth_service: AuthenticationService = Depends(),
     token_service: TokenService = Depends(),
+    refresh_token_service: RefreshTokenService = Depends(),
+):
+    client_host = request.client.host if request.client else None
+    user = await auth_service.authenticate(
+        form_data.username, form_data.password, client_host
+    )
+    claims = token_service.user_claims(user)
+    refresh_token = await run_in_threadpool(refresh_token_service.issue, user)
+    return {
+        'access_token': token_service.generate_access_token(claims),
+        'refresh_token': refresh_token,
+        'token_type': 'bearer',
+    }
+
+
+@router.post(
+    '/refresh',
+    response_model=schemas.Token,
+    summary='Exchange a refresh token for new access and refresh tokens',
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            'description': 'Invalid, expired or already used refresh token'
+        },
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if user is inactive'
+        },
+    },
+)
+def refresh_access_token(
+    payload: schemas.RefreshTokenIn,
+    token_service: TokenService = Depends(),
+    refresh_token_service: RefreshTokenService = Depends(),
 ):
-    user = auth_service.authenticate(form_data.username, form_data.password)
-    claims = {'sub': user.email}
+    user, refresh_token = refresh_token_service.rotate(payload.refresh_token)
+    claims = token_service.user_claims(user)
     return {
         'access_token': token_service.generate_access_token(claims),
+        'refresh_token': refresh_token,
         'token_type': 'bearer',
     }
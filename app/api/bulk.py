@@ -0,0 +1,45 @@
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+
+from fastapi import Response, status
+from pydantic import ValidationError
+
+from app import models, schemas
+
+BulkResults = List[Dict[str, Any]]
+ValidItems = List[Tuple[int, schemas.ProjectIn]]
+
+
+def validate_bulk_payload(
+    payload: List[Dict[str, Any]]
+) -> Tuple[BulkResults, ValidItems]:
+    # items are validated one by one, so a bad item fails alone
+    results: BulkResults = []
+    valid: ValidItems = []
+    for index, item in enumerate(payload):
+        try:
+            valid.append((index, schemas.ProjectIn.parse_obj(item)))
+        except ValidationError as exc:
+            results.append(
+                {
+                    'index': index,
+                    'status': status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    'errors': exc.errors(),
+                }
+            )
+    return results, valid
+
+
+def bulk_results(
+    results: BulkResults,
+    valid: ValidItems,
+    projects: List[models.Project],
+    response: Response,
+) -> BulkResults:
+    if results:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    results = results + [
+        {'index': index, 'status': status.HTTP_201_CREATED, 'project': project}
+        for (index, _), project in zip(valid, projects)
+    ]
+    return sorted(results, key=itemgetter('index'))
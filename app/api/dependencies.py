@@ -1,24 +1,50 @@
-from fastapi import Depends
+from typing import Union
+
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
+from app.core.security import is_api_key
+from app.core.timing import timed
 from app.exceptions import PermissionDeniedError
 from app.models import User
-from app.services import TokenService, UserService
+from app.services import (
+    ApiKeyService,
+    AsyncApiKeyService,
+    AsyncUserService,
+    TokenService,
+    UserService,
+)
+from app.services.token import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f'{settings.API_PREFIX}/auth/token'
 )
 
 
+def _is_stateless(token_service: TokenService, claims: dict) -> bool:
+    # tokens issued before the mode was enabled still go to the database
+    return token_service.settings.STATELESS_AUTH_ENABLED and 'ver' in claims
+
+
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     user_service: UserService = Depends(),
     token_service: TokenService = Depends(),
-):
-    claims = token_service.decode_access_token(token)
-    user_email = claims.get('sub', '')
-    return user_service.get_by_email(user_email)
+    api_key_service: ApiKeyService = Depends(),
+) -> Union[User, Principal]:
+    with timed('auth'):
+        # API keys go in the same header, so machine clients skip /auth/token
+        request.state.api_key = is_api_key(token)
+        if request.state.api_key:
+            return api_key_service.authenticate(token)
+        claims = token_service.decode_access_token(token)
+        if _is_stateless(token_service, claims):
+            principal = Principal.from_claims(claims)
+            return user_service.check_token_principal(principal)
+        user_email = claims.get('sub', '')
+        return user_service.get_principal(user_email)
 
 
 def get_current_superuser(
@@ -27,3 +53,65 @@ def get_current_superuser(
     if not current_user.is_superuser:
         raise PermissionDeniedError()
     return current_user
+
+
+def reject_api_key(
+    request: Request,
+    current_user: Union[User, Principal] = Depends(get_current_user),
+) -> None:
+    # a leaked key must not be able to mint more keys or take the account
+    if request.state.api_key:
+        raise PermissionDeniedError('API keys cannot manage the account.')
+
+
+def get_current_user_record(
+    current_user: Union[User, Principal] = Depends(get_current_user),
+    user_service: UserService = Depends(),
+) -> User:
+    if isinstance(current_user, Principal):
+        return user_service.get_principal(current_user.email)
+    return current_user
+
+
+async def get_current_user_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    user_service: AsyncUserService = Depends(),
+    token_service: TokenService = Depends(),
+    api_key_service: AsyncApiKeyService = Depends(),
+) -> Union[User, Principal]:
+    with timed('auth'):
+        request.state.api_key = is_api_key(token)
+        if request.state.api_key:
+            return await api_key_service.authenticate(token)
+        claims = token_service.decode_access_token(token)
+        if _is_stateless(token_service, claims):
+            principal = Principal.from_claims(claims)
+            return await user_service.check_token_principal(principal)
+        user_email = claims.get('sub', '')
+        return await user_service.get_principal(user_email)
+
+
+async def get_current_superuser_async(
+    current_user: User = Depends(get_current_user_async),
+):
+    if not current_user.is_superuser:
+        raise PermissionDeniedError()
+    return current_user
+
+
+async def reject_api_key_async(
+    request: Request,
+    current_user: Union[User, Principal] = Depends(get_current_user_async),
+) -> None:
+    if request.state.api_key:
+        raise PermissionDeniedError('API keys cannot manage the account.')
+
+
+async def get_current_user_record_async(
+    current_user: Union[User, Principal] = Depends(get_current_user_async),
+    user_service: AsyncUserService = Depends(),
+) -> User:
+    if isinstance(current_user, Principal):
+        return await user_service.get_principal(current_user.email)
+    return current_user
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import Query
+
+from app import models, schemas
+from app.exceptions import InvalidFieldsError
+
+PROJECT_FIELDS = ('id', 'title', 'description', 'url', 'owner_id')
+
+
+def get_project_fields(
+    fields: Optional[str] = Query(
+        None,
+        description=f'Comma separated subset of {", ".join(PROJECT_FIELDS)}',
+    ),
+    expand: Optional[Literal['owner']] = Query(
+        None, description='Embed the owner in a sparse response'
+    ),
+) -> Optional[List[str]]:
+    if fields is None:
+        if expand is not None:
+            # full responses always embed the owner
+            raise InvalidFieldsError('expand requires fields.')
+        return None
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    if not selected:
+        raise InvalidFieldsError()
+    unknown = set(selected) - set(PROJECT_FIELDS)
+    if unknown:
+        raise InvalidFieldsError(
+            f'Unknown fields: {", ".join(sorted(unknown))}.'
+        )
+    if expand == 'owner':
+        selected.append('owner')
+    return selected
+
+
+def project_fields_serializer(fields: List[str]) -> schemas.Serializer:
+    columns = [field for field in fields if field != 'owner']
+    expand_owner = 'owner' in fields
+
+    def serialize(project: models.Project) -> Dict[str, Any]:
+        content = {field: getattr(project, field) for field in columns}
+        if expand_owner:
+            content['owner'] = schemas.serialize_user_out(project.owner)
+        return content
+
+    return serialize
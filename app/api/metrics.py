@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, status
+
+from app.core.config import settings
+from app.core.security import password_hasher
+from app.core.timing import TimedRoute
+from app.database import engine, get_async_engine, get_pool_stats
+from app.services.authentication import login_rate_limiter
+from app.services.project import (
+    project_cache,
+    project_list_cache,
+    project_owner_cache,
+)
+from app.services.token import token_cache
+from app.services.user import principal_cache
+
+from .dependencies import get_current_superuser
+
+router = APIRouter(prefix='/metrics', tags=['Metrics'], route_class=TimedRoute)
+
+
+@router.get(
+    '/',
+    summary='Retrieve runtime metrics',
+    dependencies=[Depends(get_current_superuser)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': (
+                'Permission denied if current user is not a superuser'
+            )
+        },
+    },
+)
+def retrieve():
+    metrics = {
+        'database_pool': get_pool_stats(engine),
+        'principal_cache': principal_cache.stats(),
+        'project_cache': {
+            'items': project_cache.stats(),
+            'lists': project_list_cache.stats(),
+            'owners': project_owner_cache.stats(),
+        },
+        'token_cache': token_cache.stats(),
+        'password_hasher': password_hasher.stats(),
+        'login_rate_limiter': login_rate_limiter.stats(),
+    }
+    if settings.ASYNC_DATABASE_ENABLED:
+        metrics['async_database_pool'] = get_pool_stats(
+            get_async_engine().sync_engine
+        )
+    return metrics
@@ -0,0 +1,44 @@
+from typing import Any, Iterable, Optional
+
+from fastapi import Response, status
+
+from app.core.etag import compute_etag, etag_matches
+from app.core.responses import DefaultJSONResponse
+from app.core.timing import timed_serialization
+from app.schemas import Serializer
+
+
+def _json_response(content: Any, response: Response) -> Response:
+    json_response = DefaultJSONResponse(content)
+    # what fastapi does with the sub-response: raw headers keep repeated
+    # names such as Set-Cookie, which a dict would collapse into one
+    json_response.raw_headers.extend(response.raw_headers)
+    return json_response
+
+
+def serialize_all(
+    objs: Iterable[Any], serializer: Serializer, response: Response
+) -> Response:
+    # skips response_model validation, so only for trusted ORM output
+    with timed_serialization():
+        return _json_response([serializer(obj) for obj in objs], response)
+
+
+def serialize_conditional(
+    obj: Any,
+    serializer: Serializer,
+    response: Response,
+    if_none_match: Optional[str],
+) -> Response:
+    with timed_serialization():
+        # the tag hashes what the client sees, so private columns never leak
+        # into it and unrendered changes do not invalidate it
+        content = serializer(obj)
+        etag = compute_etag(content)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={'ETag': etag},
+            )
+        response.headers['ETag'] = etag
+        return _json_response(content, response)
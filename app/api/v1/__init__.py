@@ -1,9 +1,30 @@
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
 
 from app.core.config import settings
 
-from . import projects, users
+from . import async_projects, async_users, projects, users
+
+
+def override_routes(router: APIRouter, overrides: APIRouter) -> None:
+    replacements = {
+        (route.path, frozenset(route.methods)): route
+        for route in overrides.routes
+        if isinstance(route, APIRoute)
+    }
+    for index, route in enumerate(router.routes):
+        if isinstance(route, APIRoute):
+            key = (route.path, frozenset(route.methods))
+            router.routes[index] = replacements.get(key, route)
+
 
 router = APIRouter(prefix=settings.API_V1_PREFIX)
 router.include_router(users.router)
 router.include_router(projects.router)
+
+async_router = APIRouter(prefix=settings.API_V1_PREFIX)
+async_router.include_router(async_users.router)
+async_router.include_router(async_projects.router)
+
+if settings.ASYNC_DATABASE_ENABLED:
+    override_routes(router, async_router)
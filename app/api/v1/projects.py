@@ -1,14 +1,25 @@
-from typing import List
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from pydantic import conlist
 
 from app import models, schemas
+from app.core.config import settings
+from app.core.export import encode_rows, get_media_type
+from app.core.pagination import decode_cursor, next_cursor
+from app.core.responses import GZipStreamingResponse
+from app.core.timing import TimedRoute
 from app.exceptions import PermissionDeniedError
 from app.services import ProjectService
 
+from ..bulk import bulk_results, validate_bulk_payload
 from ..dependencies import get_current_user
+from ..fields import get_project_fields, project_fields_serializer
+from ..responses import serialize_all, serialize_conditional
 
-router = APIRouter(prefix='/projects', tags=['Projects'])
+router = APIRouter(
+    prefix='/projects', tags=['Projects'], route_class=TimedRoute
+)
 
 
 @router.post(
@@ -28,21 +39,143 @@ def create(
     return project_service.create(payload, owner_id=current_user.id)
 
 
+@router.post(
+    '/bulk',
+    status_code=status.HTTP_201_CREATED,
+    response_model=List[schemas.ProjectBulkResult],
+    summary='Create many projects at once',
+    responses={
+        status.HTTP_207_MULTI_STATUS: {
+            'description': 'Some projects were invalid and not created'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+    },
+)
+def create_many(
+    response: Response,
+    payload: conlist(  # type: ignore
+        Dict[str, Any],
+        min_items=1,
+        max_items=settings.PROJECTS_BULK_MAX_SIZE,
+    ),
+    project_service: ProjectService = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    results, valid = validate_bulk_payload(payload)
+    projects = project_service.create_many(
+        [project_in for _, project_in in valid], owner_id=current_user.id
+    )
+    return bulk_results(results, valid, projects, response)
+
+
 @router.get(
     '/',
     response_model=List[schemas.ProjectOut],
     summary=('List all projects'),
     responses={
-        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'}
+        status.HTTP_400_BAD_REQUEST: {
+            'description': 'Invalid pagination cursor or fields'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
     },
     dependencies=[Depends(get_current_user)],
 )
 def list_all(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    order_by: Literal['id', 'title'] = 'id',
+    include_total: bool = False,
+    fields: Optional[List[str]] = Depends(get_project_fields),
     project_service: ProjectService = Depends(),
 ):
-    return project_service.list(skip, limit)
+    after = decode_cursor(cursor, order_by) if cursor else None
+    projects = project_service.list(skip, limit, order_by, after, fields)
+    next_page = next_cursor(projects, limit, order_by)
+    if next_page:
+        response.headers['X-Next-Cursor'] = next_page
+    if include_total:
+        response.headers['X-Total-Count'] = str(project_service.count())
+    if fields is not None:
+        serializer = project_fields_serializer(fields)
+    else:
+        serializer = schemas.serialize_project_out
+    return serialize_all(projects, serializer, response)
+
+
+@router.head(
+    '/',
+    summary='Count all projects',
+    dependencies=[Depends(get_current_user)],
+    responses={
+        status.HTTP_200_OK: {
+            'description': 'The total is sent in the X-Total-Count header'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+    },
+)
+def count_all(project_service: ProjectService = Depends()):
+    total = project_service.count()
+    return Response(headers={'X-Total-Count': str(total)})
+
+
+@router.get(
+    '/search',
+    response_model=List[schemas.ProjectOut],
+    summary='Search projects by title and description',
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            'description': 'Invalid pagination cursor or fields'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+    },
+    dependencies=[Depends(get_current_user)],
+)
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(get_project_fields),
+    project_service: ProjectService = Depends(),
+):
+    after = decode_cursor(cursor, 'rank') if cursor else None
+    projects = project_service.search(q, limit, after, fields)
+    next_page = next_cursor(projects, limit, 'rank')
+    if next_page:
+        response.headers['X-Next-Cursor'] = next_page
+    if fields is not None:
+        serializer = project_fields_serializer(fields)
+    else:
+        serializer = schemas.serialize_project_out
+    return serialize_all(projects, serializer, response)
+
+
+@router.get(
+    '/export',
+    response_class=GZipStreamingResponse,
+    summary='Export all projects',
+    responses={
+        status.HTTP_200_OK: {
+            'content': {'application/x-ndjson': {}, 'text/csv': {}}
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+    },
+    dependencies=[Depends(get_current_user)],
+)
+def export(
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    project_service: ProjectService = Depends(),
+):
+    rows = project_service.export(settings.PROJECTS_EXPORT_BATCH_SIZE)
+    return GZipStreamingResponse(
+        encode_rows(rows, format),
+        media_type=get_media_type(format),
+        headers={
+            'Content-Disposition': f'attachment; filename=projects.{format}'
+        },
+    )
 
 
 @router.get(
@@ -50,6 +183,10 @@ def list_all(
     response_model=schemas.ProjectOut,
     summary='Retrieve a project',
     responses={
+        status.HTTP_400_BAD_REQUEST: {'description': 'Invalid fields'},
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': 'Not modified since the given ETag'
+        },
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
         status.HTTP_404_NOT_FOUND: {'description': 'Not found'},
     },
@@ -57,9 +194,17 @@ def list_all(
 )
 def retrieve(
     id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[List[str]] = Depends(get_project_fields),
     project_service: ProjectService = Depends(),
 ):
-    return project_service.get_by_id(id)
+    project = project_service.get_by_id(id, fields)
+    if fields is None:
+        serializer = schemas.serialize_project_out
+    else:
+        serializer = project_fields_serializer(fields)
+    return serialize_conditional(project, serializer, response, if_none_match)
 
 
 @router.put(
@@ -83,7 +228,7 @@ def update(
     project_service: ProjectService = Depends(),
     current_user: models.User = Depends(get_current_user),
 ):
-    project = project_service.get_by_id(id)
+    project = project_service.get_by_id(id, cached=False)
     if not current_user.is_superuser and project.owner_id != current_user.id:
         raise PermissionDeniedError()
     return project_service.update(project, payload)
@@ -109,7 +254,7 @@ def delete(
     project_service: ProjectService = Depends(),
     current_user: models.User = Depends(get_current_user),
 ):
-    project = project_service.get_by_id(id)
+    project = project_service.get_by_id(id, cached=False)
     if not current_user.is_superuser and project.owner_id != current_user.id:
         raise PermissionDeniedError()
     project_service.delete(project)
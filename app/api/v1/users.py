@@ -1,13 +1,30 @@
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.concurrency import run_in_threadpool
 
 from app import models, schemas
-from app.services import UserService
+from app.core.pagination import decode_cursor, next_cursor
+from app.core.security import hash_password_async
+from app.core.timing import TimedRoute
+from app.services import ApiKeyService, ProjectService, UserService
 
-from ..dependencies import get_current_superuser, get_current_user
+from ..dependencies import (
+    get_current_superuser,
+    get_current_user,
+    get_current_user_record,
+    reject_api_key,
+)
+from ..responses import serialize_all, serialize_conditional
+
+router = APIRouter(prefix='/users', tags=['Users'], route_class=TimedRoute)
 
-router = APIRouter(prefix='/users', tags=['Users'])
+
+async def _hash_payload_password(payload: schemas.UserBase) -> Optional[str]:
+    password = getattr(payload, 'password', None)
+    if password is None:
+        return None
+    return await hash_password_async(password)
 
 
 @router.post(
@@ -16,10 +33,15 @@ router = APIRouter(prefix='/users', tags=['Users'])
     response_model=schemas.UserOut,
     summary='Register a new user',
 )
-def register(
+async def register(
     payload: schemas.UserCreate, user_service: UserService = Depends()
 ):
-    return user_service.create(payload)
+    # hashed before the transaction starts, so no connection waits on it;
+    # a taken email costs one wasted hash
+    hashed_password = await hash_password_async(payload.password)
+    return await run_in_threadpool(
+        user_service.create, payload, hashed_password
+    )
 
 
 @router.get(
@@ -28,6 +50,9 @@ def register(
     summary='List all users',
     dependencies=[Depends(get_current_superuser)],
     responses={
+        status.HTTP_400_BAD_REQUEST: {
+            'description': 'Invalid pagination cursor'
+        },
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
         status.HTTP_403_FORBIDDEN: {
             'description': (
@@ -37,11 +62,43 @@ def register(
     },
 )
 def list_all(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    order_by: Literal['id', 'email'] = 'id',
+    include_total: bool = False,
     user_service: UserService = Depends(),
 ):
-    return user_service.list(skip, limit)
+    after = decode_cursor(cursor, order_by) if cursor else None
+    users = user_service.list(skip, limit, order_by, after)
+    next_page = next_cursor(users, limit, order_by)
+    if next_page:
+        response.headers['X-Next-Cursor'] = next_page
+    if include_total:
+        response.headers['X-Total-Count'] = str(user_service.count())
+    return serialize_all(users, schemas.serialize_user_out, response)
+
+
+@router.head(
+    '/',
+    summary='Count all users',
+    dependencies=[Depends(get_current_superuser)],
+    responses={
+        status.HTTP_200_OK: {
+            'description': 'The total is sent in the X-Total-Count header'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': (
+                'Permission denied if current user is not a superuser'
+            )
+        },
+    },
+)
+def count_all(user_service: UserService = Depends()):
+    total = user_service.count()
+    return Response(headers={'X-Total-Count': str(total)})
 
 
 @router.get(
@@ -49,53 +106,167 @@ def list_all(
     response_model=schemas.UserOut,
     summary='Retrieve current logged user',
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': 'Not modified since the given ETag'
+        },
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
     },
 )
 def retrieve_logged(
-    current_user: models.User = Depends(get_current_user),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(get_current_user_record),
 ):
-    return current_user
+    return serialize_conditional(
+        current_user, schemas.serialize_user_out, response, if_none_match
+    )
 
 
 @router.put(
     '/me',
     response_model=schemas.UserOut,
     summary='Update current logged user',
+    dependencies=[Depends(reject_api_key)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if authenticated with an API key'
+        },
     },
 )
-def update_logged(
+async def update_logged(
     payload: schemas.UserUpdate,
     user_service: UserService = Depends(),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_current_user_record),
 ):
-    return user_service.update(current_user, payload)
+    hashed_password = await _hash_payload_password(payload)
+    return await run_in_threadpool(
+        user_service.update, current_user, payload, hashed_password
+    )
 
 
 @router.delete(
     '/me',
     status_code=status.HTTP_204_NO_CONTENT,
     summary='Delete current logged user',
+    dependencies=[Depends(reject_api_key)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if authenticated with an API key'
+        },
     },
 )
 def delete_logged(
     user_service: UserService = Depends(),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_current_user_record),
 ):
     user_service.delete(current_user)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@router.post(
+    '/me/api-keys',
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.ApiKeyCreated,
+    summary='Create an API key for the current logged user',
+    dependencies=[Depends(reject_api_key)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if authenticated with an API key'
+        },
+    },
+)
+def create_logged_api_key(
+    payload: schemas.ApiKeyIn,
+    api_key_service: ApiKeyService = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    # the key is only ever returned here, the database keeps its digest
+    api_key, key = api_key_service.create(payload, current_user)
+    return {**schemas.ApiKeyOut.from_orm(api_key).dict(), 'key': key}
+
+
+@router.get(
+    '/me/api-keys',
+    response_model=List[schemas.ApiKeyOut],
+    summary='List the API keys of the current logged user',
+    dependencies=[Depends(reject_api_key)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if authenticated with an API key'
+        },
+    },
+)
+def list_logged_api_keys(
+    api_key_service: ApiKeyService = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    return api_key_service.list(current_user)
+
+
+@router.delete(
+    '/me/api-keys/{id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Revoke an API key of the current logged user',
+    dependencies=[Depends(reject_api_key)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': 'Permission denied if authenticated with an API key'
+        },
+        status.HTTP_404_NOT_FOUND: {'description': 'API key not found'},
+    },
+)
+def revoke_logged_api_key(
+    id: int,
+    api_key_service: ApiKeyService = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    api_key_service.revoke(id, current_user)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    '/me/projects',
+    response_model=List[schemas.ProjectOut],
+    summary='List the projects of the current logged user',
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            'description': 'Invalid pagination cursor'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+    },
+)
+def list_logged_projects(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    project_service: ProjectService = Depends(),
+    current_user: models.User = Depends(get_current_user),
+):
+    after = decode_cursor(cursor, 'id') if cursor else None
+    projects = project_service.filter_by_owner(
+        skip, limit, owner_id=current_user.id, after=after
+    )
+    next_page = next_cursor(projects, limit, 'id')
+    if next_page:
+        response.headers['X-Next-Cursor'] = next_page
+    return serialize_all(projects, schemas.serialize_project_out, response)
+
+
 @router.get(
     '/{id}',
     response_model=schemas.UserOut,
     summary='Retrieve an user',
     dependencies=[Depends(get_current_superuser)],
     responses={
+        status.HTTP_304_NOT_MODIFIED: {
+            'description': 'Not modified since the given ETag'
+        },
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
         status.HTTP_403_FORBIDDEN: {
             'description': (
@@ -107,44 +278,54 @@ def delete_logged(
 )
 def retrieve(
     id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     user_service: UserService = Depends(),
 ):
-    return user_service.get_by_id(id)
+    user = user_service.get_by_id(id)
+    return serialize_conditional(
+        user, schemas.serialize_user_out, response, if_none_match
+    )
 
 
 @router.put(
     '/{id}',
     response_model=schemas.UserOut,
     summary='Update an user',
-    dependencies=[Depends(get_current_superuser)],
+    dependencies=[Depends(get_current_superuser), Depends(reject_api_key)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
         status.HTTP_403_FORBIDDEN: {
             'description': (
-                'Permission denied if current user is not a superuser'
+                'Permission denied if current user is not a superuser '
+                'or is authenticated with an API key'
             )
         },
         status.HTTP_404_NOT_FOUND: {'description': 'Not found'},
     },
 )
-def update(
+async def update(
     id: int,
     payload: schemas.SuperuserUpdate,
     user_service: UserService = Depends(),
 ):
-    return user_service.update_by_id(id, payload)
+    hashed_password = await _hash_payload_password(payload)
+    return await run_in_threadpool(
+        user_service.update_by_id, id, payload, hashed_password
+    )
 
 
 @router.delete(
     '/{id}',
     status_code=status.HTTP_204_NO_CONTENT,
     summary='Delete an user',
-    dependencies=[Depends(get_current_superuser)],
+    dependencies=[Depends(get_current_superuser), Depends(reject_api_key)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
         status.HTTP_403_FORBIDDEN: {
             'description': (
-                'Permission denied if current user is not a superuser'
+                'Permission denied if current user is not a superuser '
+                'or is authenticated with an API key'
             )
         },
         status.HTTP_404_NOT_FOUND: {'description': 'Not found'},
@@ -156,3 +337,41 @@ def delete(
 ):
     user_service.delete_by_id(id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    '/{id}/projects',
+    response_model=List[schemas.ProjectOut],
+    summary='List the projects of an user',
+    dependencies=[Depends(get_current_superuser)],
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            'description': 'Invalid pagination cursor'
+        },
+        status.HTTP_401_UNAUTHORIZED: {'description': 'Not authenticated'},
+        status.HTTP_403_FORBIDDEN: {
+            'description': (
+                'Permission denied if current user is not a superuser'
+            )
+        },
+        status.HTTP_404_NOT_FOUND: {'description': 'Not found'},
+    },
+)
+def list_projects(
+    id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    user_service: UserService = Depends(),
+    project_service: ProjectService = Depends(),
+):
+    after = decode_cursor(cursor, 'id') if cursor else None
+    user = user_service.get_by_id(id)
+    projects = project_service.filter_by_owner(
+        skip, limit, owner_id=user.id, after=after
+    )
+    next_page = next_cursor(projects, limit, 'id')
+    if next_page:
+        response.headers['X-Next-Cursor'] = next_page
+    return serialize_all(projects, schemas.serialize_project_out, response)
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import typer
+
+from app.core.config import settings
+from app.database import generate_db_session
+from app.repositories import ApiKeyRepository, RefreshTokenRepository
+from app.services import ApiKeyService, RefreshTokenService
+
+app = typer.Typer()
+
+
+def get_token_services():  # pragma: no cover
+    db = next(generate_db_session())
+    return (
+        RefreshTokenService(RefreshTokenRepository(db), settings),
+        ApiKeyService(ApiKeyRepository(db)),
+    )
+
+
+@app.command('purge')
+def purge_tokens() -> None:
+    refresh_token_service, api_key_service = get_token_services()
+    revoked_before = datetime.utcnow() - timedelta(
+        days=settings.REVOKED_CREDENTIALS_RETENTION_DAYS
+    )
+    refresh_tokens = refresh_token_service.purge(revoked_before)
+    api_keys = api_key_service.purge(revoked_before)
+    message = typer.style(
+        f'Purged {refresh_tokens} refresh tokens and {api_keys} API keys.',
+        fg=typer.colors.GREEN,
+        bold=True,
+    )
+    typer.echo(message)
@@ -4,7 +4,7 @@ from pydantic import ValidationError
 from app.core.config import settings
 from app.database import generate_db_session
 from app.exceptions import EmailAlreadyRegistredError, NotFoundError
-from app.repositories import UserRepository
+from app.repositories import ApiKeyRepository, UserRepository
 from app.schemas import SuperuserCreate
 from app.services import UserService
 
@@ -14,7 +14,7 @@ app = typer.Typer()
 def get_user_service():  # pragma: no cover
     db = next(generate_db_session())
     user_repository = UserRepository(db)
-    return UserService(user_repository)
+    return UserService(user_repository, ApiKeyRepository(db))
 
 
 @app.command('createsuperuser')
@@ -1,6 +1,13 @@
 import secrets
+import timeit
 
 import typer
+from fastapi.encoders import jsonable_encoder
+
+from app import models, schemas
+from app.core.config import settings
+from app.core.responses import JSON_RESPONSE_CLASSES
+from app.core.security import calibrate_rounds
 
 app = typer.Typer()
 
@@ -9,3 +16,54 @@ app = typer.Typer()
 def generate_random_secret_key():
     secret_key = secrets.token_hex(32)
     typer.echo(secret_key)
+
+
+@app.command('benchmark-json')
+def benchmark_json_responses(
+    items: int = typer.Option(100, min=1),
+    rounds: int = typer.Option(1000, min=1),
+):
+    owner = models.User(
+        id=1,
+        email='owner@mail.com',
+        first_name='Owner',
+        is_active=True,
+        is_superuser=False,
+    )
+    projects = [
+        models.Project(
+            id=id,
+            title=f'Project {id}',
+            description=f'Description of project {id}',
+            url=f'https://project{id}.com',
+            owner=owner,
+        )
+        for id in range(1, items + 1)
+    ]
+    encoders = {
+        # what FastAPI does with a response_model route's result
+        'pydantic': lambda: jsonable_encoder(
+            [schemas.ProjectOut.from_orm(project) for project in projects]
+        ),
+        'trusted': lambda: [
+            schemas.serialize_project_out(project) for project in projects
+        ],
+    }
+    typer.echo(f'Encoding {items} projects {rounds} times')
+    for backend, response_class in JSON_RESPONSE_CLASSES.items():
+        for mode, encode in encoders.items():
+            elapsed = timeit.timeit(
+                lambda: response_class(encode()), number=rounds
+            )
+            per_response = elapsed / rounds * 1000
+            typer.echo(f'{backend} ({mode}): {per_response:.3f} ms/response')
+
+
+@app.command('calibrate-hashing')
+def calibrate_password_hashing(
+    target_ms: float = typer.Option(250.0, min=1.0),
+    scheme: str = typer.Option(settings.PASSWORD_HASHING_SCHEMES[0]),
+):
+    rounds, elapsed = calibrate_rounds(scheme, target_ms / 1000)
+    typer.echo(f'{scheme}: {rounds} rounds verify in {elapsed * 1000:.1f} ms')
+    typer.echo(f'PASSWORD_HASHING_ROUNDS={rounds}')
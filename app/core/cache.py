@@ -0,0 +1,171 @@
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Protocol, Tuple
+
+
+class Cache(Protocol):
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError()
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError()
+
+
+class TTLCache:
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.timer():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        if not self.enabled:
+            return
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        # one snapshot, so the size and the counters agree with each other
+        with self._lock:
+            size = len(self._entries)
+            hits, misses = self.hits, self.misses
+            evictions = self.evictions
+        lookups = hits + misses
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+        }
+
+
+class RedisCache:
+    def __init__(
+        self,
+        url: Optional[str],
+        namespace: str,
+        ttl: float,
+        client: Any = None,
+    ) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def _key(self, key: str) -> str:
+        return f'{self.namespace}:{key}'
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self.client.get(self._key(key))
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        # JSON rather than pickle: entries are plain data that any worker,
+        # or any version of the code, can read back safely
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.client.set(self._key(key), json.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self._key('*')))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'backend': 'redis',
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.client.info('stats').get('evicted_keys', 0),
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def build_cache(
+    backend: str,
+    namespace: str,
+    max_size: int,
+    ttl: float,
+    redis_url: Optional[str] = None,
+) -> Cache:
+    if backend == 'redis':
+        return RedisCache(redis_url, namespace, ttl)
+    return TTLCache(max_size, ttl)
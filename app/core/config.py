@@ -1,9 +1,14 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseSettings, validator
 from pydantic.networks import AnyHttpUrl
 
+ASYNC_DIALECTS = {
+    'postgresql://': 'postgresql+asyncpg://',
+    'sqlite://': 'sqlite+aiosqlite://',
+}
+
 
 class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRATION_MINUTES: int = 30
@@ -15,6 +20,48 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     JWT_SIGNING_ALGORITHM: str = 'HS256'
     CORS_ALLOWED_ORIGINS: List[AnyHttpUrl] = []
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASHING_SCHEMES: List[str] = ['bcrypt']
+    PASSWORD_HASHING_ROUNDS: Optional[int] = None
+    PASSWORD_HASHING_PROFILE: Literal['default', 'unsafe-fast'] = 'default'
+    PASSWORD_HASHING_BACKEND: Literal['inline', 'process'] = 'inline'
+    PASSWORD_HASHING_WORKERS: int = 0
+    PASSWORD_HASHING_QUEUE_SIZE: int = 64
+    PASSWORD_HASHING_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ASYNC_DATABASE_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30.0
+    DATABASE_POOL_RECYCLE_SECONDS: int = -1
+    DATABASE_POOL_PING_POLICY: Literal['always', 'idle', 'never'] = 'always'
+    DATABASE_POOL_PING_IDLE_SECONDS: float = 30.0
+    PROJECTS_BULK_MAX_SIZE: int = 1000
+    PROJECTS_EXPORT_BATCH_SIZE: int = 500
+    GZIP_MINIMUM_SIZE: int = 1000
+    PROJECT_CACHE_BACKEND: Literal['memory', 'redis'] = 'memory'
+    PROJECT_CACHE_MAX_SIZE: int = 1024
+    PROJECT_CACHE_TTL_SECONDS: float = 30.0
+    PROJECT_CACHE_REDIS_URL: Optional[str] = None
+    COUNT_CACHE_TTL_SECONDS: float = 60.0
+    COUNT_ESTIMATE_ENABLED: bool = False
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    REFRESH_TOKEN_EXPIRATION_DAYS: int = 30
+    REVOKED_CREDENTIALS_RETENTION_DAYS: int = 7
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_BACKEND: Literal['memory', 'redis'] = 'memory'
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 10000
+    LOGIN_RATE_LIMIT_REDIS_URL: Optional[str] = None
+    LOGIN_RATE_LIMIT_USERNAME_CAPACITY: int = 10
+    LOGIN_RATE_LIMIT_USERNAME_REFILL_PER_SECOND: float = 0.1
+    LOGIN_RATE_LIMIT_CLIENT_CAPACITY: int = 30
+    LOGIN_RATE_LIMIT_CLIENT_REFILL_PER_SECOND: float = 0.5
+    STATELESS_AUTH_ENABLED: bool = False
+    TOKEN_VERSION_CACHE_TTL_SECONDS: float = 30.0
+    JSON_RESPONSE_BACKEND: Literal['json', 'orjson'] = 'orjson'
+    SERVER_TIMING_ENABLED: bool = False
 
     @validator('DATABASE_URL')
     def normalize_database_dialetic(cls, db_url):
@@ -25,6 +72,34 @@ class Settings(BaseSettings):
             db_url = db_url.replace('postgres://', 'postgresql://')
         return db_url
 
+    @validator('ASYNC_DATABASE_URL', always=True)
+    def derive_async_database_url(cls, async_db_url, values):
+        if async_db_url:
+            return async_db_url
+        db_url = values.get('DATABASE_URL') or ''
+        for dialect, async_dialect in ASYNC_DIALECTS.items():
+            if db_url.startswith(dialect):
+                return db_url.replace(dialect, async_dialect, 1)
+        return None
+
+    @validator('PROJECT_CACHE_REDIS_URL', always=True)
+    def require_project_cache_redis_url(cls, redis_url, values):
+        if values.get('PROJECT_CACHE_BACKEND') == 'redis' and not redis_url:
+            raise ValueError('required by the redis project cache backend')
+        return redis_url
+
+    @validator('PASSWORD_HASHING_SCHEMES')
+    def require_password_hashing_schemes(cls, schemes):
+        if not schemes:
+            raise ValueError('at least one scheme is required')
+        return schemes
+
+    @validator('LOGIN_RATE_LIMIT_REDIS_URL', always=True)
+    def require_login_rate_limit_redis_url(cls, redis_url, values):
+        if values.get('LOGIN_RATE_LIMIT_BACKEND') == 'redis' and not redis_url:
+            raise ValueError('required by the redis login rate limit backend')
+        return redis_url
+
     class Config:
         env_file = '.env'
         case_sensitive = True
@@ -0,0 +1,19 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+
+def compute_etag(content: Any) -> str:
+    # weak: the tag follows the JSON content, not the bytes on the wire
+    encoded = json.dumps(content, sort_keys=True, default=str).encode()
+    return f'W/"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag.removeprefix('W/')
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == opaque_tag for tag in candidates)
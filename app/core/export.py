@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+Rows = Sequence[Mapping[str, Any]]
+
+
+class NDJSONEncoder:
+    media_type = 'application/x-ndjson'
+
+    def encode(self, rows: Rows) -> str:
+        return ''.join(
+            json.dumps(dict(row), separators=(',', ':')) + '\n' for row in rows
+        )
+
+
+class CSVEncoder:
+    media_type = 'text/csv'
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer: Optional[csv.DictWriter] = None
+
+    def encode(self, rows: Rows) -> str:
+        for row in rows:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._buffer, list(row.keys()))
+                self._writer.writeheader()
+            self._writer.writerow(row)
+        content = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return content
+
+
+EXPORT_ENCODERS = {'ndjson': NDJSONEncoder, 'csv': CSVEncoder}
+
+
+def get_media_type(format: str) -> str:
+    return EXPORT_ENCODERS[format].media_type
+
+
+def encode_rows(batches: Iterable[Rows], format: str) -> Iterator[str]:
+    encoder = EXPORT_ENCODERS[format]()
+    for rows in batches:
+        yield encoder.encode(rows)
+
+
+async def encode_rows_async(
+    batches: AsyncIterable[Rows], format: str
+) -> AsyncIterator[str]:
+    encoder = EXPORT_ENCODERS[format]()
+    async for rows in batches:
+        yield encoder.encode(rows)
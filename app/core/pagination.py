@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from app.exceptions import InvalidCursorError
+
+
+class Cursor(NamedTuple):
+    order_by: str
+    value: Any
+    id: int
+
+
+# the value is bound against the ordering column, so a crafted cursor with
+# the wrong type would fail in the database instead of here
+CURSOR_VALUE_TYPES: Dict[str, Tuple[type, ...]] = {
+    'id': (int,),
+    'email': (str,),
+    'title': (str,),
+    'rank': (int, float),
+}
+
+
+def _is_instance(value: Any, types: Tuple[type, ...]) -> bool:
+    # json booleans are ints to python, but never a valid position
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps(list(cursor), separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, order_by: str) -> Cursor:
+    try:
+        padding = '=' * (-len(token) % 4)
+        payload = base64.urlsafe_b64decode(token + padding)
+        cursor = Cursor(*json.loads(payload))
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError() from exc
+    if cursor.order_by != order_by or not _is_instance(cursor.id, (int,)):
+        raise InvalidCursorError()
+    value_types = CURSOR_VALUE_TYPES.get(order_by)
+    if value_types is not None and not _is_instance(cursor.value, value_types):
+        raise InvalidCursorError()
+    return cursor
+
+
+def next_cursor(
+    items: Sequence[Any], limit: int, order_by: str
+) -> Optional[str]:
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(Cursor(order_by, getattr(last, order_by), last.id))
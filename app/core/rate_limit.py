@@ -0,0 +1,165 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+from app.exceptions import TooManyRequestsError
+
+
+class RateLimiter(Protocol):
+    name: str
+
+    def acquire(self, key: str, capacity: int, refill_rate: float) -> float:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+
+class TokenBucketLimiter:
+    name = 'memory'
+
+    def __init__(
+        self,
+        max_keys: int,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_keys = max_keys
+        self.timer = timer
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: str, capacity: int, refill_rate: float) -> float:
+        with self._lock:
+            now = self.timer()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # a forgotten bucket starts full, which only errs on admitting
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# refills and takes a token atomically, using the server clock so every
+# worker sees the same time
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * refill_rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBucketLimiter:
+    name = 'redis'
+
+    def __init__(
+        self, url: Optional[str], namespace: str, client: Any = None
+    ) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.namespace = namespace
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f'{self.namespace}:{key}'
+
+    def acquire(self, key: str, capacity: int, refill_rate: float) -> float:
+        retry_after = self._script(
+            keys=[self._key(key)], args=[capacity, refill_rate]
+        )
+        return float(retry_after)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self._key('*')))
+        if keys:
+            self.client.delete(*keys)
+
+
+def build_rate_limiter(
+    backend: str,
+    namespace: str,
+    max_keys: int,
+    redis_url: Optional[str] = None,
+) -> RateLimiter:
+    if backend == 'redis':
+        return RedisTokenBucketLimiter(redis_url, namespace)
+    return TokenBucketLimiter(max_keys)
+
+
+class LoginRateLimiter:
+    def __init__(
+        self,
+        backend: RateLimiter,
+        username_limit: Tuple[int, float],
+        client_limit: Tuple[int, float],
+        enabled: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.username_limit = username_limit
+        self.client_limit = client_limit
+        self.enabled = enabled
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = Lock()
+
+    def check(self, username: str, client_host: Optional[str]) -> None:
+        if not self.enabled:
+            return
+        retry_after = self.backend.acquire(
+            f'username:{username.strip().lower()}', *self.username_limit
+        )
+        if client_host:
+            retry_after = max(
+                retry_after,
+                self.backend.acquire(
+                    f'client:{client_host}', *self.client_limit
+                ),
+            )
+        with self._lock:
+            if retry_after > 0:
+                self.rejected += 1
+            else:
+                self.admitted += 1
+        if retry_after > 0:
+            raise TooManyRequestsError(retry_after=retry_after)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        attempts = self.admitted + self.rejected
+        return {
+            'backend': self.backend.name,
+            'enabled': self.enabled,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'rejection_ratio': self.rejected / attempts if attempts else 0.0,
+        }
@@ -0,0 +1,31 @@
+from typing import Dict, Type
+
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+JSON_RESPONSE_CLASSES: Dict[str, Type[JSONResponse]] = {
+    'json': JSONResponse,
+    'orjson': ORJSONResponse,
+}
+
+
+def get_json_response_class(backend: str) -> Type[JSONResponse]:
+    if backend == 'orjson':
+        # fail on startup rather than on the first response
+        import orjson  # noqa: F401
+    return JSON_RESPONSE_CLASSES[backend]
+
+
+DefaultJSONResponse = get_json_response_class(settings.JSON_RESPONSE_BACKEND)
+
+
+class GZipStreamingResponse(StreamingResponse):
+    # gzip is applied per response, so only exports pay for compression
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        app = GZipMiddleware(
+            super().__call__, minimum_size=settings.GZIP_MINIMUM_SIZE
+        )
+        await app(scope, receive, send)
@@ -1,11 +1,332 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
 
-password_context = CryptContext(schemes=['bcrypt'], deprecated=['auto'])
+from app.core.config import Settings, settings
+from app.exceptions import PasswordHashingBusyError
 
 
-def hash_password(plain_password: str) -> str:
+def get_password_context_options(settings: Settings) -> Dict[str, Any]:
+    schemes = settings.PASSWORD_HASHING_SCHEMES
+    default_scheme = schemes[0]
+    options: Dict[str, Any] = {'schemes': schemes, 'deprecated': ['auto']}
+    rounds = settings.PASSWORD_HASHING_ROUNDS
+    if settings.PASSWORD_HASHING_PROFILE == 'unsafe-fast':
+        rounds = get_crypt_handler(default_scheme).min_rounds
+    if rounds is not None:
+        options[f'{default_scheme}__rounds'] = rounds
+        # hashes below the configured cost are upgraded on the next login
+        options[f'{default_scheme}__min_rounds'] = rounds
+    return options
+
+
+password_context = CryptContext(**get_password_context_options(settings))
+
+
+def configure_password_context(settings: Settings) -> None:
+    options = get_password_context_options(settings)
+    password_context.load(options)
+    password_hasher.configure(options)
+
+
+def _load_password_context(options: Dict[str, Any]) -> None:
+    password_context.load(options)
+
+
+def calibrate_rounds(
+    scheme: str,
+    target_seconds: float,
+    timer: Callable[[], float] = time.perf_counter,
+) -> Tuple[int, float]:
+    handler = get_crypt_handler(scheme)
+
+    def measure(rounds: int) -> float:
+        hashed_password = handler.using(rounds=rounds).hash('calibration')
+        started_at = timer()
+        handler.verify('calibration', hashed_password)
+        return timer() - started_at
+
+    if handler.rounds_cost == 'log2':
+        rounds = handler.min_rounds
+        elapsed = measure(rounds)
+        while rounds < handler.max_rounds:
+            next_elapsed = measure(rounds + 1)
+            if next_elapsed > target_seconds:
+                break
+            rounds, elapsed = rounds + 1, next_elapsed
+        return rounds, elapsed
+    elapsed = measure(handler.default_rounds)
+    rounds = int(handler.default_rounds * target_seconds / elapsed)
+    rounds = max(handler.min_rounds, min(rounds, handler.max_rounds))
+    return rounds, measure(rounds)
+
+
+def _hash(plain_password: str) -> str:
     return password_context.hash(plain_password)
 
 
-def check_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return password_context.verify(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    return password_context.needs_update(hashed_password)
+
+
+def _timed(fn: Callable, *args: Any) -> Tuple[Any, float]:
+    started_at = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started_at
+
+
+class PasswordHasher:
+    def __init__(self) -> None:
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self._metrics_lock = Lock()
+
+    def _run(self, fn: Callable, *args: Any) -> Any:
+        with self._metrics_lock:
+            self.submitted += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._metrics_lock:
+                self.completed += 1
+
+    def hash(self, plain_password: str) -> str:
+        return self._run(_hash, plain_password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    async def hash_async(self, plain_password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.hash, plain_password)
+
+    async def verify_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.verify, plain_password, hashed_password
+        )
+
+    def configure(self, context_options: Dict[str, Any]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'inline',
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'average_wait_seconds': (
+                self.total_wait_seconds / self.completed
+                if self.completed
+                else 0.0
+            ),
+        }
+
+
+class ProcessPoolPasswordHasher(PasswordHasher):
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = 64,
+        queue_timeout: float = 5.0,
+        context_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().__init__()
+        self.workers = workers or os.cpu_count() or 1
+        self.context_options = context_options
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = BoundedSemaphore(queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # workers never see configure_password_context, so each one
+                # loads the policy the parent had when the pool started
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    initializer=_load_password_context,
+                    initargs=(
+                        self.context_options or password_context.to_dict(),
+                    ),
+                )
+            return self._executor
+
+    def submit(
+        self, fn: Callable, *args: Any, blocking: bool = True
+    ) -> Future:
+        timeout = self.queue_timeout if blocking else None
+        if not self._slots.acquire(blocking, timeout):
+            with self._metrics_lock:
+                self.rejected += 1
+            raise PasswordHashingBusyError()
+        submitted_at = time.perf_counter()
+        with self._metrics_lock:
+            self.submitted += 1
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            future = self.executor.submit(_timed, fn, *args)
+        except BaseException:
+            self._release(0.0)
+            raise
+        future.add_done_callback(
+            lambda done: self._on_done(done, submitted_at)
+        )
+        return future
+
+    def _on_done(self, future: Future, submitted_at: float) -> None:
+        elapsed = time.perf_counter() - submitted_at
+        running = 0.0
+        if not future.cancelled() and future.exception() is None:
+            _, running = future.result()
+        self._release(max(elapsed - running, 0.0))
+
+    def _release(self, wait_seconds: float) -> None:
+        with self._metrics_lock:
+            self.queue_depth -= 1
+            self.completed += 1
+            self.total_wait_seconds += wait_seconds
+        self._slots.release()
+
+    def hash(self, plain_password: str) -> str:
+        result, _ = self.submit(_hash, plain_password).result()
+        return result
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        future = self.submit(_verify, plain_password, hashed_password)
+        result, _ = future.result()
+        return result
+
+    async def hash_async(self, plain_password: str) -> str:
+        future = self.submit(_hash, plain_password, blocking=False)
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    async def verify_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        future = self.submit(
+            _verify, plain_password, hashed_password, blocking=False
+        )
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    def configure(self, context_options: Dict[str, Any]) -> None:
+        with self._executor_lock:
+            self.context_options = context_options
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # queued work finishes on the old workers, new work starts a
+            # pool with the new policy
+            executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            'backend': 'process',
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+        }
+
+
+def get_password_hasher(settings: Settings) -> PasswordHasher:
+    if settings.PASSWORD_HASHING_BACKEND == 'process':
+        return ProcessPoolPasswordHasher(
+            workers=settings.PASSWORD_HASHING_WORKERS,
+            queue_size=settings.PASSWORD_HASHING_QUEUE_SIZE,
+            queue_timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT_SECONDS,
+            context_options=get_password_context_options(settings),
+        )
+    return PasswordHasher()
+
+
+password_hasher = get_password_hasher(settings)
+
+
+def hash_password(plain_password: str) -> str:
+    return password_hasher.hash(plain_password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await password_hasher.hash_async(plain_password)
+
+
+async def check_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    # refresh tokens are random, so a fast digest is enough to store them
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+API_KEY_PREFIX = 'ppa'
+
+
+def generate_api_key() -> Tuple[str, str]:
+    # the public prefix finds the row, the secret is only ever compared
+    prefix = secrets.token_hex(6)
+    return prefix, f'{API_KEY_PREFIX}_{prefix}_{secrets.token_urlsafe(32)}'
+
+
+def is_api_key(token: str) -> bool:
+    return token.startswith(f'{API_KEY_PREFIX}_')
+
+
+def get_api_key_prefix(key: str) -> Optional[str]:
+    parts = key.split('_', 2)
+    if len(parts) != 3 or parts[0] != API_KEY_PREFIX or not parts[2]:
+        return None
+    return parts[1]
+
+
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def check_api_key(key: str, key_hash: str) -> bool:
+    return hmac.compare_digest(hash_api_key(key), key_hash)
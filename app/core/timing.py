@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+log = logging.getLogger('uvicorn')
+
+
+class ServerTiming:
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.handler_finished_at: Optional[float] = None
+        self.handler_returned_response = False
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def header(self) -> str:
+        return ', '.join(
+            f'{phase};dur={seconds * 1000:.3f}'
+            for phase, seconds in self.durations.items()
+        )
+
+    def fields(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {
+            f'{phase}_ms': round(seconds * 1000, 3)
+            for phase, seconds in self.durations.items()
+        }
+        fields['db_queries'] = self.counts.get('db', 0)
+        return fields
+
+
+# the object is shared, so phases timed in worker threads or tasks that
+# copied the context still land on the request that started them
+_server_timing: ContextVar[Optional[ServerTiming]] = ContextVar(
+    'server_timing', default=None
+)
+
+
+def get_server_timing() -> Optional[ServerTiming]:
+    return _server_timing.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    server_timing = _server_timing.get()
+    if server_timing is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        server_timing.add(phase, time.perf_counter() - started_at)
+
+
+@contextmanager
+def timed_serialization() -> Iterator[None]:
+    # for endpoints that render their own response: the handler clock stops
+    # here, so rendering is booked once, as serialization
+    server_timing = _server_timing.get()
+    if server_timing is not None and server_timing.handler_finished_at is None:
+        server_timing.handler_finished_at = time.perf_counter()
+    with timed('serialization'):
+        yield
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    def finish(
+        server_timing: ServerTiming, started_at: float, result: Any
+    ) -> None:
+        if server_timing.handler_finished_at is None:
+            server_timing.handler_finished_at = time.perf_counter()
+        server_timing.handler_returned_response = isinstance(result, Response)
+        server_timing.add(
+            'handler', server_timing.handler_finished_at - started_at
+        )
+
+    if asyncio.iscoroutinefunction(call):
+
+        @wraps(call)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            server_timing = _server_timing.get()
+            if server_timing is None:
+                return await call(*args, **kwargs)
+            started_at = time.perf_counter()
+            result = None
+            try:
+                result = await call(*args, **kwargs)
+                return result
+            finally:
+                finish(server_timing, started_at, result)
+
+        return async_endpoint
+
+    @wraps(call)
+    def endpoint(*args: Any, **kwargs: Any) -> Any:
+        server_timing = _server_timing.get()
+        if server_timing is None:
+            return call(*args, **kwargs)
+        started_at = time.perf_counter()
+        result = None
+        try:
+            result = call(*args, **kwargs)
+            return result
+        finally:
+            finish(server_timing, started_at, result)
+
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        # route.endpoint stays untouched, only the call fastapi makes is timed
+        self.dependant.call = _timed_endpoint(self.endpoint)
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request) -> Any:
+            response = await route_handler(request)
+            server_timing = _server_timing.get()
+            if (
+                server_timing is not None
+                and server_timing.handler_finished_at
+                and not server_timing.handler_returned_response
+            ):
+                # validating and rendering the return value is all that is
+                # left once the endpoint returns, unless it rendered already
+                server_timing.add(
+                    'serialization',
+                    time.perf_counter() - server_timing.handler_finished_at,
+                )
+            return response
+
+        return timed_route_handler
+
+
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    if _server_timing.get() is not None:
+        conn.info.setdefault('query_started_at', []).append(
+            time.perf_counter()
+        )
+
+
+def _after_cursor_execute(conn: Any, *args: Any) -> None:
+    server_timing = _server_timing.get()
+    started_at: List[float] = conn.info.get('query_started_at', [])
+    if server_timing is not None and started_at:
+        server_timing.add('db', time.perf_counter() - started_at.pop())
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def uninstrument_engine(engine: Engine) -> None:
+    event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.remove(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        server_timing = ServerTiming()
+        token = _server_timing.set(server_timing)
+        started_at = time.perf_counter()
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                server_timing.add('total', time.perf_counter() - started_at)
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', server_timing.header())
+                log.info(
+                    'server timing',
+                    extra={
+                        'method': scope['method'],
+                        'path': scope['path'],
+                        'status_code': message['status'],
+                        **server_timing.fields(),
+                    },
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _server_timing.reset(token)
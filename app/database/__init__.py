@@ -1,2 +1,12 @@
-from .config import engine  # noqa: F401
-from .session import SessionLocal, generate_db_session  # noqa: F401
+from .config import (  # noqa: F401
+    enforce_sqlite_foreign_keys,
+    engine,
+    get_async_engine,
+    get_pool_stats,
+)
+from .session import (  # noqa: F401
+    AsyncSessionLocal,
+    SessionLocal,
+    generate_async_db_session,
+    generate_db_session,
+)
@@ -1,5 +1,140 @@
-from sqlalchemy import create_engine
+import time
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict
 
-from app.core.config import settings
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+from app.core.config import Settings, settings
+from app.core.timing import instrument_engine
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._metrics_lock = Lock()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started_at
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': self.overflow(),
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'average_wait_seconds': (
+                self.total_wait_seconds / self.checkouts
+                if self.checkouts
+                else 0.0
+            ),
+            'max_wait_seconds': self.max_wait_seconds,
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    # only the queue class differs, the counters come from the sync pool
+    pass
+
+
+def get_engine_options(settings: Settings) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        'pool_pre_ping': settings.DATABASE_POOL_PING_POLICY == 'always',
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE_SECONDS,
+    }
+    if not settings.DATABASE_URL.startswith('sqlite'):
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+def ping_idle_connections(engine: Engine, idle_seconds: float) -> None:
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info['checked_in_at'] = time.monotonic()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get('checked_in_at')
+        if checked_in_at is None:
+            return
+        if time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        except engine.dialect.dbapi.Error as error:
+            # the pool retries the checkout with a fresh connection
+            raise exc.DisconnectionError() from error
+
+
+def enforce_sqlite_foreign_keys(engine: Engine) -> None:
+    # sqlite ignores ON DELETE CASCADE unless each connection turns it on
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def get_pool_stats(engine: Engine) -> Dict[str, Any]:
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.stats()
+    return {'status': engine.pool.status()}
+
+
+engine_options = get_engine_options(settings)
+if not settings.DATABASE_URL.startswith('sqlite'):
+    engine_options['poolclass'] = InstrumentedQueuePool
+engine = create_engine(settings.DATABASE_URL, **engine_options)
+if engine.dialect.name == 'sqlite':
+    enforce_sqlite_foreign_keys(engine)
+if settings.DATABASE_POOL_PING_POLICY == 'idle':
+    ping_idle_connections(engine, settings.DATABASE_POOL_PING_IDLE_SECONDS)
+if settings.SERVER_TIMING_ENABLED:
+    instrument_engine(engine)
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    async_engine_options = get_engine_options(settings)
+    if not settings.ASYNC_DATABASE_URL.startswith('sqlite'):
+        async_engine_options['poolclass'] = InstrumentedAsyncQueuePool
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL, **async_engine_options
+    )
+    if async_engine.dialect.name == 'sqlite':
+        enforce_sqlite_foreign_keys(async_engine.sync_engine)
+    if settings.DATABASE_POOL_PING_POLICY == 'idle':
+        ping_idle_connections(
+            async_engine.sync_engine,
+            settings.DATABASE_POOL_PING_IDLE_SECONDS,
+        )
+    if settings.SERVER_TIMING_ENABLED:
+        instrument_engine(async_engine.sync_engine)
+    return async_engine
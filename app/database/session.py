@@ -1,10 +1,19 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from .config import engine
+from .config import engine, get_async_engine
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+AsyncSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
 
 
 def generate_db_session() -> Generator:
@@ -13,3 +22,8 @@ def generate_db_session() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def generate_async_db_session() -> AsyncGenerator:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
@@ -4,15 +4,23 @@ from .exceptions import (
     AuthenticationError,
     EmailAlreadyRegistredError,
     InactiveUserError,
+    InvalidCursorError,
+    InvalidFieldsError,
     NotFoundError,
+    PasswordHashingBusyError,
     PermissionDeniedError,
+    TooManyRequestsError,
 )
 from .handlers import (
     authentication_exception_handler,
     email_already_registred_exception_handler,
     inactive_user_exception_handler,
+    invalid_cursor_exception_handler,
+    invalid_fields_exception_handler,
     not_found_exception_handler,
+    password_hashing_busy_exception_handler,
     permission_denied_exception_handler,
+    too_many_requests_exception_handler,
 )
 
 
@@ -31,3 +39,15 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(
         PermissionDeniedError, permission_denied_exception_handler
     )
+    app.add_exception_handler(
+        PasswordHashingBusyError, password_hashing_busy_exception_handler
+    )
+    app.add_exception_handler(
+        InvalidCursorError, invalid_cursor_exception_handler
+    )
+    app.add_exception_handler(
+        InvalidFieldsError, invalid_fields_exception_handler
+    )
+    app.add_exception_handler(
+        TooManyRequestsError, too_many_requests_exception_handler
+    )
@@ -27,3 +27,25 @@ class InactiveUserError(BaseAppException):
 
 class PermissionDeniedError(BaseAppException):
     default_message = 'Permission denied.'
+
+
+class PasswordHashingBusyError(BaseAppException):
+    default_message = 'Too many authentication attempts. Try again later.'
+
+
+class InvalidCursorError(BaseAppException):
+    default_message = 'Invalid pagination cursor.'
+
+
+class InvalidFieldsError(BaseAppException):
+    default_message = 'Invalid fields.'
+
+
+class TooManyRequestsError(BaseAppException):
+    default_message = 'Too many login attempts. Try again later.'
+
+    def __init__(
+        self, message: Optional[str] = None, retry_after: float = 1.0
+    ) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -1,27 +1,34 @@
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+import math
+
+from fastapi import Request, Response, status
+
+from app.core.responses import DefaultJSONResponse
 
 from .exceptions import (
     AuthenticationError,
     EmailAlreadyRegistredError,
     InactiveUserError,
+    InvalidCursorError,
+    InvalidFieldsError,
     NotFoundError,
+    PasswordHashingBusyError,
     PermissionDeniedError,
+    TooManyRequestsError,
 )
 
 
 def not_found_exception_handler(
     request: Request, exc: NotFoundError
-) -> JSONResponse:
-    return JSONResponse(
+) -> Response:
+    return DefaultJSONResponse(
         status_code=status.HTTP_404_NOT_FOUND, content={'detail': exc.message}
     )
 
 
 def email_already_registred_exception_handler(
     request: Request, exc: EmailAlreadyRegistredError
-) -> JSONResponse:
-    return JSONResponse(
+) -> Response:
+    return DefaultJSONResponse(
         status_code=status.HTTP_409_CONFLICT,
         content={'detail': exc.message},
     )
@@ -29,8 +36,8 @@ def email_already_registred_exception_handler(
 
 def authentication_exception_handler(
     request: Request, exc: AuthenticationError
-) -> JSONResponse:
-    return JSONResponse(
+) -> Response:
+    return DefaultJSONResponse(
         status_code=status.HTTP_401_UNAUTHORIZED,
         headers={'WWW-Authenticate': 'Bearer'},
         content={'detail': exc.message},
@@ -39,8 +46,8 @@ def authentication_exception_handler(
 
 def inactive_user_exception_handler(
     request: Request, exc: InactiveUserError
-) -> JSONResponse:
-    return JSONResponse(
+) -> Response:
+    return DefaultJSONResponse(
         status_code=status.HTTP_403_FORBIDDEN,
         content={'detail': exc.message},
     )
@@ -48,8 +55,46 @@ def inactive_user_exception_handler(
 
 def permission_denied_exception_handler(
     request: Request, exc: PermissionDeniedError
-) -> JSONResponse:
-    return JSONResponse(
+) -> Response:
+    return DefaultJSONResponse(
         status_code=status.HTTP_403_FORBIDDEN,
         content={'detail': exc.message},
     )
+
+
+def password_hashing_busy_exception_handler(
+    request: Request, exc: PasswordHashingBusyError
+) -> Response:
+    return DefaultJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+        content={'detail': exc.message},
+    )
+
+
+def invalid_cursor_exception_handler(
+    request: Request, exc: InvalidCursorError
+) -> Response:
+    return DefaultJSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={'detail': exc.message},
+    )
+
+
+def invalid_fields_exception_handler(
+    request: Request, exc: InvalidFieldsError
+) -> Response:
+    return DefaultJSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={'detail': exc.message},
+    )
+
+
+def too_many_requests_exception_handler(
+    request: Request, exc: TooManyRequestsError
+) -> Response:
+    return DefaultJSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(math.ceil(exc.retry_after))},
+        content={'detail': exc.message},
+    )
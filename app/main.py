@@ -5,6 +5,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import register_api
 from app.core.config import settings
+from app.core.responses import DefaultJSONResponse
+from app.core.security import password_hasher
+from app.core.timing import ServerTimingMiddleware
+from app.database import get_async_engine
 from app.exceptions import register_exception_handlers
 
 log = logging.getLogger('uvicorn')
@@ -20,6 +24,7 @@ app = FastAPI(
     },
     docs_url=f'{settings.API_PREFIX}/docs',
     redoc_url=f'{settings.API_PREFIX}/redoc',
+    default_response_class=DefaultJSONResponse,
     openapi_tags=[
         {
             'name': 'Authentication',
@@ -37,6 +42,10 @@ app = FastAPI(
             'name': 'Projects',
             'description': 'Manage projects',
         },
+        {
+            'name': 'Metrics',
+            'description': 'Runtime metrics',
+        },
     ],
 )
 if settings.CORS_ALLOWED_ORIGINS:
@@ -48,11 +57,25 @@ if settings.CORS_ALLOWED_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=['ETag', 'X-Next-Cursor', 'X-Total-Count'],
     )
+if settings.SERVER_TIMING_ENABLED:
+    # outermost, so the total covers every other middleware
+    app.add_middleware(ServerTimingMiddleware)
 
 
 @app.on_event('startup')
 async def startup():
     log.info("Starting up...")
+    if settings.PASSWORD_HASHING_PROFILE == 'unsafe-fast':
+        log.warning("Password hashing uses the unsafe-fast profile!")
     register_api(app)
     register_exception_handlers(app)
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    log.info("Shutting down...")
+    password_hasher.shutdown()
+    if settings.ASYNC_DATABASE_ENABLED:
+        await get_async_engine().dispose()
@@ -1,3 +1,5 @@
+from .api_key import ApiKey  # noqa: F401
 from .base import Base  # noqa: F401
 from .project import Project  # noqa: F401
+from .refresh_token import RefreshToken  # noqa: F401
 from .user import User  # noqa: F401
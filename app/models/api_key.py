@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from .base import Base
+from .user import User
+
+
+class ApiKey(Base):
+    __tablename__ = 'api_keys'
+
+    id: int = Column(Integer, primary_key=True)
+    name: str = Column(String(100), nullable=False)
+    prefix: str = Column(String(16), unique=True, index=True)
+    key_hash: str = Column(String(64), nullable=False)
+    user_id: int = Column(
+        Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True
+    )
+    created_at: datetime = Column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+    revoked_at: Optional[datetime] = Column(DateTime, nullable=True)
+
+    user: User = relationship('User', back_populates='api_keys')
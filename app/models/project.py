@@ -1,5 +1,5 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, ForeignKey, Index, Integer, String, event
+from sqlalchemy.orm import query_expression, relationship
 
 from .base import Base
 from .user import User
@@ -7,6 +7,8 @@ from .user import User
 
 class Project(Base):
     __tablename__ = 'projects'
+    __table_args__ = (Index('ix_projects_owner_id_id', 'owner_id', 'id'),)
+    __mapper_args__ = {'eager_defaults': True}
 
     id: int = Column(Integer, primary_key=True, index=True)
     title: str = Column(String, index=True)
@@ -15,3 +17,68 @@ class Project(Base):
     owner_id: int = Column(Integer, ForeignKey('users.id'))
 
     owner: User = relationship('User', back_populates='projects')
+    rank: float = query_expression()
+
+
+# run by create_all; migrations carry their own copy, so a change here
+# needs a new revision as well
+SEARCH_DDL = {
+    'postgresql': [
+        """
+        ALTER TABLE projects ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        """
+        CREATE INDEX ix_projects_search_vector ON projects
+        USING gin (search_vector)
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE projects_search USING fts5(
+            title, description, content='projects', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER projects_search_insert AFTER INSERT ON projects
+        BEGIN
+            INSERT INTO projects_search (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER projects_search_delete AFTER DELETE ON projects
+        BEGIN
+            INSERT INTO projects_search
+                (projects_search, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER projects_search_update AFTER UPDATE ON projects
+        BEGIN
+            INSERT INTO projects_search
+                (projects_search, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO projects_search (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(
+            Project.__table__,
+            'after_create',
+            DDL(statement).execute_if(dialect=dialect),
+        )
+event.listen(
+    Project.__table__,
+    'after_drop',
+    DDL('DROP TABLE IF EXISTS projects_search').execute_if(dialect='sqlite'),
+)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from .base import Base
+from .user import User
+
+
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+
+    id: int = Column(Integer, primary_key=True)
+    token_hash: str = Column(String(64), unique=True, index=True)
+    user_id: int = Column(
+        Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True
+    )
+    token_version: int = Column(Integer, nullable=False)
+    expires_at: datetime = Column(DateTime, nullable=False)
+    revoked_at: Optional[datetime] = Column(DateTime, nullable=True)
+
+    user: User = relationship('User', back_populates='refresh_tokens')
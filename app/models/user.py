@@ -3,16 +3,25 @@ from typing import TYPE_CHECKING, List
 from sqlalchemy import Boolean, Column, Integer, String
 from sqlalchemy.orm import relationship
 
-from app.core.security import check_password, hash_password
+from app.core.security import (
+    check_password,
+    check_password_async,
+    hash_password,
+    hash_password_async,
+    password_needs_update,
+)
 
 from .base import Base
 
 if TYPE_CHECKING:  # pragma: no cover
+    from .api_key import ApiKey
     from .project import Project
+    from .refresh_token import RefreshToken
 
 
 class User(Base):
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: int = Column(Integer, primary_key=True, index=True)
     email: str = Column(String, unique=True, index=True)
@@ -21,10 +30,25 @@ class User(Base):
     _password: str = Column('password', String)
     is_active: bool = Column(Boolean, default=True)
     is_superuser: bool = Column(Boolean, default=False)
+    token_version: int = Column(
+        Integer, nullable=False, default=0, server_default='0'
+    )
 
     projects: List['Project'] = relationship(
         'Project', back_populates='owner', cascade='all, delete'
     )
+    refresh_tokens: List['RefreshToken'] = relationship(
+        'RefreshToken',
+        back_populates='user',
+        cascade='all, delete',
+        passive_deletes=True,
+    )
+    api_keys: List['ApiKey'] = relationship(
+        'ApiKey',
+        back_populates='user',
+        cascade='all, delete',
+        passive_deletes=True,
+    )
 
     @property
     def password(self) -> str:
@@ -36,3 +60,12 @@ class User(Base):
 
     def verify_password(self, plain_password: str) -> bool:
         return check_password(plain_password, self.password)
+
+    async def set_password_async(self, new_password: str) -> None:
+        self._password = await hash_password_async(new_password)
+
+    async def verify_password_async(self, plain_password: str) -> bool:
+        return await check_password_async(plain_password, self.password)
+
+    def password_needs_update(self) -> bool:
+        return password_needs_update(self.password)
@@ -1,3 +1,15 @@
-from .base import Repository  # noqa: F401
-from .project import ProjectRepository  # noqa: F401
-from .user import UserRepository  # noqa: F401
+from .api_key import ApiKeyRepository, AsyncApiKeyRepository  # noqa: F401
+from .base import (  # noqa: F401
+    AsyncRepository,
+    AsyncSearchableRepository,
+    AsyncTokenRepository,
+    Repository,
+    SearchableRepository,
+    TokenRepository,
+)
+from .project import AsyncProjectRepository, ProjectRepository  # noqa: F401
+from .refresh_token import (  # noqa: F401
+    AsyncRefreshTokenRepository,
+    RefreshTokenRepository,
+)
+from .user import AsyncUserRepository, UserRepository  # noqa: F401
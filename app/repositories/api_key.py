@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql import Select, Update
+
+from app import models
+from app.database import generate_async_db_session, generate_db_session
+
+
+def _get_query(**kwargs: Any) -> Select:
+    # the owner comes in the same round trip, so a key costs one query
+    return (
+        select(models.ApiKey)
+        .options(joinedload(models.ApiKey.user))
+        .filter_by(**kwargs)
+    )
+
+
+def _revoke_all_query(user_id: int, revoked_at: datetime) -> Update:
+    # not committed here: it goes out with the user update that bumped
+    # the token version
+    return (
+        update(models.ApiKey)
+        .where(
+            models.ApiKey.user_id == user_id,
+            models.ApiKey.revoked_at.is_(None),
+        )
+        .values(revoked_at=revoked_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ApiKeyRepository:
+    def __init__(self, db: Session = Depends(generate_db_session)) -> None:
+        self.db = db
+
+    def add(self, obj: models.ApiKey) -> models.ApiKey:
+        self.db.add(obj)
+        self.db.commit()
+        return obj
+
+    def filter(self, **kwargs: Any) -> List[models.ApiKey]:
+        return (
+            self.db.query(models.ApiKey)
+            .filter_by(**kwargs)
+            .order_by(models.ApiKey.id)
+            .all()
+        )
+
+    def get(self, **kwargs: Any) -> Optional[models.ApiKey]:
+        return self.db.execute(_get_query(**kwargs)).scalars().first()
+
+    def update(self, obj: models.ApiKey) -> models.ApiKey:
+        self.db.commit()
+        return obj
+
+    def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        self.db.execute(_revoke_all_query(user_id, revoked_at))
+
+    def purge(self, revoked_before: datetime) -> int:
+        result = self.db.execute(
+            delete(models.ApiKey)
+            .where(models.ApiKey.revoked_at <= revoked_before)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncApiKeyRepository:
+    def __init__(
+        self, db: AsyncSession = Depends(generate_async_db_session)
+    ) -> None:
+        self.db = db
+
+    async def get(self, **kwargs: Any) -> Optional[models.ApiKey]:
+        result = await self.db.execute(_get_query(**kwargs))
+        return result.scalars().first()
+
+    async def add(self, obj: models.ApiKey) -> models.ApiKey:
+        self.db.add(obj)
+        await self.db.commit()
+        return obj
+
+    async def filter(self, **kwargs: Any) -> List[models.ApiKey]:
+        result = await self.db.execute(
+            select(models.ApiKey)
+            .filter_by(**kwargs)
+            .order_by(models.ApiKey.id)
+        )
+        return result.scalars().all()
+
+    async def update(self, obj: models.ApiKey) -> models.ApiKey:
+        await self.db.commit()
+        return obj
+
+    async def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        await self.db.execute(_revoke_all_query(user_id, revoked_at))
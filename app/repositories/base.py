@@ -1,18 +1,112 @@
-from typing import Any, List, Optional, Protocol, TypeVar
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Collection,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Type,
+    TypeVar,
+    Union,
+)
 
+from sqlalchemy import Column, and_, func, inspect, or_, select, text
+from sqlalchemy.orm import Query, make_transient_to_detached
+from sqlalchemy.sql import Select
+
+from app.core.export import Rows
+from app.core.pagination import Cursor
 from app.models.base import Base
 
 T = TypeVar('T', bound=Base)
+Q = TypeVar('Q', bound=Union[Query, Select])
+
+
+def paginate(
+    query: Q,
+    model: Type[Base],
+    skip: int,
+    limit: int,
+    order_by: str = 'id',
+    after: Optional[Cursor] = None,
+) -> Q:
+    column = getattr(model, order_by)
+    if order_by == 'id':
+        ordering = [model.id]
+        if after is not None:
+            query = query.filter(model.id > after.id)
+    else:
+        ordering = [column, model.id]
+        if after is not None:
+            query = query.filter(
+                or_(
+                    column > after.value,
+                    and_(column == after.value, model.id > after.id),
+                )
+            )
+    query = query.order_by(*ordering)
+    if after is None:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def count_query(model: Type[Base]) -> Select:
+    return select(func.count()).select_from(model)
+
+
+def estimate_query(model: Type[Base]) -> Select:
+    # planner statistics, refreshed by (auto)vacuum and ANALYZE
+    return text(
+        'SELECT reltuples::bigint FROM pg_class '
+        'WHERE oid = CAST(:table AS regclass)'
+    ).bindparams(table=model.__tablename__)
+
+
+def detached_copy(obj: T) -> T:
+    mapper = inspect(obj).mapper
+    copy = mapper.class_(
+        **{
+            column.key: getattr(obj, column.key)
+            for column in mapper.column_attrs
+            if isinstance(column.expression, Column)
+        }
+    )
+    make_transient_to_detached(copy)
+    return copy
 
 
 class Repository(Protocol):
     def add(self, obj: T) -> T:
         raise NotImplementedError()
 
-    def list(self, skip: int, limit: int) -> List[T]:
+    def add_all(self, objs: List[T]) -> List[T]:
+        raise NotImplementedError()
+
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[T]:
         raise NotImplementedError()
 
-    def filter(self, skip: int, limit: int, **kwargs: Any) -> List[T]:
+    def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        **kwargs: Any,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    def stream(self, batch_size: int) -> Iterator[Rows]:
+        raise NotImplementedError()
+
+    def count(self, estimate: bool = False) -> int:
         raise NotImplementedError()
 
     def get(self, **kwargs: Any) -> Optional[T]:
@@ -23,3 +117,162 @@ class Repository(Protocol):
 
     def remove(self, obj: T) -> None:
         raise NotImplementedError()
+
+    def snapshot(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    def attach(self, obj: T) -> T:
+        raise NotImplementedError()
+
+
+class TokenRepository(Protocol):
+    def add(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    def get(self, **kwargs: Any) -> Optional[T]:
+        raise NotImplementedError()
+
+    def revoke(self, obj: T, revoked_at: datetime) -> bool:
+        raise NotImplementedError()
+
+    def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        raise NotImplementedError()
+
+    def purge(self, expired_before: datetime, revoked_before: datetime) -> int:
+        raise NotImplementedError()
+
+
+class AsyncTokenRepository(Protocol):
+    async def add(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    async def get(self, **kwargs: Any) -> Optional[T]:
+        raise NotImplementedError()
+
+    async def revoke(self, obj: T, revoked_at: datetime) -> bool:
+        raise NotImplementedError()
+
+    async def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        raise NotImplementedError()
+
+
+class SearchableRepository(Repository, Protocol):
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+        **kwargs: Any,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    def get(
+        self, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> Optional[T]:
+        raise NotImplementedError()
+
+
+class AsyncRepository(Protocol):
+    async def add(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    async def add_all(self, objs: List[T]) -> List[T]:
+        raise NotImplementedError()
+
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    async def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        **kwargs: Any,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    def stream(self, batch_size: int) -> AsyncIterator[Rows]:
+        raise NotImplementedError()
+
+    async def count(self, estimate: bool = False) -> int:
+        raise NotImplementedError()
+
+    async def get(self, **kwargs: Any) -> Optional[T]:
+        raise NotImplementedError()
+
+    async def update(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    async def remove(self, obj: T) -> None:
+        raise NotImplementedError()
+
+    def snapshot(self, obj: T) -> T:
+        raise NotImplementedError()
+
+    async def attach(self, obj: T) -> T:
+        raise NotImplementedError()
+
+
+class AsyncSearchableRepository(AsyncRepository, Protocol):
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    async def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+        **kwargs: Any,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    async def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[T]:
+        raise NotImplementedError()
+
+    async def get(
+        self, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> Optional[T]:
+        raise NotImplementedError()
@@ -1,10 +1,111 @@
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Collection, Iterator, List, Optional
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Float,
+    and_,
+    cast,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    Query,
+    Session,
+    joinedload,
+    load_only,
+    with_expression,
+)
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlalchemy.sql import Select
 
 from app import models
-from app.database import generate_db_session
+from app.core.export import Rows
+from app.core.pagination import Cursor
+from app.database import generate_async_db_session, generate_db_session
+
+from .base import count_query, estimate_query, paginate
+
+
+def _load_options(
+    fields: Optional[Collection[str]], *required: str
+) -> List[LoaderOption]:
+    if fields is None:
+        return [joinedload(models.Project.owner)]
+    columns = {*fields, *required} - {'owner'}
+    options = [load_only(*columns)]
+    if 'owner' in fields:
+        options.append(joinedload(models.Project.owner))
+    return options
+
+
+def _fts5_query(terms: str) -> str:
+    # quote every term so user input can't use the FTS5 query syntax
+    return ' '.join(
+        '"{}"'.format(term.replace('"', '""')) for term in terms.split()
+    )
+
+
+def _search_query(
+    dialect: str,
+    terms: str,
+    limit: int,
+    after: Optional[Cursor],
+    fields: Optional[Collection[str]] = None,
+) -> Select:
+    if dialect == 'postgresql':
+        search_vector = literal_column('projects.search_vector')
+        tsquery = func.websearch_to_tsquery('english', terms)
+        # ts_rank_cd returns a real, which the double read back from a
+        # cursor never equals; in double precision the value round-trips
+        rank = cast(func.ts_rank_cd(search_vector, tsquery), Float)
+        query = select(models.Project).filter(search_vector.op('@@')(tsquery))
+    else:
+        search = table('projects_search', column('rowid'))
+        rank = -func.bm25(literal_column('projects_search'), 2.0, 1.0)
+        query = (
+            select(models.Project)
+            .join(search, search.c.rowid == models.Project.id)
+            .filter(
+                literal_column('projects_search').op('MATCH')(
+                    _fts5_query(terms)
+                )
+            )
+        )
+    if after is not None:
+        query = query.filter(
+            or_(
+                rank < after.value,
+                and_(rank == after.value, models.Project.id > after.id),
+            )
+        )
+    return (
+        query.options(
+            *_load_options(fields),
+            with_expression(models.Project.rank, rank),
+        )
+        .order_by(rank.desc(), models.Project.id)
+        .limit(limit)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _export_query(batch_size: int) -> Select:
+    return (
+        select(
+            models.Project.id,
+            models.Project.title,
+            models.Project.description,
+            models.Project.url,
+            models.Project.owner_id,
+        )
+        .order_by(models.Project.id)
+        .execution_options(yield_per=batch_size)
+    )
 
 
 class ProjectRepository:
@@ -14,31 +115,207 @@ class ProjectRepository:
     def add(self, obj: models.Project) -> models.Project:
         self.db.add(obj)
         self.db.commit()
-        self.db.refresh(obj)
         return obj
 
-    def list(self, skip: int, limit: int) -> List[models.Project]:
-        return self.db.query(models.Project).offset(skip).limit(limit).all()
+    def add_all(self, objs: List[models.Project]) -> List[models.Project]:
+        self.db.add_all(objs)
+        self.db.commit()
+        return objs
+
+    def _query(
+        self, fields: Optional[Collection[str]] = None, *required: str
+    ) -> Query:
+        return self.db.query(models.Project).options(
+            *_load_options(fields, *required)
+        )
+
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        query = self._query(fields, order_by)
+        return paginate(
+            query, models.Project, skip, limit, order_by, after
+        ).all()
 
     def filter(
-        self, skip: int, limit: int, **kwargs: Any
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+        **kwargs: Any,
     ) -> List[models.Project]:
-        return (
-            self.db.query(models.Project)
-            .filter_by(**kwargs)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        query = self._query(fields, order_by).filter_by(**kwargs)
+        return paginate(
+            query, models.Project, skip, limit, order_by, after
+        ).all()
 
-    def get(self, **kwargs: Any) -> Optional[models.Project]:
-        return self.db.query(models.Project).filter_by(**kwargs).first()
+    def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        if not terms.split():
+            return []
+        dialect = self.db.get_bind().dialect.name
+        query = _search_query(dialect, terms, limit, after, fields)
+        return self.db.execute(query).scalars().all()
+
+    def stream(self, batch_size: int) -> Iterator[Rows]:
+        result = self.db.execute(_export_query(batch_size))
+        yield from result.mappings().partitions()
+
+    def count(self, estimate: bool = False) -> int:
+        if estimate and self.db.get_bind().dialect.name == 'postgresql':
+            estimated = self.db.execute(
+                estimate_query(models.Project)
+            ).scalar()
+            if estimated is not None and estimated >= 0:
+                return estimated
+        return self.db.execute(count_query(models.Project)).scalar()
+
+    def get(
+        self, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> Optional[models.Project]:
+        return self._query(fields).filter_by(**kwargs).first()
 
     def update(self, obj: models.Project) -> models.Project:
         self.db.commit()
-        self.db.refresh(obj)
         return obj
 
     def remove(self, obj: models.Project) -> None:
         self.db.delete(obj)
         self.db.commit()
+
+
+class AsyncProjectRepository:
+    def __init__(
+        self, db: AsyncSession = Depends(generate_async_db_session)
+    ) -> None:
+        self.db = db
+
+    async def add(self, obj: models.Project) -> models.Project:
+        self.db.add(obj)
+        await self.db.commit()
+        return await self._refresh(obj)
+
+    async def add_all(
+        self, objs: List[models.Project]
+    ) -> List[models.Project]:
+        self.db.add_all(objs)
+        await self.db.commit()
+        # one round trip loads every owner onto the same instances
+        query = (
+            self._query()
+            .filter(models.Project.id.in_([obj.id for obj in objs]))
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        result.scalars().all()
+        return objs
+
+    def _query(
+        self, fields: Optional[Collection[str]] = None, *required: str
+    ) -> Select:
+        return select(models.Project).options(
+            *_load_options(fields, *required)
+        )
+
+    async def _refresh(self, obj: models.Project) -> models.Project:
+        query = (
+            self._query()
+            .filter_by(id=obj.id)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().one()
+
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        query = paginate(
+            self._query(fields, order_by),
+            models.Project,
+            skip,
+            limit,
+            order_by,
+            after,
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+        **kwargs: Any,
+    ) -> List[models.Project]:
+        query = paginate(
+            self._query(fields, order_by).filter_by(**kwargs),
+            models.Project,
+            skip,
+            limit,
+            order_by,
+            after,
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        if not terms.split():
+            return []
+        dialect = self.db.bind.dialect.name
+        query = _search_query(dialect, terms, limit, after, fields)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def stream(self, batch_size: int) -> AsyncIterator[Rows]:
+        result = await self.db.stream(_export_query(batch_size))
+        async for rows in result.mappings().partitions():
+            yield rows
+
+    async def count(self, estimate: bool = False) -> int:
+        if estimate and self.db.bind.dialect.name == 'postgresql':
+            result = await self.db.execute(estimate_query(models.Project))
+            estimated = result.scalar()
+            if estimated is not None and estimated >= 0:
+                return estimated
+        result = await self.db.execute(count_query(models.Project))
+        return result.scalar()
+
+    async def get(
+        self, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> Optional[models.Project]:
+        query = self._query(fields).filter_by(**kwargs)
+        result = await self.db.execute(query)
+        return result.scalars().first()
+
+    async def update(self, obj: models.Project) -> models.Project:
+        await self.db.commit()
+        return obj
+
+    async def remove(self, obj: models.Project) -> None:
+        await self.db.delete(obj)
+        await self.db.commit()
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Depends
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql import Select, Update
+
+from app import models
+from app.database import generate_async_db_session, generate_db_session
+
+
+def _get_query(**kwargs: Any) -> Select:
+    return (
+        select(models.RefreshToken)
+        .options(joinedload(models.RefreshToken.user))
+        .filter_by(**kwargs)
+    )
+
+
+def _revoke_query(obj: models.RefreshToken, revoked_at: datetime) -> Update:
+    # conditional, so only one of two concurrent rotations wins
+    return (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.id == obj.id,
+            models.RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=revoked_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _revoke_all_query(user_id: int, revoked_at: datetime) -> Update:
+    return (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=revoked_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class RefreshTokenRepository:
+    def __init__(self, db: Session = Depends(generate_db_session)) -> None:
+        self.db = db
+
+    def add(self, obj: models.RefreshToken) -> models.RefreshToken:
+        self.db.add(obj)
+        self.db.commit()
+        return obj
+
+    def get(self, **kwargs: Any) -> Optional[models.RefreshToken]:
+        return self.db.execute(_get_query(**kwargs)).scalars().first()
+
+    def revoke(self, obj: models.RefreshToken, revoked_at: datetime) -> bool:
+        result = self.db.execute(_revoke_query(obj, revoked_at))
+        return result.rowcount == 1
+
+    def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        self.db.execute(_revoke_all_query(user_id, revoked_at))
+        self.db.commit()
+
+    def purge(self, expired_before: datetime, revoked_before: datetime) -> int:
+        # revoked tokens are kept for a while, a reused one is how
+        # rotation notices a stolen chain
+        result = self.db.execute(
+            delete(models.RefreshToken)
+            .where(
+                or_(
+                    models.RefreshToken.expires_at <= expired_before,
+                    models.RefreshToken.revoked_at <= revoked_before,
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncRefreshTokenRepository:
+    def __init__(
+        self, db: AsyncSession = Depends(generate_async_db_session)
+    ) -> None:
+        self.db = db
+
+    async def add(self, obj: models.RefreshToken) -> models.RefreshToken:
+        self.db.add(obj)
+        await self.db.commit()
+        return obj
+
+    async def get(self, **kwargs: Any) -> Optional[models.RefreshToken]:
+        result = await self.db.execute(_get_query(**kwargs))
+        return result.scalars().first()
+
+    async def revoke(
+        self, obj: models.RefreshToken, revoked_at: datetime
+    ) -> bool:
+        result = await self.db.execute(_revoke_query(obj, revoked_at))
+        return result.rowcount == 1
+
+    async def revoke_all(self, user_id: int, revoked_at: datetime) -> None:
+        await self.db.execute(_revoke_all_query(user_id, revoked_at))
+        await self.db.commit()
@@ -1,10 +1,23 @@
 from typing import Any, List, Optional
 
 from fastapi import Depends
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models
-from app.database import generate_db_session
+from app.core.pagination import Cursor
+from app.database import generate_async_db_session, generate_db_session
+from app.exceptions import EmailAlreadyRegistredError
+
+from .base import count_query, detached_copy, estimate_query, paginate
+
+
+def _is_email_taken(error: IntegrityError) -> bool:
+    # postgres names the violated index, sqlite the violated column
+    message = str(error.orig)
+    return 'ix_users_email' in message or 'users.email' in message
 
 
 class UserRepository:
@@ -13,32 +26,144 @@ class UserRepository:
 
     def add(self, obj: models.User) -> models.User:
         self.db.add(obj)
-        self.db.commit()
-        self.db.refresh(obj)
+        self._commit()
         return obj
 
-    def list(self, skip: int, limit: int) -> List[models.User]:
-        return self.db.query(models.User).offset(skip).limit(limit).all()
+    def _commit(self) -> None:
+        try:
+            self.db.commit()
+        except IntegrityError as exc:
+            self.db.rollback()
+            if _is_email_taken(exc):
+                raise EmailAlreadyRegistredError() from exc
+            raise
+
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.User]:
+        query = self.db.query(models.User)
+        return paginate(query, models.User, skip, limit, order_by, after).all()
 
     def filter(
-        self, skip: int, limit: int, **kwargs: Any
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        **kwargs: Any,
     ) -> List[models.User]:
-        return (
-            self.db.query(models.User)
-            .filter_by(**kwargs)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        query = self.db.query(models.User).filter_by(**kwargs)
+        return paginate(query, models.User, skip, limit, order_by, after).all()
+
+    def count(self, estimate: bool = False) -> int:
+        if estimate and self.db.get_bind().dialect.name == 'postgresql':
+            estimated = self.db.execute(estimate_query(models.User)).scalar()
+            if estimated is not None and estimated >= 0:
+                return estimated
+        return self.db.execute(count_query(models.User)).scalar()
 
     def get(self, **kwargs: Any) -> Optional[models.User]:
         return self.db.query(models.User).filter_by(**kwargs).first()
 
     def update(self, obj: models.User) -> models.User:
-        self.db.commit()
-        self.db.refresh(obj)
+        self._commit()
         return obj
 
     def remove(self, obj: models.User) -> None:
         self.db.delete(obj)
         self.db.commit()
+
+    def snapshot(self, obj: models.User) -> models.User:
+        return detached_copy(obj)
+
+    def attach(self, obj: models.User) -> models.User:
+        return self.db.merge(obj, load=False)
+
+
+class AsyncUserRepository:
+    def __init__(
+        self, db: AsyncSession = Depends(generate_async_db_session)
+    ) -> None:
+        self.db = db
+
+    async def add(self, obj: models.User) -> models.User:
+        self.db.add(obj)
+        await self._commit()
+        return obj
+
+    async def _commit(self) -> None:
+        try:
+            await self.db.commit()
+        except IntegrityError as exc:
+            await self.db.rollback()
+            if _is_email_taken(exc):
+                raise EmailAlreadyRegistredError() from exc
+            raise
+
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.User]:
+        query = paginate(
+            select(models.User), models.User, skip, limit, order_by, after
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def filter(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        **kwargs: Any,
+    ) -> List[models.User]:
+        query = paginate(
+            select(models.User).filter_by(**kwargs),
+            models.User,
+            skip,
+            limit,
+            order_by,
+            after,
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def count(self, estimate: bool = False) -> int:
+        if estimate and self.db.bind.dialect.name == 'postgresql':
+            result = await self.db.execute(estimate_query(models.User))
+            estimated = result.scalar()
+            if estimated is not None and estimated >= 0:
+                return estimated
+        result = await self.db.execute(count_query(models.User))
+        return result.scalar()
+
+    async def get(self, **kwargs: Any) -> Optional[models.User]:
+        result = await self.db.execute(select(models.User).filter_by(**kwargs))
+        return result.scalars().first()
+
+    async def update(self, obj: models.User) -> models.User:
+        await self._commit()
+        # values written as SQL expressions are expired by the flush, and
+        # an async session cannot load them lazily
+        expired = inspect(obj).expired_attributes
+        if expired:
+            await self.db.refresh(obj, attribute_names=list(expired))
+        return obj
+
+    async def remove(self, obj: models.User) -> None:
+        await self.db.delete(obj)
+        await self.db.commit()
+
+    def snapshot(self, obj: models.User) -> models.User:
+        return detached_copy(obj)
+
+    async def attach(self, obj: models.User) -> models.User:
+        return await self.db.merge(obj, load=False)
@@ -1,5 +1,12 @@
-from .project import ProjectIn, ProjectOut  # noqa: F401
-from .token import Token  # noqa: F401
+from .api_key import ApiKeyCreated, ApiKeyIn, ApiKeyOut  # noqa: F401
+from .project import (  # noqa: F401
+    ProjectBulkResult,
+    ProjectIn,
+    ProjectOut,
+    serialize_project_out,
+)
+from .serializers import Serializer, compile_serializer  # noqa: F401
+from .token import RefreshTokenIn, Token  # noqa: F401
 from .user import (  # noqa: F401
     SuperuserCreate,
     SuperuserUpdate,
@@ -7,4 +14,5 @@ from .user import (  # noqa: F401
     UserCreate,
     UserOut,
     UserUpdate,
+    serialize_user_out,
 )
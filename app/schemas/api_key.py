@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, constr
+
+
+class ApiKeyIn(BaseModel):
+    name: constr(strip_whitespace=True, min_length=1, max_length=100)
+
+
+class ApiKeyOut(BaseModel):
+    id: int
+    name: str
+    prefix: str
+    created_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ApiKeyCreated(ApiKeyOut):
+    key: str
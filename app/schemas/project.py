@@ -1,5 +1,8 @@
+from typing import Any, Dict, List, Optional
+
 from pydantic import BaseModel, HttpUrl
 
+from .serializers import compile_serializer
 from .user import UserOut
 
 
@@ -19,3 +22,13 @@ class ProjectOut(ProjectBase):
 
     class Config:
         orm_mode = True
+
+
+class ProjectBulkResult(BaseModel):
+    index: int
+    status: int
+    project: Optional[ProjectOut] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+serialize_project_out = compile_serializer(ProjectOut)
@@ -0,0 +1,34 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+
+Serializer = Callable[[Any], Dict[str, Any]]
+
+
+def _nested(get: Callable[[Any], Any], serialize: Serializer) -> Callable:
+    def get_nested(obj: Any) -> Any:
+        value = get(obj)
+        return None if value is None else serialize(value)
+
+    return get_nested
+
+
+def compile_serializer(model: Type[BaseModel]) -> Serializer:
+    # trusts the ORM values: they were validated on the way in
+    getters: List[Tuple[str, Callable[[Any], Any]]] = []
+    for name, field in model.__fields__.items():
+        if field.shape != SHAPE_SINGLETON:
+            raise TypeError(f'{model.__name__}.{name} is not a single value')
+        get = attrgetter(name)
+        if isinstance(field.type_, type) and issubclass(
+            field.type_, BaseModel
+        ):
+            get = _nested(get, compile_serializer(field.type_))
+        getters.append((field.alias, get))
+
+    def serialize(obj: Any) -> Dict[str, Any]:
+        return {key: get(obj) for key, get in getters}
+
+    return serialize
@@ -2,6 +2,8 @@ from typing import Optional
 
 from pydantic import BaseModel, EmailStr
 
+from .serializers import compile_serializer
+
 
 class UserBase(BaseModel):
     email: Optional[EmailStr]
@@ -34,3 +36,6 @@ class UserOut(UserBase):
 
     class Config:
         orm_mode = True
+
+
+serialize_user_out = compile_serializer(UserOut)
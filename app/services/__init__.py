@@ -1,4 +1,12 @@
-from .authentication import AuthenticationService  # noqa: F401
-from .project import ProjectService  # noqa: F401
+from .api_key import ApiKeyService, AsyncApiKeyService  # noqa: F401
+from .authentication import (  # noqa: F401
+    AsyncAuthenticationService,
+    AuthenticationService,
+)
+from .project import AsyncProjectService, ProjectService  # noqa: F401
+from .refresh_token import (  # noqa: F401
+    AsyncRefreshTokenService,
+    RefreshTokenService,
+)
 from .token import TokenService  # noqa: F401
-from .user import UserService  # noqa: F401
+from .user import AsyncUserService, UserService  # noqa: F401
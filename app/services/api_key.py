@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import Depends
+
+from app import schemas
+from app.core.security import (
+    check_api_key,
+    generate_api_key,
+    get_api_key_prefix,
+    hash_api_key,
+)
+from app.exceptions import (
+    AuthenticationError,
+    InactiveUserError,
+    NotFoundError,
+)
+from app.models import ApiKey, User
+from app.repositories import ApiKeyRepository, AsyncApiKeyRepository
+
+
+def _check_api_key(key: str, api_key: Optional[ApiKey]) -> User:
+    if api_key is None or not check_api_key(key, api_key.key_hash):
+        raise AuthenticationError('Invalid API key.')
+    if api_key.revoked_at is not None:
+        raise AuthenticationError('The API key has been revoked.')
+    if not api_key.user.is_active:
+        raise InactiveUserError()
+    return api_key.user
+
+
+def _new_api_key(payload: schemas.ApiKeyIn, user: User) -> Tuple[ApiKey, str]:
+    prefix, key = generate_api_key()
+    api_key = ApiKey(
+        name=payload.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+        user_id=user.id,
+    )
+    return api_key, key
+
+
+def _revoke(api_key: Optional[ApiKey]) -> ApiKey:
+    if api_key is None:
+        raise NotFoundError()
+    if api_key.revoked_at is None:
+        api_key.revoked_at = datetime.utcnow()
+    return api_key
+
+
+class ApiKeyService:
+    def __init__(self, repository: ApiKeyRepository = Depends()) -> None:
+        self.repository = repository
+
+    def create(
+        self, payload: schemas.ApiKeyIn, user: User
+    ) -> Tuple[ApiKey, str]:
+        api_key, key = _new_api_key(payload, user)
+        return self.repository.add(api_key), key
+
+    def list(self, user: User) -> List[ApiKey]:
+        return self.repository.filter(user_id=user.id)
+
+    def revoke(self, id: int, user: User) -> ApiKey:
+        api_key = _revoke(self.repository.get(id=id, user_id=user.id))
+        return self.repository.update(api_key)
+
+    def authenticate(self, key: str) -> User:
+        prefix = get_api_key_prefix(key)
+        if prefix is None:
+            raise AuthenticationError('Invalid API key.')
+        return _check_api_key(key, self.repository.get(prefix=prefix))
+
+    def purge(self, revoked_before: datetime) -> int:
+        return self.repository.purge(revoked_before)
+
+
+class AsyncApiKeyService:
+    def __init__(self, repository: AsyncApiKeyRepository = Depends()) -> None:
+        self.repository = repository
+
+    async def create(
+        self, payload: schemas.ApiKeyIn, user: User
+    ) -> Tuple[ApiKey, str]:
+        api_key, key = _new_api_key(payload, user)
+        return await self.repository.add(api_key), key
+
+    async def list(self, user: User) -> List[ApiKey]:
+        return await self.repository.filter(user_id=user.id)
+
+    async def revoke(self, id: int, user: User) -> ApiKey:
+        api_key = _revoke(await self.repository.get(id=id, user_id=user.id))
+        return await self.repository.update(api_key)
+
+    async def authenticate(self, key: str) -> User:
+        prefix = get_api_key_prefix(key)
+        if prefix is None:
+            raise AuthenticationError('Invalid API key.')
+        api_key = await self.repository.get(prefix=prefix)
+        return _check_api_key(key, api_key)
@@ -1,10 +1,45 @@
 from typing import Optional
 
 from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 
+from app.core.config import settings
+from app.core.rate_limit import LoginRateLimiter, build_rate_limiter
 from app.exceptions import AuthenticationError, InactiveUserError
 from app.models import User
-from app.repositories import Repository, UserRepository
+from app.repositories import (
+    AsyncRepository,
+    AsyncUserRepository,
+    Repository,
+    UserRepository,
+)
+
+login_rate_limiter = LoginRateLimiter(
+    build_rate_limiter(
+        settings.LOGIN_RATE_LIMIT_BACKEND,
+        namespace='login-attempts',
+        max_keys=settings.LOGIN_RATE_LIMIT_MAX_KEYS,
+        redis_url=settings.LOGIN_RATE_LIMIT_REDIS_URL,
+    ),
+    username_limit=(
+        settings.LOGIN_RATE_LIMIT_USERNAME_CAPACITY,
+        settings.LOGIN_RATE_LIMIT_USERNAME_REFILL_PER_SECOND,
+    ),
+    client_limit=(
+        settings.LOGIN_RATE_LIMIT_CLIENT_CAPACITY,
+        settings.LOGIN_RATE_LIMIT_CLIENT_REFILL_PER_SECOND,
+    ),
+    enabled=settings.LOGIN_RATE_LIMIT_ENABLED,
+)
+
+
+async def _verify(user: Optional[User], password: str) -> User:
+    # hashing is awaited, so no request thread waits on the hasher
+    if not user or not await user.verify_password_async(password):
+        raise AuthenticationError()
+    if not user.is_active:
+        raise InactiveUserError()
+    return user
 
 
 class AuthenticationService:
@@ -13,10 +48,42 @@ class AuthenticationService:
     ) -> None:
         self.user_repository = user_repository
 
-    def authenticate(self, username: str, password: str) -> User:
-        user: Optional[User] = self.user_repository.get(email=username)
-        if not user or not user.verify_password(password):
-            raise AuthenticationError()
-        if not user.is_active:
-            raise InactiveUserError()
+    async def authenticate(
+        self, username: str, password: str, client_host: Optional[str] = None
+    ) -> User:
+        # rejects bursts before they reach the password hasher
+        await run_in_threadpool(
+            login_rate_limiter.check, username, client_host
+        )
+        user = await _verify(
+            await run_in_threadpool(self.user_repository.get, email=username),
+            password,
+        )
+        if user.password_needs_update():
+            # the plain password is only known here, so upgrade it now
+            await user.set_password_async(password)
+            await run_in_threadpool(self.user_repository.update, user)
+        return user
+
+
+class AsyncAuthenticationService:
+    def __init__(
+        self,
+        user_repository: AsyncRepository = Depends(AsyncUserRepository),
+    ) -> None:
+        self.user_repository = user_repository
+
+    async def authenticate(
+        self, username: str, password: str, client_host: Optional[str] = None
+    ) -> User:
+        # the limiter may call redis synchronously, the database does not
+        await run_in_threadpool(
+            login_rate_limiter.check, username, client_host
+        )
+        user = await _verify(
+            await self.user_repository.get(email=username), password
+        )
+        if user.password_needs_update():
+            await user.set_password_async(password)
+            await self.user_repository.update(user)
         return user
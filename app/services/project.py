@@ -1,15 +1,133 @@
-from typing import List
+from typing import (
+    Any,
+    AsyncIterator,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
 
 from fastapi import Depends
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app import models, schemas
+from app.core.cache import build_cache
+from app.core.config import settings
+from app.core.export import Rows
+from app.core.pagination import Cursor
 from app.exceptions import NotFoundError
-from app.repositories import ProjectRepository, Repository
+from app.repositories import (
+    AsyncProjectRepository,
+    AsyncSearchableRepository,
+    ProjectRepository,
+    SearchableRepository,
+)
+
+project_cache = build_cache(
+    settings.PROJECT_CACHE_BACKEND,
+    namespace='projects',
+    max_size=settings.PROJECT_CACHE_MAX_SIZE,
+    ttl=settings.PROJECT_CACHE_TTL_SECONDS,
+    redis_url=settings.PROJECT_CACHE_REDIS_URL,
+)
+project_list_cache = build_cache(
+    settings.PROJECT_CACHE_BACKEND,
+    namespace='project-lists',
+    max_size=settings.PROJECT_CACHE_MAX_SIZE,
+    ttl=settings.PROJECT_CACHE_TTL_SECONDS,
+    redis_url=settings.PROJECT_CACHE_REDIS_URL,
+)
+project_owner_cache = build_cache(
+    settings.PROJECT_CACHE_BACKEND,
+    namespace='project-owners',
+    max_size=settings.PROJECT_CACHE_MAX_SIZE,
+    ttl=settings.PROJECT_CACHE_TTL_SECONDS,
+    redis_url=settings.PROJECT_CACHE_REDIS_URL,
+)
+
+PROJECT_CACHE_FIELDS = ('id', 'title', 'description', 'url', 'owner_id')
+
+
+def invalidate_project_cache(*ids: int) -> None:
+    # any write may move projects between pages, so lists always go
+    for id in ids:
+        project_cache.delete(str(id))
+    project_list_cache.clear()
+
+
+def invalidate_project_owner_cache(owner_id: int) -> None:
+    project_owner_cache.delete(str(owner_id))
+
+
+def _cache_entries(projects: List[models.Project]) -> List[Dict[str, Any]]:
+    # owners are cached apart, so a user write drops a single entry
+    # instead of every project and page that embeds it
+    for project in projects:
+        project_owner_cache.set(
+            str(project.owner_id), schemas.serialize_user_out(project.owner)
+        )
+    return [
+        {field: getattr(project, field) for field in PROJECT_CACHE_FIELDS}
+        for project in projects
+    ]
+
+
+def _restore_entries(
+    entries: List[Dict[str, Any]]
+) -> Optional[List[models.Project]]:
+    projects = []
+    for entry in entries:
+        owner = project_owner_cache.get(str(entry['owner_id']))
+        if owner is None:
+            return None
+        # transient copies that never join the session, so a stale entry
+        # can neither overwrite loaded rows nor flush against deleted ones
+        project = models.Project(**entry)
+        set_committed_value(project, 'owner', models.User(**owner))
+        projects.append(project)
+    return projects
+
+
+def _cached_project(id: int) -> Optional[models.Project]:
+    entry = project_cache.get(str(id))
+    if entry is None:
+        return None
+    projects = _restore_entries([entry])
+    return projects[0] if projects else None
+
+
+def _cache_project(project: models.Project) -> None:
+    project_cache.set(str(project.id), _cache_entries([project])[0])
+
+
+def _cached_list(key: str) -> Optional[List[models.Project]]:
+    entries = project_list_cache.get(key)
+    if entries is None:
+        return None
+    return _restore_entries(entries)
+
+
+def _cache_list(key: str, projects: List[models.Project]) -> None:
+    project_list_cache.set(key, _cache_entries(projects))
+
+
+COUNT_KEY = 'count'
+
+
+def _list_key(
+    skip: int,
+    limit: int,
+    order_by: str,
+    after: Optional[Cursor],
+    owner_id: Optional[int] = None,
+) -> str:
+    return repr((owner_id, skip, limit, order_by, after))
 
 
 class ProjectService:
     def __init__(
-        self, repository: Repository = Depends(ProjectRepository)
+        self, repository: SearchableRepository = Depends(ProjectRepository)
     ) -> None:
         self.repository = repository
 
@@ -18,20 +136,97 @@ class ProjectService:
     ) -> models.Project:
         fields = payload.dict()
         project = models.Project(**fields, owner_id=owner_id)
-        return self.repository.add(project)
+        project = self.repository.add(project)
+        project_list_cache.clear()
+        return project
+
+    def create_many(
+        self, payloads: List[schemas.ProjectIn], owner_id: int
+    ) -> List[models.Project]:
+        projects = [
+            models.Project(**payload.dict(), owner_id=owner_id)
+            for payload in payloads
+        ]
+        projects = self.repository.add_all(projects)
+        project_list_cache.clear()
+        return projects
 
-    def list(self, skip: int, limit: int) -> List[models.Project]:
-        return self.repository.list(skip, limit)
+    def export(self, batch_size: int) -> Iterator[Rows]:
+        return self.repository.stream(batch_size)
+
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        # cached pages hold whole projects, which also serve sparse fields
+        key = _list_key(skip, limit, order_by, after)
+        projects = _cached_list(key)
+        if projects is None:
+            projects = self.repository.list(
+                skip, limit, order_by, after, fields
+            )
+            if fields is None:
+                _cache_list(key, projects)
+        return projects
 
     def filter_by_owner(
-        self, skip: int, limit: int, owner_id: int
+        self,
+        skip: int,
+        limit: int,
+        owner_id: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.Project]:
+        key = _list_key(skip, limit, order_by, after, owner_id)
+        projects = _cached_list(key)
+        if projects is None:
+            projects = self.repository.filter(
+                skip, limit, order_by, after, owner_id=owner_id
+            )
+            _cache_list(key, projects)
+        return projects
+
+    def count(self) -> int:
+        # cached pages and the total are invalidated together
+        total = project_list_cache.get(COUNT_KEY)
+        if total is None:
+            total = self.repository.count(
+                estimate=settings.COUNT_ESTIMATE_ENABLED
+            )
+            project_list_cache.set(
+                COUNT_KEY, total, ttl=settings.COUNT_CACHE_TTL_SECONDS
+            )
+        return total
+
+    def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
     ) -> List[models.Project]:
-        return self.repository.filter(skip, limit, owner_id=owner_id)
+        return self.repository.search(terms, limit, after, fields)
 
-    def get_by_id(self, id: int) -> models.Project:
-        project = self.repository.get(id=id)
+    def get_by_id(
+        self,
+        id: int,
+        fields: Optional[Collection[str]] = None,
+        cached: bool = True,
+    ) -> models.Project:
+        # cached projects are read-only copies, writes ask for a loaded one
+        if cached:
+            project = _cached_project(id)
+            if project is not None:
+                return project
+        project = self.repository.get(fields, id=id)
         if not project:
             raise NotFoundError()
+        if cached and fields is None:
+            _cache_project(project)
         return project
 
     def update(
@@ -40,7 +235,133 @@ class ProjectService:
         fields = payload.dict(exclude_unset=True)
         for field, value in fields.items():
             setattr(project, field, value)
-        return self.repository.update(project)
+        project = self.repository.update(project)
+        invalidate_project_cache(project.id)
+        return project
 
     def delete(self, project: models.Project) -> None:
+        id = project.id
         self.repository.remove(project)
+        invalidate_project_cache(id)
+
+
+class AsyncProjectService:
+    def __init__(
+        self,
+        repository: AsyncSearchableRepository = Depends(
+            AsyncProjectRepository
+        ),
+    ) -> None:
+        self.repository = repository
+
+    async def create(
+        self, payload: schemas.ProjectIn, owner_id: int
+    ) -> models.Project:
+        fields = payload.dict()
+        project = models.Project(**fields, owner_id=owner_id)
+        project = await self.repository.add(project)
+        project_list_cache.clear()
+        return project
+
+    async def create_many(
+        self, payloads: List[schemas.ProjectIn], owner_id: int
+    ) -> List[models.Project]:
+        projects = [
+            models.Project(**payload.dict(), owner_id=owner_id)
+            for payload in payloads
+        ]
+        projects = await self.repository.add_all(projects)
+        project_list_cache.clear()
+        return projects
+
+    def export(self, batch_size: int) -> AsyncIterator[Rows]:
+        return self.repository.stream(batch_size)
+
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        # cached pages hold whole projects, which also serve sparse fields
+        key = _list_key(skip, limit, order_by, after)
+        projects = _cached_list(key)
+        if projects is None:
+            projects = await self.repository.list(
+                skip, limit, order_by, after, fields
+            )
+            if fields is None:
+                _cache_list(key, projects)
+        return projects
+
+    async def filter_by_owner(
+        self,
+        skip: int,
+        limit: int,
+        owner_id: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.Project]:
+        key = _list_key(skip, limit, order_by, after, owner_id)
+        projects = _cached_list(key)
+        if projects is None:
+            projects = await self.repository.filter(
+                skip, limit, order_by, after, owner_id=owner_id
+            )
+            _cache_list(key, projects)
+        return projects
+
+    async def count(self) -> int:
+        # cached pages and the total are invalidated together
+        total = project_list_cache.get(COUNT_KEY)
+        if total is None:
+            total = await self.repository.count(
+                estimate=settings.COUNT_ESTIMATE_ENABLED
+            )
+            project_list_cache.set(
+                COUNT_KEY, total, ttl=settings.COUNT_CACHE_TTL_SECONDS
+            )
+        return total
+
+    async def search(
+        self,
+        terms: str,
+        limit: int,
+        after: Optional[Cursor] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> List[models.Project]:
+        return await self.repository.search(terms, limit, after, fields)
+
+    async def get_by_id(
+        self,
+        id: int,
+        fields: Optional[Collection[str]] = None,
+        cached: bool = True,
+    ) -> models.Project:
+        if cached:
+            project = _cached_project(id)
+            if project is not None:
+                return project
+        project = await self.repository.get(fields, id=id)
+        if not project:
+            raise NotFoundError()
+        if cached and fields is None:
+            _cache_project(project)
+        return project
+
+    async def update(
+        self, project: models.Project, payload: schemas.ProjectIn
+    ) -> models.Project:
+        fields = payload.dict(exclude_unset=True)
+        for field, value in fields.items():
+            setattr(project, field, value)
+        project = await self.repository.update(project)
+        invalidate_project_cache(project.id)
+        return project
+
+    async def delete(self, project: models.Project) -> None:
+        id = project.id
+        await self.repository.remove(project)
+        invalidate_project_cache(id)
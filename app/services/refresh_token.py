@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import Depends
+
+from app.core.config import Settings, get_settings
+from app.core.security import generate_refresh_token, hash_refresh_token
+from app.exceptions import AuthenticationError, InactiveUserError
+from app.models import RefreshToken, User
+from app.repositories import (
+    AsyncRefreshTokenRepository,
+    AsyncTokenRepository,
+    RefreshTokenRepository,
+    TokenRepository,
+)
+
+
+def _new_refresh_token(
+    settings: Settings, user: User, issued_at: datetime
+) -> Tuple[RefreshToken, str]:
+    token = generate_refresh_token()
+    lifetime = timedelta(days=settings.REFRESH_TOKEN_EXPIRATION_DAYS)
+    refresh_token = RefreshToken(
+        token_hash=hash_refresh_token(token),
+        user_id=user.id,
+        token_version=user.token_version,
+        expires_at=issued_at + lifetime,
+    )
+    return refresh_token, token
+
+
+def _check_refresh_token(
+    refresh_token: Optional[RefreshToken], now: datetime
+) -> RefreshToken:
+    if refresh_token is None:
+        raise AuthenticationError('Invalid refresh token.')
+    if refresh_token.expires_at <= now:
+        raise AuthenticationError('The refresh token has expired.')
+    if refresh_token.token_version != refresh_token.user.token_version:
+        raise AuthenticationError('The refresh token has been revoked.')
+    if not refresh_token.user.is_active:
+        raise InactiveUserError()
+    return refresh_token
+
+
+class RefreshTokenService:
+    def __init__(
+        self,
+        repository: TokenRepository = Depends(RefreshTokenRepository),
+        settings: Settings = Depends(get_settings),
+    ) -> None:
+        self.repository = repository
+        self.settings = settings
+
+    def issue(self, user: User) -> str:
+        refresh_token, token = _new_refresh_token(
+            self.settings, user, datetime.utcnow()
+        )
+        self.repository.add(refresh_token)
+        return token
+
+    def rotate(self, token: str) -> Tuple[User, str]:
+        now = datetime.utcnow()
+        refresh_token = self.repository.get(
+            token_hash=hash_refresh_token(token)
+        )
+        if refresh_token is not None and refresh_token.revoked_at is not None:
+            # a rotated token came back, so its successor may be stolen
+            self.repository.revoke_all(refresh_token.user_id, now)
+            raise AuthenticationError('The refresh token has been revoked.')
+        refresh_token = _check_refresh_token(refresh_token, now)
+        if not self.repository.revoke(refresh_token, now):
+            raise AuthenticationError('The refresh token has been revoked.')
+        user = refresh_token.user
+        successor, new_token = _new_refresh_token(self.settings, user, now)
+        self.repository.add(successor)
+        return user, new_token
+
+    def purge(self, revoked_before: datetime) -> int:
+        return self.repository.purge(datetime.utcnow(), revoked_before)
+
+
+class AsyncRefreshTokenService:
+    def __init__(
+        self,
+        repository: AsyncTokenRepository = Depends(
+            AsyncRefreshTokenRepository
+        ),
+        settings: Settings = Depends(get_settings),
+    ) -> None:
+        self.repository = repository
+        self.settings = settings
+
+    async def issue(self, user: User) -> str:
+        refresh_token, token = _new_refresh_token(
+            self.settings, user, datetime.utcnow()
+        )
+        await self.repository.add(refresh_token)
+        return token
+
+    async def rotate(self, token: str) -> Tuple[User, str]:
+        now = datetime.utcnow()
+        refresh_token = await self.repository.get(
+            token_hash=hash_refresh_token(token)
+        )
+        if refresh_token is not None and refresh_token.revoked_at is not None:
+            # a rotated token came back, so its successor may be stolen
+            await self.repository.revoke_all(refresh_token.user_id, now)
+            raise AuthenticationError('The refresh token has been revoked.')
+        refresh_token = _check_refresh_token(refresh_token, now)
+        if not await self.repository.revoke(refresh_token, now):
+            raise AuthenticationError('The refresh token has been revoked.')
+        user = refresh_token.user
+        successor, new_token = _new_refresh_token(self.settings, user, now)
+        await self.repository.add(successor)
+        return user, new_token
@@ -1,12 +1,60 @@
+import hashlib
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Mapping
+from typing import Any, Dict, Mapping, Optional
 
 from fastapi import Depends
 from jose import jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 
-from app.core.config import Settings, get_settings
+from app.core.cache import TTLCache
+from app.core.config import Settings, get_settings, settings
 from app.exceptions.exceptions import AuthenticationError
+from app.models import User
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class VerifiedTokenCache(TTLCache):
+    signing_key: Optional[str] = None
+
+    def bind(self, secret_key: str, algorithm: str) -> None:
+        # tokens verified with a rotated key must be verified again
+        signing_key = _digest(f'{algorithm}:{secret_key}')
+        if signing_key != self.signing_key:
+            self.clear()
+            self.signing_key = signing_key
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+    token_version: int
+
+    @classmethod
+    def from_claims(cls, claims: Mapping) -> 'Principal':
+        try:
+            return cls(
+                id=claims['uid'],
+                email=claims['sub'],
+                is_active=claims['act'],
+                is_superuser=claims['su'],
+                token_version=claims['ver'],
+            )
+        except KeyError as exc:
+            raise AuthenticationError('Invalid token.') from exc
+
+
+token_cache = VerifiedTokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
 
 
 class TokenService:
@@ -26,7 +74,34 @@ class TokenService:
             self.settings.JWT_SIGNING_ALGORITHM,
         )
 
+    def user_claims(self, user: User) -> Dict[str, Any]:
+        claims: Dict[str, Any] = {'sub': user.email}
+        if self.settings.STATELESS_AUTH_ENABLED:
+            claims.update(
+                uid=user.id,
+                act=user.is_active,
+                su=user.is_superuser,
+                ver=user.token_version,
+            )
+        return claims
+
     def decode_access_token(self, token: str) -> Mapping:
+        token_cache.bind(
+            self.settings.SECRET_KEY, self.settings.JWT_SIGNING_ALGORITHM
+        )
+        key = _digest(token)
+        claims = token_cache.get(key)
+        if claims is not None:
+            return dict(claims)
+        claims = self._verify(token)
+        ttl = token_cache.ttl
+        if 'exp' in claims:
+            ttl = min(ttl, claims['exp'] - time.time())
+        if ttl > 0:
+            token_cache.set(key, claims, ttl=ttl)
+        return dict(claims)
+
+    def _verify(self, token: str) -> Mapping:
         try:
             return jwt.decode(
                 token,
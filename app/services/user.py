@@ -1,35 +1,127 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from fastapi import Depends
 
 from app import models, schemas
-from app.exceptions import EmailAlreadyRegistredError, NotFoundError
-from app.repositories import Repository, UserRepository
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.exceptions import (
+    AuthenticationError,
+    InactiveUserError,
+    NotFoundError,
+)
+from app.repositories import (
+    ApiKeyRepository,
+    AsyncApiKeyRepository,
+    AsyncRepository,
+    AsyncUserRepository,
+    Repository,
+    UserRepository,
+)
+
+from .project import (
+    COUNT_KEY,
+    invalidate_project_cache,
+    invalidate_project_owner_cache,
+)
+from .token import Principal
+
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+user_count_cache = TTLCache(max_size=1, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+token_version_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+REVOKING_FIELDS = ('email', 'password', 'is_active', 'is_superuser')
+
+
+def _revokes_tokens(user: models.User, fields: Dict[str, Any]) -> bool:
+    # passwords are hashed, so setting one always counts as a change
+    return any(
+        field == 'password' or getattr(user, field) != value
+        for field, value in fields.items()
+        if field in REVOKING_FIELDS
+    )
+
+
+def _check_token_version(principal: Principal, version: Optional[int]) -> None:
+    if version != principal.token_version:
+        raise AuthenticationError('The token has been revoked.')
+    if not principal.is_active:
+        raise InactiveUserError()
+
+
+def _hashed_fields(
+    fields: Dict[str, Any], hashed_password: Optional[str]
+) -> Dict[str, Any]:
+    # routes hash passwords off the request thread and pass the result on
+    if hashed_password is None or 'password' not in fields:
+        return fields
+    fields = {**fields, '_password': hashed_password}
+    del fields['password']
+    return fields
 
 
 class UserService:
     def __init__(
-        self, repository: Repository = Depends(UserRepository)
+        self,
+        repository: Repository = Depends(UserRepository),
+        api_key_repository: ApiKeyRepository = Depends(),
     ) -> None:
         self.repository = repository
+        self.api_key_repository = api_key_repository
 
-    def create(self, payload: schemas.UserCreate) -> models.User:
-        if self._email_exists(payload.email):
-            raise EmailAlreadyRegistredError()
-        fields = payload.dict()
-        user = models.User(**fields)
-        return self.repository.add(user)
+    def _bump_token_version(self, user: models.User) -> None:
+        # incremented in SQL: the user may come from the principal cache,
+        # and a stale version + 1 could bring revoked tokens back to life.
+        # keys are revoked with everything else the bump invalidates, the
+        # user update commits both
+        user.token_version = models.User.token_version + 1
+        self.api_key_repository.revoke_all(user.id, datetime.utcnow())
 
-    def _email_exists(self, email: str) -> bool:
-        return self.repository.get(email=email) is not None
+    def create(
+        self,
+        payload: schemas.UserCreate,
+        hashed_password: Optional[str] = None,
+    ) -> models.User:
+        fields = _hashed_fields(payload.dict(), hashed_password)
+        user = models.User(**fields)
+        user = self.repository.add(user)
+        user_count_cache.clear()
+        return user
 
     def change_password(self, username: str, new_password: str) -> None:
         user = self.get_by_email(email=username)
         user.password = new_password
+        self._bump_token_version(user)
         self.repository.update(user)
+        principal_cache.delete(username)
+        token_version_cache.delete(user.id)
+        invalidate_project_owner_cache(user.id)
 
-    def list(self, skip: int, limit: int) -> List[models.User]:
-        return self.repository.list(skip, limit)
+    def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.User]:
+        return self.repository.list(skip, limit, order_by, after)
+
+    def count(self) -> int:
+        total = user_count_cache.get(COUNT_KEY)
+        if total is None:
+            total = self.repository.count(
+                estimate=settings.COUNT_ESTIMATE_ENABLED
+            )
+            user_count_cache.set(COUNT_KEY, total)
+        return total
 
     def get_by_id(self, id: int) -> models.User:
         user = self.repository.get(id=id)
@@ -43,29 +135,179 @@ class UserService:
             raise NotFoundError()
         return user
 
+    def get_principal(self, email: str) -> models.User:
+        cached_user = principal_cache.get(email)
+        if cached_user is not None:
+            return self.repository.attach(cached_user)
+        user = self.get_by_email(email)
+        principal_cache.set(email, self.repository.snapshot(user))
+        return user
+
+    def check_token_principal(self, principal: Principal) -> Principal:
+        version = token_version_cache.get(principal.id)
+        if version is None:
+            user = self.repository.get(id=principal.id)
+            version = user.token_version if user else None
+            if version is not None:
+                token_version_cache.set(principal.id, version)
+        _check_token_version(principal, version)
+        return principal
+
     def update_by_id(
-        self, id: int, payload: schemas.UserUpdate
+        self,
+        id: int,
+        payload: schemas.UserUpdate,
+        hashed_password: Optional[str] = None,
     ) -> models.User:
         user = self.get_by_id(id)
-        return self.update(user, payload)
+        return self.update(user, payload, hashed_password)
 
     def update(
-        self, user: models.User, payload: schemas.UserUpdate
+        self,
+        user: models.User,
+        payload: schemas.UserUpdate,
+        hashed_password: Optional[str] = None,
     ) -> models.User:
-        if (
-            payload.email is not None
-            and payload.email != user.email
-            and self._email_exists(payload.email)
-        ):
-            raise EmailAlreadyRegistredError()
+        email = user.email
         fields = payload.dict(exclude_unset=True)
+        if _revokes_tokens(user, fields):
+            self._bump_token_version(user)
+        fields = _hashed_fields(fields, hashed_password)
         for field, value in fields.items():
             setattr(user, field, value)
-        return self.repository.update(user)
+        user = self.repository.update(user)
+        principal_cache.delete(email)
+        token_version_cache.delete(user.id)
+        invalidate_project_owner_cache(user.id)
+        return user
 
     def delete_by_id(self, id: int) -> None:
         user = self.get_by_id(id)
         self.delete(user)
 
     def delete(self, user: models.User) -> None:
+        id, email = user.id, user.email
+        # the delete cascade loads the projects anyway
+        project_ids = [project.id for project in user.projects]
         self.repository.remove(user)
+        principal_cache.delete(email)
+        token_version_cache.delete(id)
+        user_count_cache.clear()
+        invalidate_project_owner_cache(id)
+        invalidate_project_cache(*project_ids)
+
+
+class AsyncUserService:
+    def __init__(
+        self,
+        repository: AsyncRepository = Depends(AsyncUserRepository),
+        api_key_repository: AsyncApiKeyRepository = Depends(),
+    ) -> None:
+        self.repository = repository
+        self.api_key_repository = api_key_repository
+
+    async def _bump_token_version(self, user: models.User) -> None:
+        user.token_version = models.User.token_version + 1
+        await self.api_key_repository.revoke_all(user.id, datetime.utcnow())
+
+    async def create(
+        self,
+        payload: schemas.UserCreate,
+        hashed_password: Optional[str] = None,
+    ) -> models.User:
+        fields = _hashed_fields(payload.dict(), hashed_password)
+        user = models.User(**fields)
+        user = await self.repository.add(user)
+        user_count_cache.clear()
+        return user
+
+    async def list(
+        self,
+        skip: int,
+        limit: int,
+        order_by: str = 'id',
+        after: Optional[Cursor] = None,
+    ) -> List[models.User]:
+        return await self.repository.list(skip, limit, order_by, after)
+
+    async def count(self) -> int:
+        total = user_count_cache.get(COUNT_KEY)
+        if total is None:
+            total = await self.repository.count(
+                estimate=settings.COUNT_ESTIMATE_ENABLED
+            )
+            user_count_cache.set(COUNT_KEY, total)
+        return total
+
+    async def get_by_id(self, id: int) -> models.User:
+        user = await self.repository.get(id=id)
+        if not user:
+            raise NotFoundError()
+        return user
+
+    async def get_by_email(self, email: str) -> models.User:
+        user = await self.repository.get(email=email)
+        if not user:
+            raise NotFoundError()
+        return user
+
+    async def get_principal(self, email: str) -> models.User:
+        cached_user = principal_cache.get(email)
+        if cached_user is not None:
+            return await self.repository.attach(cached_user)
+        user = await self.get_by_email(email)
+        principal_cache.set(email, self.repository.snapshot(user))
+        return user
+
+    async def check_token_principal(self, principal: Principal) -> Principal:
+        version = token_version_cache.get(principal.id)
+        if version is None:
+            user = await self.repository.get(id=principal.id)
+            version = user.token_version if user else None
+            if version is not None:
+                token_version_cache.set(principal.id, version)
+        _check_token_version(principal, version)
+        return principal
+
+    async def update_by_id(
+        self,
+        id: int,
+        payload: schemas.UserUpdate,
+        hashed_password: Optional[str] = None,
+    ) -> models.User:
+        user = await self.get_by_id(id)
+        return await self.update(user, payload, hashed_password)
+
+    async def update(
+        self,
+        user: models.User,
+        payload: schemas.UserUpdate,
+        hashed_password: Optional[str] = None,
+    ) -> models.User:
+        email = user.email
+        fields = payload.dict(exclude_unset=True)
+        if _revokes_tokens(user, fields):
+            await self._bump_token_version(user)
+        fields = _hashed_fields(fields, hashed_password)
+        for field, value in fields.items():
+            setattr(user, field, value)
+        user = await self.repository.update(user)
+        principal_cache.delete(email)
+        token_version_cache.delete(user.id)
+        invalidate_project_owner_cache(user.id)
+        return user
+
+    async def delete_by_id(self, id: int) -> None:
+        user = await self.get_by_id(id)
+        await self.delete(user)
+
+    async def delete(self, user: models.User) -> None:
+        id, email = user.id, user.email
+        await self.repository.remove(user)
+        # the delete cascade loaded them, no lazy load happens here
+        project_ids = [project.id for project in user.projects]
+        principal_cache.delete(email)
+        token_version_cache.delete(id)
+        user_count_cache.clear()
+        invalidate_project_owner_cache(id)
+        invalidate_project_cache(*project_ids)
@@ -1,8 +1,9 @@
 import typer
 
-from app.commands import users, utils
+from app.commands import tokens, users, utils
 
 app = typer.Typer()
+app.add_typer(tokens.app, name='tokens')
 app.add_typer(users.app, name='users')
 app.add_typer(utils.app, name='utils')
 
@@ -28,6 +28,22 @@ target_metadata = Base.metadata
 # override database url
 config.set_main_option('sqlalchemy.url', settings.DATABASE_URL)
 
+# created by raw DDL in the search migration, so they are not in the
+# metadata and autogenerate would otherwise propose dropping them
+SEARCH_TABLE_PREFIX = 'projects_search'
+SEARCH_INDEXES = {'ix_projects_search_vector'}
+SEARCH_COLUMNS = {('projects', 'search_vector')}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table':
+        return not name.startswith(SEARCH_TABLE_PREFIX)
+    if type_ == 'index':
+        return name not in SEARCH_INDEXES
+    if type_ == 'column':
+        return (object.table.name, name) not in SEARCH_COLUMNS
+    return True
+
 
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
@@ -45,6 +61,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -68,7 +85,9 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
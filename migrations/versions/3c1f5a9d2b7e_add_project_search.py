@@ -0,0 +1,86 @@
+"""Add project search
+
+Revision ID: 3c1f5a9d2b7e
+Revises: 94791844faee
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c1f5a9d2b7e'
+down_revision = '94791844faee'
+branch_labels = None
+depends_on = None
+
+# a frozen copy: the model keeps its own for create_all, and editing that
+# one must not rewrite what this revision already applied
+SEARCH_DDL = {
+    'postgresql': [
+        """
+        ALTER TABLE projects ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        """
+        CREATE INDEX ix_projects_search_vector ON projects
+        USING gin (search_vector)
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE projects_search USING fts5(
+            title, description, content='projects', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER projects_search_insert AFTER INSERT ON projects
+        BEGIN
+            INSERT INTO projects_search (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER projects_search_delete AFTER DELETE ON projects
+        BEGIN
+            INSERT INTO projects_search
+                (projects_search, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER projects_search_update AFTER UPDATE ON projects
+        BEGIN
+            INSERT INTO projects_search
+                (projects_search, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO projects_search (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """,
+    ],
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in SEARCH_DDL.get(dialect, []):
+        op.execute(statement)
+    if dialect == 'sqlite':
+        op.execute(
+            "INSERT INTO projects_search (projects_search) VALUES ('rebuild')"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_projects_search_vector', table_name='projects')
+        op.drop_column('projects', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER projects_search_update')
+        op.execute('DROP TRIGGER projects_search_delete')
+        op.execute('DROP TRIGGER projects_search_insert')
+        op.execute('DROP TABLE projects_search')
@@ -0,0 +1,32 @@
+"""Add users token version
+
+Revision ID: 5d2e7f9a4c18
+Revises: 8e4b2c6a1f03
+Create Date: 2026-10-18 14:02:45.113208
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5d2e7f9a4c18'
+down_revision = '8e4b2c6a1f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'users',
+        sa.Column(
+            'token_version',
+            sa.Integer(),
+            nullable=False,
+            server_default='0',
+        ),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
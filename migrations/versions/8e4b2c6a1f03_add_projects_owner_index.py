@@ -0,0 +1,27 @@
+"""Add projects owner index
+
+Revision ID: 8e4b2c6a1f03
+Revises: 3c1f5a9d2b7e
+Create Date: 2026-10-18 11:40:07.918254
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2c6a1f03'
+down_revision = '3c1f5a9d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_projects_owner_id_id',
+        'projects',
+        ['owner_id', 'id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_projects_owner_id_id', table_name='projects')
@@ -0,0 +1,51 @@
+"""Add refresh tokens
+
+Revision ID: a7c3e1d9b546
+Revises: 5d2e7f9a4c18
+Create Date: 2026-10-18 15:21:09.604732
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e1d9b546'
+down_revision = '5d2e7f9a4c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('token_version', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_token_hash'),
+        'refresh_tokens',
+        ['token_hash'],
+        unique=True,
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_user_id'),
+        'refresh_tokens',
+        ['user_id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens'
+    )
+    op.drop_index(
+        op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens'
+    )
+    op.drop_table('refresh_tokens')
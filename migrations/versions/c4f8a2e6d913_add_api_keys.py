@@ -0,0 +1,42 @@
+"""Add API keys
+
+Revision ID: c4f8a2e6d913
+Revises: a7c3e1d9b546
+Create Date: 2026-10-18 17:42:31.218406
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c4f8a2e6d913'
+down_revision = 'a7c3e1d9b546'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'api_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('prefix', sa.String(length=16), nullable=True),
+        sa.Column('key_hash', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_api_keys_prefix'), 'api_keys', ['prefix'], unique=True
+    )
+    op.create_index(
+        op.f('ix_api_keys_user_id'), 'api_keys', ['user_id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_api_keys_user_id'), table_name='api_keys')
+    op.drop_index(op.f('ix_api_keys_prefix'), table_name='api_keys')
+    op.drop_table('api_keys')
@@ -1,6 +1,9 @@
 import pytest
 from fastapi import status
 
+from app.exceptions import PasswordHashingBusyError
+from app.services.authentication import login_rate_limiter
+
 
 @pytest.fixture
 def url(settings):
@@ -41,3 +44,68 @@ def test_login_access_token_should_return_403_if_user_is_inactive(
     }
     response = client.post(url, data=payload)
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_login_access_token_should_return_503_if_password_hasher_is_busy(
+    client, url, user, mocker
+):
+    mocker.patch(
+        'app.core.security.password_hasher.verify',
+        side_effect=PasswordHashingBusyError(),
+    )
+    payload = {
+        'username': 'user@mail.com',
+        'password': '123456',
+    }
+    response = client.post(url, data=payload)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+
+
+@pytest.fixture
+def refresh_url(settings):
+    return f'{settings.API_PREFIX}/auth/refresh'
+
+
+def test_login_access_token_should_return_a_refresh_token(client, url, user):
+    payload = {'username': 'user@mail.com', 'password': '123456'}
+    response = client.post(url, data=payload)
+    assert response.json().get('refresh_token')
+
+
+def test_refresh_access_token_should_rotate_the_refresh_token(
+    client, url, refresh_url, user, settings
+):
+    payload = {'username': 'user@mail.com', 'password': '123456'}
+    refresh_token = client.post(url, data=payload).json()['refresh_token']
+    response = client.post(refresh_url, json={'refresh_token': refresh_token})
+    tokens = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert tokens['refresh_token'] != refresh_token
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+    me_url = f'{settings.API_PREFIX}{settings.API_V1_PREFIX}/users/me'
+    assert client.get(me_url, headers=headers).json()['id'] == user.id
+
+
+def test_refresh_access_token_should_return_401_if_token_was_used(
+    client, url, refresh_url, user
+):
+    payload = {'username': 'user@mail.com', 'password': '123456'}
+    refresh_token = client.post(url, data=payload).json()['refresh_token']
+    client.post(refresh_url, json={'refresh_token': refresh_token})
+    response = client.post(refresh_url, json={'refresh_token': refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_access_token_should_return_429_before_hashing_on_a_burst(
+    client, url, user, mocker
+):
+    mocker.patch.object(login_rate_limiter, 'username_limit', (2, 0.01))
+    payload = {'username': 'user@mail.com', 'password': 'wrong-password'}
+    for _ in range(2):
+        client.post(url, data=payload)
+    verify = mocker.patch('app.core.security.password_hasher.verify')
+    response = client.post(url, data=payload)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers['Retry-After'] == '100'
+    assert not verify.called
@@ -0,0 +1,34 @@
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def url(settings):
+    return f'{settings.API_PREFIX}/metrics/'
+
+
+def test_retrieve_should_return_metrics_if_current_user_is_a_superuser(
+    client, url, get_user_authorization_headers, superuser
+):
+    headers = get_user_authorization_headers(
+        username=superuser.email, password='123456'
+    )
+    response = client.get(url, headers=headers)
+    content = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert content['principal_cache']['misses'] >= 1
+    assert set(content['project_cache']) == {'items', 'lists', 'owners'}
+    assert 'database_pool' in content
+    assert content['token_cache']['misses'] >= 1
+    assert 'password_hasher' in content
+    assert content['login_rate_limiter']['admitted'] >= 1
+
+
+def test_retrieve_should_return_403_if_current_user_is_not_a_superuser(
+    client, url, get_user_authorization_headers, user
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,37 @@
+import json
+
+from fastapi import Response
+
+from app.api.responses import serialize_all, serialize_conditional
+
+
+def sub_response() -> Response:
+    response = Response()
+    del response.headers['content-length']
+    return response
+
+
+def test_serialize_all_should_keep_repeated_headers():
+    response = sub_response()
+    response.set_cookie('first', '1')
+    response.set_cookie('second', '2')
+    json_response = serialize_all([1, 2], lambda value: value, response)
+    cookies = [
+        value
+        for key, value in json_response.raw_headers
+        if key == b'set-cookie'
+    ]
+    assert len(cookies) == 2
+    assert json.loads(json_response.body) == [1, 2]
+
+
+def test_serialize_conditional_should_return_304_if_etag_matches():
+    json_response = serialize_conditional(
+        {'id': 1}, lambda value: value, sub_response(), None
+    )
+    etag = json_response.headers['ETag']
+    not_modified = serialize_conditional(
+        {'id': 1}, lambda value: value, sub_response(), etag
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == etag
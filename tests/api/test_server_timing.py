@@ -0,0 +1,103 @@
+import logging
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import schemas
+from app.core.config import get_settings
+from app.core.timing import (
+    ServerTiming,
+    ServerTimingMiddleware,
+    instrument_engine,
+    uninstrument_engine,
+)
+from app.database import generate_db_session
+from app.main import app
+
+
+@pytest.fixture
+def timed_client(db, db_session, settings):
+    app.dependency_overrides[generate_db_session] = lambda: db_session
+    app.dependency_overrides[get_settings] = lambda: settings
+    instrument_engine(db)
+    with TestClient(ServerTimingMiddleware(app)) as test_client:
+        yield test_client
+    uninstrument_engine(db)
+
+
+@pytest.fixture
+def me_url(settings):
+    return f'{settings.API_PREFIX}{settings.API_V1_PREFIX}/users/me'
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(', '):
+        name, duration = metric.split(';dur=')
+        metrics[name] = float(duration)
+    return metrics
+
+
+def test_server_timing_should_report_each_phase_of_a_request(
+    timed_client, me_url, get_user_authorization_headers, user, caplog
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    with caplog.at_level(logging.INFO, logger='uvicorn'):
+        response = timed_client.get(me_url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    metrics = parse_server_timing(response.headers['Server-Timing'])
+    assert set(metrics) == {'auth', 'db', 'handler', 'serialization', 'total'}
+    assert metrics['total'] >= metrics['auth'] + metrics['handler']
+    record = next(r for r in caplog.records if r.msg == 'server timing')
+    assert record.path == me_url
+    assert record.status_code == status.HTTP_200_OK
+    assert record.db_queries == 1
+    assert record.total_ms == metrics['total']
+
+
+def test_server_timing_should_time_serialization_once(
+    timed_client, me_url, get_user_authorization_headers, user, mocker
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    add = mocker.spy(ServerTiming, 'add')
+    response = timed_client.get(f'{me_url}/projects', headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    phases = [call.args[1] for call in add.call_args_list]
+    assert phases.count('serialization') == 1
+
+
+def test_server_timing_should_book_rendering_as_serialization(
+    timed_client, me_url, get_user_authorization_headers, user, mocker
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    serialize_user_out = schemas.serialize_user_out
+
+    def slow_serialize_user_out(obj):
+        time.sleep(0.05)
+        return serialize_user_out(obj)
+
+    mocker.patch(
+        'app.schemas.serialize_user_out', side_effect=slow_serialize_user_out
+    )
+    response = timed_client.get(me_url, headers=headers)
+    metrics = parse_server_timing(response.headers['Server-Timing'])
+    assert metrics['serialization'] >= 50
+    assert metrics['handler'] < 50
+
+
+def test_server_timing_should_be_absent_when_disabled(
+    client, me_url, get_user_authorization_headers, user
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    response = client.get(me_url, headers=headers)
+    assert 'Server-Timing' not in response.headers
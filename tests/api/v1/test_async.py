@@ -0,0 +1,352 @@
+import pytest
+from fastapi import APIRouter, FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import async_auth
+from app.api import async_router as async_api_router
+from app.api import auth
+from app.api.v1 import (
+    async_projects,
+    async_router,
+    async_users,
+    override_routes,
+    projects,
+    users,
+)
+from app.core.config import get_settings
+from app.core.security import generate_api_key, hash_api_key
+from app.database import AsyncSessionLocal, generate_async_db_session
+from app.exceptions import register_exception_handlers
+from app.models import ApiKey, Project, User
+from app.services import TokenService
+from app.services.project import _cached_project
+
+
+@pytest.fixture
+def async_client(async_db, settings):
+    app = FastAPI()
+    app.include_router(async_router, prefix=settings.API_PREFIX)
+    app.include_router(async_auth.router, prefix=settings.API_PREFIX)
+    register_exception_handlers(app)
+
+    async def generate_test_async_db_session():
+        async with AsyncSessionLocal(bind=async_db) as db:
+            yield db
+
+    app.dependency_overrides[
+        generate_async_db_session
+    ] = generate_test_async_db_session
+    app.dependency_overrides[get_settings] = lambda: settings
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def async_project(async_db_engines) -> Project:
+    engine, _ = async_db_engines
+    with Session(bind=engine, expire_on_commit=False) as db:
+        user = User(email='user@mail.com', password='123456')
+        project = Project(
+            title='Project1',
+            description='My project',
+            url='http://myproject.com',
+            owner=user,
+        )
+        db.add(project)
+        db.commit()
+    return project
+
+
+@pytest.fixture
+def async_superuser(async_db_engines, settings) -> User:
+    engine, _ = async_db_engines
+    with Session(bind=engine, expire_on_commit=False) as db:
+        user = User(
+            email=settings.DEFAULT_SUPERUSER_EMAIL,
+            password='123456',
+            is_superuser=True,
+        )
+        db.add(user)
+        db.commit()
+    return user
+
+
+@pytest.fixture
+def headers(settings):
+    token = TokenService(settings).generate_access_token(
+        {'sub': 'user@mail.com'}
+    )
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def base_url(settings):
+    return f'{settings.API_PREFIX}{settings.API_V1_PREFIX}'
+
+
+def test_override_routes_should_replace_routes_with_same_path_and_method(
+    settings,
+):
+    router = APIRouter(prefix=settings.API_V1_PREFIX)
+    router.include_router(users.router)
+    override_routes(router, async_router)
+    endpoints = {route.name: route.endpoint for route in router.routes}
+    assert endpoints['retrieve_logged'] is async_users.retrieve_logged
+    assert endpoints['register'] is async_users.register
+
+
+def test_override_routes_should_leave_no_route_on_the_sync_engine(settings):
+    router = APIRouter(prefix=settings.API_PREFIX)
+    router.include_router(auth.router)
+    v1_router = APIRouter(prefix=settings.API_V1_PREFIX)
+    v1_router.include_router(users.router)
+    v1_router.include_router(projects.router)
+    router.include_router(v1_router)
+    override_routes(router, async_api_router)
+    v1_async_router = APIRouter(prefix=settings.API_PREFIX)
+    v1_async_router.include_router(async_router)
+    override_routes(router, v1_async_router)
+    modules = {route.endpoint.__module__ for route in router.routes}
+    assert modules == {
+        async_auth.__name__,
+        async_users.__name__,
+        async_projects.__name__,
+    }
+
+
+def test_async_list_all_should_return_a_list_of_projects(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(f'{base_url}/projects/', headers=headers)
+    content = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in content] == [async_project.id]
+    assert content[0]['owner']['email'] == 'user@mail.com'
+
+
+def test_async_retrieve_should_return_404_if_project_does_not_exist(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(f'{base_url}/projects/999', headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_create_should_create_a_new_project(
+    async_client, base_url, headers, async_project
+):
+    payload = {
+        'title': 'New Project',
+        'description': 'An awesome new project',
+        'url': 'https://newproject.com',
+    }
+    response = async_client.post(
+        f'{base_url}/projects/', headers=headers, json=payload
+    )
+    content = response.json()
+    assert response.status_code == status.HTTP_201_CREATED
+    assert content['owner']['id'] == async_project.owner_id
+
+
+def test_async_retrieve_logged_should_return_the_current_user(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(f'{base_url}/users/me', headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['id'] == async_project.owner_id
+
+
+def test_async_export_should_stream_projects_as_ndjson(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(f'{base_url}/projects/export', headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        'id': async_project.id,
+        'title': 'Project1',
+        'description': 'My project',
+        'url': 'http://myproject.com',
+        'owner_id': async_project.owner_id,
+    }
+
+
+def test_async_retrieve_should_return_304_if_project_etag_matches(
+    async_client, base_url, headers, async_project
+):
+    url = f'{base_url}/projects/{async_project.id}'
+    etag = async_client.get(url, headers=headers).headers['ETag']
+    response = async_client.get(
+        url, headers={**headers, 'If-None-Match': etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_async_search_should_return_matching_projects(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(
+        f'{base_url}/projects/search?q=project', headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in response.json()] == [async_project.id]
+
+
+def test_async_list_logged_projects_should_return_own_projects(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(
+        f'{base_url}/users/me/projects', headers=headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in response.json()] == [async_project.id]
+
+
+def test_async_list_all_should_return_only_the_requested_fields(
+    async_client, base_url, headers, async_project
+):
+    response = async_client.get(
+        f'{base_url}/projects/?fields=title&expand=owner', headers=headers
+    )
+    content = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert set(content[0]) == {'title', 'owner'}
+    assert content[0]['owner']['email'] == 'user@mail.com'
+
+
+def test_async_retrieve_logged_should_accept_an_api_key(
+    async_client, base_url, async_db_engines, async_project
+):
+    engine, _ = async_db_engines
+    prefix, key = generate_api_key()
+    with Session(bind=engine) as db:
+        api_key = ApiKey(
+            name='ci',
+            prefix=prefix,
+            key_hash=hash_api_key(key),
+            user_id=async_project.owner_id,
+        )
+        db.add(api_key)
+        db.commit()
+    headers = {'Authorization': f'Bearer {key}'}
+    response = async_client.get(f'{base_url}/users/me', headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['id'] == async_project.owner_id
+
+
+def _login(client, settings, username, password='123456'):
+    return client.post(
+        f'{settings.API_PREFIX}/auth/token',
+        data={'username': username, 'password': password},
+    )
+
+
+def test_async_login_should_issue_tokens_that_rotate(
+    async_client, settings, async_project
+):
+    response = _login(async_client, settings, 'user@mail.com')
+    assert response.status_code == status.HTTP_200_OK
+    refresh_token = response.json()['refresh_token']
+    url = f'{settings.API_PREFIX}/auth/refresh'
+    response = async_client.post(url, json={'refresh_token': refresh_token})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['refresh_token'] != refresh_token
+    response = async_client.post(url, json={'refresh_token': refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_async_register_should_create_user(async_client, base_url, settings):
+    payload = {'email': 'new@mail.com', 'password': '123456'}
+    response = async_client.post(f'{base_url}/users/', json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['email'] == 'new@mail.com'
+    response = async_client.post(f'{base_url}/users/', json=payload)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert _login(async_client, settings, 'new@mail.com').status_code == 200
+
+
+def test_async_update_logged_should_revoke_tokens_and_api_keys(
+    async_client, base_url, settings, headers, async_project
+):
+    url = f'{base_url}/users/me/api-keys'
+    response = async_client.post(url, headers=headers, json={'name': 'ci'})
+    assert response.status_code == status.HTTP_201_CREATED
+    key_headers = {'Authorization': f'Bearer {response.json()["key"]}'}
+    response = async_client.put(
+        f'{base_url}/users/me',
+        headers=headers,
+        json={'first_name': 'New', 'password': '654321'},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['first_name'] == 'New'
+    response = async_client.get(f'{base_url}/users/me', headers=key_headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    listed = async_client.get(url, headers=headers).json()
+    assert listed[0]['revoked_at'] is not None
+    response = _login(async_client, settings, 'user@mail.com', '654321')
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_async_api_keys_should_be_revoked_and_not_manage_the_account(
+    async_client, base_url, headers, async_project
+):
+    url = f'{base_url}/users/me/api-keys'
+    content = async_client.post(
+        url, headers=headers, json={'name': 'ci'}
+    ).json()
+    key_headers = {'Authorization': f'Bearer {content["key"]}'}
+    for method, path in [('get', url), ('put', f'{base_url}/users/me')]:
+        response = async_client.request(
+            method, path, headers=key_headers, json={'first_name': 'x'}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = async_client.delete(f'{url}/{content["id"]}', headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = async_client.get(f'{base_url}/users/me', headers=key_headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_async_delete_logged_should_delete_the_user_and_their_projects(
+    async_client, base_url, headers, async_project
+):
+    url = f'{base_url}/projects/{async_project.id}'
+    assert async_client.get(url, headers=headers).status_code == 200
+    response = async_client.delete(f'{base_url}/users/me', headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert _cached_project(async_project.id) is None
+    response = async_client.get(f'{base_url}/users/me', headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_superuser_should_update_and_delete_users(
+    async_client, base_url, settings, async_project, async_superuser
+):
+    token = _login(
+        async_client, settings, settings.DEFAULT_SUPERUSER_EMAIL
+    ).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'{base_url}/users/{async_project.owner_id}'
+    response = async_client.put(
+        url, headers=headers, json={'is_active': False}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['is_active'] is False
+    response = async_client.delete(url, headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = async_client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_create_many_should_create_the_valid_projects(
+    async_client, base_url, headers, async_project
+):
+    payload = [
+        {'title': 'First', 'description': 'One', 'url': 'http://one.com'},
+        {'title': 'Second'},
+    ]
+    response = async_client.post(
+        f'{base_url}/projects/bulk', headers=headers, json=payload
+    )
+    content = response.json()
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert [item['status'] for item in content] == [201, 422]
+    assert content[0]['project']['owner']['email'] == 'user@mail.com'
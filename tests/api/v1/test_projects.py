@@ -1,5 +1,14 @@
+import csv
+import io
+import json
+
 import pytest
 from fastapi import status
+from fastapi.encoders import jsonable_encoder
+
+from app import schemas
+from app.core.pagination import Cursor, encode_cursor
+from app.services.project import invalidate_project_cache
 
 
 @pytest.fixture
@@ -107,6 +116,42 @@ def test_retrieve_should_retrieve_a_project_if_exists(
     assert content['id'] == project.id
 
 
+def test_retrieve_should_return_304_if_project_etag_matches(
+    client, base_url, get_user_authorization_headers, project
+):
+    url = f'{base_url}/{project.id}'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert response.content == b''
+
+
+def test_retrieve_should_return_the_project_if_etag_is_stale(
+    client, base_url, get_user_authorization_headers, project
+):
+    url = f'{base_url}/{project.id}'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    payload = {
+        'title': 'Updated Project',
+        'description': 'An updated project',
+        'url': 'https://updatedproject.com',
+    }
+    client.put(url, headers=headers, json=payload)
+    headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['ETag'] != etag
+    assert response.json()['title'] == 'Updated Project'
+
+
 def test_retrieve_should_return_404_if_project_does_not_exist(
     client, base_url, get_user_authorization_headers, user
 ):
@@ -303,3 +348,513 @@ def test_delete_should_raise_404_if_project_does_not_exist(
     )
     response = client.delete(url, headers=headers)
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_all_should_load_project_owners_in_a_single_query(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    projects,
+    assert_num_queries,
+    db_session,
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    client.get(url, headers=headers)
+    invalidate_project_cache()
+    db_session.expire_all()
+    with assert_num_queries(1):
+        response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == len(projects)
+
+
+def test_list_all_should_serve_repeated_requests_from_cache(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    projects,
+    assert_num_queries,
+    db_session,
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    expected = client.get(url, headers=headers).json()
+    db_session.expire_all()
+    with assert_num_queries(0):
+        response = client.get(url, headers=headers)
+    assert response.json() == expected
+
+
+def test_retrieve_should_load_project_owner_in_a_single_query(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    project,
+    assert_num_queries,
+    db_session,
+):
+    url = f'{base_url}/{project.id}'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    client.get(url, headers=headers)
+    invalidate_project_cache(project.id)
+    db_session.expire_all()
+    with assert_num_queries(1):
+        response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_retrieve_should_serve_repeated_requests_from_cache(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    project,
+    assert_num_queries,
+    db_session,
+):
+    url = f'{base_url}/{project.id}'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    expected = client.get(url, headers=headers).json()
+    db_session.expire_all()
+    with assert_num_queries(0):
+        response = client.get(url, headers=headers)
+    assert response.json() == expected
+
+
+def test_list_all_should_paginate_projects_with_a_cursor(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?limit=2'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    first_page = client.get(url, headers=headers)
+    cursor = first_page.headers['X-Next-Cursor']
+    second_page = client.get(f'{url}&cursor={cursor}', headers=headers)
+    ids = [project['id'] for project in first_page.json()]
+    ids += [project['id'] for project in second_page.json()]
+    assert second_page.status_code == status.HTTP_200_OK
+    assert 'X-Next-Cursor' not in second_page.headers
+    assert ids == [project.id for project in projects]
+
+
+def test_list_all_should_paginate_projects_ordered_by_title(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?limit=1&order_by=title'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    titles = []
+    while url:
+        response = client.get(url, headers=headers)
+        titles += [project['title'] for project in response.json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        url = cursor and f'{base_url}/?limit=1&order_by=title&cursor={cursor}'
+    assert titles == sorted(project.title for project in projects)
+
+
+def test_list_all_should_return_400_if_cursor_is_invalid(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?cursor=invalid'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'Invalid pagination cursor.'
+
+
+def test_list_all_should_return_400_if_cursor_position_has_wrong_type(
+    client, base_url, get_user_authorization_headers, projects
+):
+    cursor = encode_cursor(Cursor('title', None, 1))
+    url = f'{base_url}/?order_by=title&cursor={cursor}'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_create_should_insert_project_in_a_single_round_trip(
+    client, base_url, get_user_authorization_headers, user, assert_num_queries
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    client.get(f'{base_url}/?limit=1', headers=headers)
+    payload = {
+        'title': 'New Project',
+        'description': 'An awesome new project',
+        'url': 'https://newproject.com',
+    }
+    with assert_num_queries(1) as statements:
+        response = client.post(url, headers=headers, json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert statements[0].startswith('INSERT INTO projects')
+    assert response.json()['owner']['id'] == user.id
+
+
+def test_create_many_should_create_projects_in_the_given_order(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/bulk'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    payload = [
+        {
+            'title': f'Project {number}',
+            'description': 'An awesome new project',
+            'url': f'https://project{number}.com',
+        }
+        for number in range(3)
+    ]
+    response = client.post(url, headers=headers, json=payload)
+    content = response.json()
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [result['index'] for result in content] == [0, 1, 2]
+    assert all(result['status'] == 201 for result in content)
+    projects = [result['project'] for result in content]
+    assert [project['title'] for project in projects] == [
+        item['title'] for item in payload
+    ]
+    assert all(project['owner']['id'] == user.id for project in projects)
+    assert len({project['id'] for project in projects}) == 3
+
+
+def test_create_many_should_report_invalid_items_and_create_the_others(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/bulk'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    payload = [
+        {
+            'title': 'Valid',
+            'description': 'A valid project',
+            'url': 'https://valid.com',
+        },
+        {'description': 'A project without title', 'url': 'https://a.com'},
+    ]
+    response = client.post(url, headers=headers, json=payload)
+    created, invalid = response.json()
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert created['index'] == 0
+    assert created['status'] == status.HTTP_201_CREATED
+    assert created['project']['title'] == 'Valid'
+    assert invalid['index'] == 1
+    assert invalid['status'] == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert invalid['project'] is None
+    assert invalid['errors'][0]['loc'] == ['title']
+    response = client.get(f'{base_url}/', headers=headers)
+    assert [project['title'] for project in response.json()] == ['Valid']
+
+
+def test_create_many_should_return_422_if_batch_is_too_large(
+    client, base_url, get_user_authorization_headers, settings, user
+):
+    url = f'{base_url}/bulk'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    project = {
+        'title': 'Project',
+        'description': 'An awesome new project',
+        'url': 'https://project.com',
+    }
+    payload = [project] * (settings.PROJECTS_BULK_MAX_SIZE + 1)
+    response = client.post(url, headers=headers, json=payload)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()['detail'][0]['type'] == (
+        'value_error.list.max_items'
+    )
+
+
+def test_create_many_should_return_401_if_credentials_are_invalid(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/bulk'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='wrong-password'
+    )
+    payload = [
+        {
+            'title': 'Project',
+            'description': 'An awesome project',
+            'url': 'https://project.com',
+        }
+    ]
+    response = client.post(url, headers=headers, json=payload)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_export_should_stream_projects_as_ndjson(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/export'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['id'] for line in lines] == [
+        project.id for project in projects
+    ]
+
+
+def test_export_should_stream_projects_as_csv(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/export?format=csv'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['title'] for row in rows] == [
+        project.title for project in projects
+    ]
+
+
+def test_export_should_compress_the_stream_if_client_accepts_gzip(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/export'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    headers['Accept-Encoding'] = 'gzip'
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.text.splitlines()) == len(projects)
+
+
+def test_export_should_return_401_if_credentials_are_invalid(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/export'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='wrong-password'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_search_should_return_matching_projects(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/search?q=third'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in response.json()] == [projects[2].id]
+
+
+def test_search_should_paginate_results_with_a_cursor(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/search?q=project&limit=2'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    first_page = client.get(url, headers=headers)
+    cursor = first_page.headers['X-Next-Cursor']
+    second_page = client.get(f'{url}&cursor={cursor}', headers=headers)
+    ids = [p['id'] for p in first_page.json() + second_page.json()]
+    assert sorted(ids) == sorted(project.id for project in projects)
+    assert 'X-Next-Cursor' not in second_page.headers
+
+
+def test_search_should_return_422_if_query_is_missing(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/search'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_list_all_should_send_the_total_count_if_requested(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?limit=1&include_total=true'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['X-Total-Count'] == str(len(projects))
+    assert (
+        'X-Total-Count'
+        not in client.get(f'{base_url}/', headers=headers).headers
+    )
+
+
+def test_count_all_should_send_only_the_total_count(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.head(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['X-Total-Count'] == str(len(projects))
+    assert response.content == b''
+
+
+def test_count_all_should_be_refreshed_after_a_project_is_created(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    client.head(url, headers=headers)
+    payload = {
+        'title': 'New Project',
+        'description': 'An awesome new project',
+        'url': 'https://newproject.com',
+    }
+    client.post(url, headers=headers, json=payload)
+    response = client.head(url, headers=headers)
+    assert response.headers['X-Total-Count'] == str(len(projects) + 1)
+
+
+def test_count_all_should_return_401_if_not_authenticated(client, base_url):
+    # the test client chokes on error bodies sent to HEAD, so don't read it
+    response = client.head(f'{base_url}/', stream=True)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_list_all_should_return_only_the_requested_fields(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?fields=id,title'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {'id': project.id, 'title': project.title} for project in projects
+    ]
+
+
+def test_list_all_should_select_only_the_requested_columns(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    projects,
+    assert_num_queries,
+):
+    url = f'{base_url}/?fields=id,title'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    client.get(url, headers=headers)
+    with assert_num_queries(1) as statements:
+        client.get(url, headers=headers)
+    assert 'projects.description' not in statements[0]
+    assert 'users' not in statements[0]
+
+
+def test_list_all_should_expand_the_owner_of_sparse_projects(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/?fields=title&expand=owner'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    content = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert set(content[0]) == {'title', 'owner'}
+    assert content[0]['owner']['id'] == projects[0].owner_id
+
+
+def test_list_all_should_return_400_if_expand_is_given_without_fields(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/?expand=owner'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'expand requires fields.'
+
+
+def test_list_all_should_return_400_if_fields_are_unknown(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/?fields=id,password'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'password' in response.json()['detail']
+
+
+def test_retrieve_should_return_only_the_requested_fields(
+    client, base_url, get_user_authorization_headers, project
+):
+    url = f'{base_url}/{project.id}?fields=url'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {'url': project.url}
+    headers['If-None-Match'] = response.headers['ETag']
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_search_should_return_only_the_requested_fields(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/search?q=third&fields=id'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{'id': projects[2].id}]
+
+
+def test_list_all_should_emit_the_same_json_as_the_response_model(
+    client, base_url, get_user_authorization_headers, projects
+):
+    url = f'{base_url}/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    expected = jsonable_encoder(
+        [schemas.ProjectOut.from_orm(project) for project in projects]
+    )
+    assert response.json() == expected
@@ -1,6 +1,8 @@
 import pytest
 from fastapi import status
 
+from app.services.user import principal_cache
+
 
 @pytest.fixture
 def base_url(settings) -> str:
@@ -26,6 +28,17 @@ def test_register_should_create_user(client, base_url):
     assert content['is_superuser'] is False
 
 
+def test_register_should_insert_the_hashed_user_in_one_statement(
+    client, base_url, assert_num_queries
+):
+    url = f'{base_url}/users/'
+    payload = {'email': 'user@mail.com', 'password': '123456'}
+    with assert_num_queries(1) as statements:
+        response = client.post(url, json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert statements[0].startswith('INSERT INTO users')
+
+
 def test_register_should_return_409_if_email_has_taken(client, base_url, user):
     url = f'{base_url}/users/'
     payload = {
@@ -82,6 +95,22 @@ def test_list_all_should_allow_to_limit_the_number_of_users_returned(
     assert len(content) == limit_of_users_returned
 
 
+def test_list_all_should_paginate_users_with_a_cursor(
+    client, base_url, get_user_authorization_headers, users
+):
+    url = f'{base_url}/users/?limit=2&order_by=email'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    first_page = client.get(url, headers=headers)
+    cursor = first_page.headers['X-Next-Cursor']
+    second_page = client.get(f'{url}&cursor={cursor}', headers=headers)
+    emails = [user['email'] for user in first_page.json()]
+    emails += [user['email'] for user in second_page.json()]
+    assert second_page.status_code == status.HTTP_200_OK
+    assert emails == sorted(user.email for user in users)
+
+
 def test_list_all_should_return_401_if_credentials_are_invalid(
     client, base_url, get_user_authorization_headers, user
 ):
@@ -126,6 +155,35 @@ def test_retrieve_logged_should_return_the_current_user(
     assert content['is_superuser'] == user.is_superuser
 
 
+def test_retrieve_logged_should_return_304_if_etag_matches(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/users/me'
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+
+
+def test_retrieve_logged_should_change_etag_when_user_is_updated(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/users/me'
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    client.put(url, headers=headers, json={'first_name': 'Changed'})
+    headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['first_name'] == 'Changed'
+
+
 def test_retrieve_logged_should_return_401_if_credentials_are_invalid(
     client, base_url, get_user_authorization_headers, user
 ):
@@ -162,6 +220,22 @@ def test_update_logged_should_update_the_current_user(
     assert content['is_active'] == user.is_active
 
 
+def test_update_logged_should_update_user_in_a_single_round_trip(
+    client, base_url, get_user_authorization_headers, user, assert_num_queries
+):
+    url = f'{base_url}/users/me'
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    client.get(url, headers=headers)
+    payload = {'first_name': 'New First Name'}
+    with assert_num_queries(1) as statements:
+        response = client.put(url, headers=headers, json=payload)
+    assert response.status_code == status.HTTP_200_OK
+    assert statements[0].startswith('UPDATE users')
+    assert response.json()['first_name'] == payload['first_name']
+
+
 def test_update_logged_should_allow_partial_update_of_user_data(
     client, base_url, get_user_authorization_headers, user
 ):
@@ -267,6 +341,39 @@ def test_retrieve_should_return_a_user_if_current_user_is_a_superuser(
     assert content['is_superuser'] == user.is_superuser
 
 
+def test_retrieve_should_return_304_if_user_etag_matches(
+    client, base_url, get_user_authorization_headers, user, superuser
+):
+    url = f'{base_url}/users/{user.id}'
+    headers = get_user_authorization_headers(
+        username=superuser.email, password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_retrieve_should_keep_the_etag_when_only_the_password_changes(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    user,
+    superuser,
+    user_repository,
+):
+    url = f'{base_url}/users/{user.id}'
+    headers = get_user_authorization_headers(
+        username=superuser.email, password='123456'
+    )
+    etag = client.get(url, headers=headers).headers['ETag']
+    user.password = 'new-password'
+    user_repository.update(user)
+    response = client.get(url, headers=headers)
+    assert response.headers['ETag'] == etag
+    assert etag.startswith('W/')
+
+
 def test_retrieve_should_return_401_if_credentials_are_invalid(
     client, base_url, get_user_authorization_headers, user, superuser
 ):
@@ -438,3 +545,260 @@ def test_delete_should_return_404_if_user_does_not_exist(
     content = response.json()
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert content['detail'] == 'Not found.'
+
+
+def test_list_logged_projects_should_return_only_own_projects(
+    client, base_url, get_user_authorization_headers, users, projects
+):
+    url = f'{base_url}/users/me/projects'
+    headers = get_user_authorization_headers(
+        username='user2@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in response.json()] == [
+        projects[1].id,
+        projects[2].id,
+    ]
+
+
+def test_list_logged_projects_should_paginate_with_a_cursor(
+    client, base_url, get_user_authorization_headers, users, projects
+):
+    url = f'{base_url}/users/me/projects?limit=1'
+    headers = get_user_authorization_headers(
+        username='user2@mail.com', password='123456'
+    )
+    first_page = client.get(url, headers=headers)
+    cursor = first_page.headers['X-Next-Cursor']
+    second_page = client.get(f'{url}&cursor={cursor}', headers=headers)
+    assert [project['id'] for project in second_page.json()] == [
+        projects[2].id
+    ]
+
+
+def test_list_logged_projects_should_return_401_if_not_authenticated(
+    client, base_url
+):
+    response = client.get(f'{base_url}/users/me/projects')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_list_projects_should_return_projects_of_the_given_user(
+    client, base_url, get_user_authorization_headers, users, projects
+):
+    url = f'{base_url}/users/{users[0].id}/projects'
+    headers = get_user_authorization_headers(
+        username='user2@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [project['id'] for project in response.json()] == [projects[0].id]
+
+
+def test_list_projects_should_return_403_if_current_user_is_not_superuser(
+    client, base_url, get_user_authorization_headers, users, projects
+):
+    url = f'{base_url}/users/{users[0].id}/projects'
+    headers = get_user_authorization_headers(
+        username='user3@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_list_projects_should_return_404_if_user_does_not_exist(
+    client, base_url, get_user_authorization_headers, users
+):
+    url = f'{base_url}/users/999/projects'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_count_all_should_send_the_number_of_users(
+    client, base_url, get_user_authorization_headers, users
+):
+    url = f'{base_url}/users/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    response = client.head(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['X-Total-Count'] == str(len(users))
+
+
+def test_list_all_should_refresh_the_total_count_after_a_registration(
+    client, base_url, get_user_authorization_headers, users
+):
+    url = f'{base_url}/users/?include_total=true'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    client.get(url, headers=headers)
+    payload = {'email': 'new@mail.com', 'password': '123456'}
+    client.post(f'{base_url}/users/', json=payload)
+    response = client.get(url, headers=headers)
+    assert response.headers['X-Total-Count'] == str(len(users) + 1)
+
+
+def test_count_all_should_return_403_if_current_user_is_not_superuser(
+    client, base_url, get_user_authorization_headers, users
+):
+    url = f'{base_url}/users/'
+    headers = get_user_authorization_headers(
+        username='user3@mail.com', password='123456'
+    )
+    response = client.head(url, headers=headers, stream=True)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.fixture
+def stateless_auth(settings, mocker):
+    mocker.patch.object(settings, 'STATELESS_AUTH_ENABLED', True)
+
+
+def test_stateless_auth_should_authorize_reads_without_auth_queries(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    stateless_auth,
+    projects,
+    assert_num_queries,
+):
+    url = f'{base_url}/projects/'
+    headers = get_user_authorization_headers(
+        username='user1@mail.com', password='123456'
+    )
+    client.get(url, headers=headers)
+    principal_cache.clear()
+    with assert_num_queries(0):
+        response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_stateless_auth_should_return_the_full_logged_user(
+    client, base_url, get_user_authorization_headers, stateless_auth, user
+):
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(f'{base_url}/users/me', headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['email'] == user.email
+
+
+def test_stateless_auth_should_reject_tokens_after_a_password_change(
+    client, base_url, get_user_authorization_headers, stateless_auth, user
+):
+    url = f'{base_url}/users/me'
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    client.put(url, headers=headers, json={'password': '654321'})
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_stateless_auth_should_forbid_non_superusers(
+    client, base_url, get_user_authorization_headers, stateless_auth, user
+):
+    headers = get_user_authorization_headers(
+        username='user@mail.com', password='123456'
+    )
+    response = client.get(f'{base_url}/users/', headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_api_keys_should_authenticate_requests_until_revoked(
+    client, base_url, get_user_authorization_headers, user
+):
+    url = f'{base_url}/users/me/api-keys'
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    response = client.post(url, headers=headers, json={'name': 'ci'})
+    content = response.json()
+    assert response.status_code == status.HTTP_201_CREATED
+    assert content['name'] == 'ci'
+    key_headers = {'Authorization': f'Bearer {content["key"]}'}
+    response = client.get(f'{base_url}/users/me', headers=key_headers)
+    assert response.json()['id'] == user.id
+    listed = client.get(url, headers=headers).json()
+    assert [api_key['id'] for api_key in listed] == [content['id']]
+    assert 'key' not in listed[0]
+    response = client.delete(f'{url}/{content["id"]}', headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.get(f'{base_url}/users/me', headers=key_headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    'method, path',
+    [
+        ('post', '/users/me/api-keys'),
+        ('get', '/users/me/api-keys'),
+        ('delete', '/users/me/api-keys/{id}'),
+        ('put', '/users/me'),
+        ('delete', '/users/me'),
+    ],
+)
+def test_api_keys_should_not_manage_the_account(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    user,
+    user_service,
+    method,
+    path,
+):
+    headers = get_user_authorization_headers(
+        username=user.email, password='123456'
+    )
+    response = client.post(
+        f'{base_url}/users/me/api-keys', headers=headers, json={'name': 'ci'}
+    )
+    content = response.json()
+    key_headers = {'Authorization': f'Bearer {content["key"]}'}
+    response = client.request(
+        method,
+        f'{base_url}{path.format(id=content["id"])}',
+        headers=key_headers,
+        json={'name': 'other', 'first_name': 'Other', 'password': '654321'},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert user_service.get_by_id(user.id).first_name == user.first_name
+    listed = client.get(
+        f'{base_url}/users/me/api-keys', headers=headers
+    ).json()
+    assert [(k['id'], k['revoked_at']) for k in listed] == [
+        (content['id'], None)
+    ]
+
+
+@pytest.mark.parametrize('method', ['put', 'delete'])
+def test_api_keys_should_not_manage_accounts_as_a_superuser(
+    client,
+    base_url,
+    get_user_authorization_headers,
+    superuser,
+    user_service,
+    method,
+):
+    headers = get_user_authorization_headers(
+        username=superuser.email, password='123456'
+    )
+    response = client.post(
+        f'{base_url}/users/me/api-keys', headers=headers, json={'name': 'ci'}
+    )
+    key_headers = {'Authorization': f'Bearer {response.json()["key"]}'}
+    response = client.request(
+        method,
+        f'{base_url}/users/{superuser.id}',
+        headers=key_headers,
+        json={'password': 'hacked'},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert user_service.get_by_id(superuser.id).verify_password('123456')
@@ -0,0 +1,34 @@
+import pytest
+from typer.testing import CliRunner
+
+from app.repositories import ApiKeyRepository, RefreshTokenRepository
+from app.services import ApiKeyService, RefreshTokenService
+from manage import app as manage_command
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def token_services(db_session, settings):
+    return (
+        RefreshTokenService(RefreshTokenRepository(db_session), settings),
+        ApiKeyService(ApiKeyRepository(db_session)),
+    )
+
+
+@pytest.fixture
+def mock_get_token_services(mocker, token_services):
+    mocker.patch(
+        'app.commands.tokens.get_token_services', return_value=token_services
+    )
+
+
+def test_purge_should_report_what_it_deleted(
+    mock_get_token_services, token_services, user, mocker
+):
+    refresh_token_service, api_key_service = token_services
+    mocker.patch.object(refresh_token_service, 'purge', return_value=3)
+    mocker.patch.object(api_key_service, 'purge', return_value=1)
+    result = runner.invoke(manage_command, ['tokens', 'purge'])
+    assert result.exit_code == 0
+    assert 'Purged 3 refresh tokens and 1 API keys.' in result.output
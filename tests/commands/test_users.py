@@ -56,7 +56,7 @@ def test_createsuperuser_should_raise_an_error_if_email_format_is_invalid(
     result = runner.invoke(manage_command, cli_args)
     assert 'Failed to create superuser' in result.output
     assert 'email: value is not a valid email address' in result.output
-    assert user_service._email_exists(invalid_email) is False
+    assert user_service.repository.get(email=invalid_email) is None
 
 
 def test_createsuperuser_should_raise_an_error_if_email_already_exists(
@@ -73,7 +73,7 @@ def test_createsuperuser_should_raise_an_error_if_email_already_exists(
     ]
     result = runner.invoke(manage_command, cli_args)
     assert 'User with this email already exists' in result.output
-    assert user_service._email_exists(superuser_email) is True
+    assert user_service.repository.get(email=superuser_email) is not None
 
 
 def test_changepassword_should_change_user_password(
@@ -108,4 +108,4 @@ def test_changepassword_should_raise_an_error_if_user_email_does_not_exist(
     ]
     result = runner.invoke(manage_command, cli_args)
     assert f'User with email {user_email!r} does not exist' in result.output
-    assert user_service._email_exists(user_email) is False
+    assert user_service.repository.get(email=user_email) is None
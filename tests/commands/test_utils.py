@@ -13,3 +13,21 @@ def test_gensecretkey_should_return_a_random_hexadecimal_token(
     cli_args = ['utils', 'gensecretkey']
     result = runner.invoke(manage_command, cli_args)
     assert token in result.output
+
+
+def test_benchmark_json_should_time_every_response_backend():
+    cli_args = ['utils', 'benchmark-json', '--items', '2', '--rounds', '1']
+    result = runner.invoke(manage_command, cli_args)
+    assert result.exit_code == 0
+    assert 'json (pydantic): ' in result.output
+    assert 'orjson (trusted): ' in result.output
+
+
+def test_calibrate_hashing_should_print_the_rounds_to_configure(mocker):
+    mocker.patch(
+        'app.commands.utils.calibrate_rounds', return_value=(12, 0.24)
+    )
+    cli_args = ['utils', 'calibrate-hashing', '--scheme', 'bcrypt']
+    result = runner.invoke(manage_command, cli_args)
+    assert 'bcrypt: 12 rounds verify in 240.0 ms' in result.output
+    assert 'PASSWORD_HASHING_ROUNDS=12' in result.output
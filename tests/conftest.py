@@ -1,14 +1,37 @@
-from typing import List
+from contextlib import contextmanager
+from typing import Callable, List
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from app.core.config import Settings
-from app.database import SessionLocal
+from app.core.security import configure_password_context
+from app.database import SessionLocal, enforce_sqlite_foreign_keys
 from app.models import Base, Project, User
-from app.repositories import ProjectRepository, UserRepository
+from app.repositories import (
+    ApiKeyRepository,
+    ProjectRepository,
+    UserRepository,
+)
 from app.services import UserService
+from app.services.authentication import login_rate_limiter
+from app.services.project import (
+    project_cache,
+    project_list_cache,
+    project_owner_cache,
+)
+from app.services.token import token_cache
+from app.services.user import (
+    principal_cache,
+    token_version_cache,
+    user_count_cache,
+)
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK TO')
 
 
 @pytest.fixture(scope='session')
@@ -17,9 +40,16 @@ def settings():
         SECRET_KEY='secret',
         DATABASE_URL='sqlite:///./test.db?check_same_thread=False',
         DEFAULT_SUPERUSER_EMAIL='admin@mail.com',
+        # bcrypt at its real cost used to dominate the suite's run time
+        PASSWORD_HASHING_PROFILE='unsafe-fast',
     )
 
 
+@pytest.fixture(scope='session', autouse=True)
+def password_context(settings):
+    configure_password_context(settings)
+
+
 @pytest.fixture(scope='session')
 def db(settings):
     engine = create_engine(settings.DATABASE_URL)
@@ -27,16 +57,101 @@ def db(settings):
         drop_database(engine.url)
     create_database(engine.url)
     Base.metadata.create_all(engine)
+    enforce_sqlite_foreign_keys(engine)
+
+    # https://docs.sqlalchemy.org/en/14/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin_transaction(connection):
+        connection.exec_driver_sql('BEGIN')
+
     yield engine
     drop_database(engine.url)
 
 
+@pytest.fixture(scope='session')
+def async_db_engines():
+    url = make_url('sqlite:///./test_async.db')
+    engine = create_engine(url)
+    if database_exists(url):
+        drop_database(url)
+    create_database(url)
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(
+        url.set(drivername='sqlite+aiosqlite'), poolclass=NullPool
+    )
+    yield engine, async_engine
+    drop_database(url)
+
+
+@pytest.fixture
+def async_db(async_db_engines):
+    engine, async_engine = async_db_engines
+    yield async_engine
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def assert_num_queries(db) -> Callable:
+    @contextmanager
+    def _assert_num_queries(expected: int, engine: Engine = db):
+        statements: List[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            # transaction control comes from the db_session fixture
+            if not statement.startswith(TRANSACTION_STATEMENTS):
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(
+                engine, 'before_cursor_execute', before_cursor_execute
+            )
+        assert len(statements) == expected, '\n'.join(statements)
+
+    return _assert_num_queries
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    caches = (
+        principal_cache,
+        project_cache,
+        project_list_cache,
+        project_owner_cache,
+        user_count_cache,
+        token_cache,
+        token_version_cache,
+        login_rate_limiter,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
 @pytest.fixture
 def db_session(db):
     # https://docs.sqlalchemy.org/en/14/orm/session_transaction.html#joining-a-session-into-an-external-transaction-such-as-for-test-suites
     connection = db.connect()
     transaction = connection.begin()
     session = SessionLocal(bind=connection)
+    nested = connection.begin_nested()
+
+    @event.listens_for(session, 'after_transaction_end')
+    def restart_savepoint(session, transaction):
+        nonlocal nested
+        if not nested.is_active:
+            nested = connection.begin_nested()
+
     yield session
     session.close()
     transaction.rollback()
@@ -148,5 +263,5 @@ def projects(project_repository, users) -> List[Project]:
 
 
 @pytest.fixture
-def user_service(user_repository):
-    return UserService(user_repository)
+def user_service(user_repository, db_session):
+    return UserService(user_repository, ApiKeyRepository(db_session))
@@ -0,0 +1,117 @@
+from app.core.cache import RedisCache, TTLCache, build_cache
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_should_return_cached_value():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    assert cache.hits == 1
+
+
+def test_get_should_count_a_miss_if_key_does_not_exist():
+    cache = TTLCache(max_size=2, ttl=10)
+    assert cache.get('key') is None
+    assert cache.misses == 1
+
+
+def test_get_should_expire_entries_after_ttl():
+    timer = FakeTimer()
+    cache = TTLCache(max_size=2, ttl=10, timer=timer)
+    cache.set('key', 'value')
+    timer.now = 10
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_set_should_evict_least_recently_used_entry():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.evictions == 1
+
+
+def test_set_should_do_nothing_if_cache_is_disabled():
+    cache = TTLCache(max_size=0, ttl=10)
+    cache.set('key', 'value')
+    assert cache.get('key') is None
+
+
+def test_delete_should_remove_entry():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set('key', 'value')
+    cache.delete('key')
+    assert cache.get('key') is None
+
+
+def test_stats_should_report_hit_ratio():
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set('key', 'value')
+    cache.get('key')
+    cache.get('other')
+    assert cache.stats()['hit_ratio'] == 0.5
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, px):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip('*')
+        return [key for key in self.store if key.startswith(prefix)]
+
+    def info(self, section):
+        return {'evicted_keys': 3}
+
+
+def test_redis_cache_should_store_json_values_under_its_namespace():
+    client = FakeRedis()
+    cache = RedisCache(None, 'projects', ttl=10, client=client)
+    cache.set('1', {'title': 'Project1'})
+    assert client.store == {'projects:1': '{"title": "Project1"}'}
+    assert cache.get('1') == {'title': 'Project1'}
+    assert cache.get('2') is None
+    assert cache.stats() == {
+        'backend': 'redis',
+        'hits': 1,
+        'misses': 1,
+        'evictions': 3,
+        'hit_ratio': 0.5,
+    }
+
+
+def test_redis_cache_clear_should_only_remove_its_namespace():
+    client = FakeRedis()
+    projects = RedisCache(None, 'projects', ttl=10, client=client)
+    lists = RedisCache(None, 'project-lists', ttl=10, client=client)
+    projects.set('1', 'project')
+    lists.set('1', ['project'])
+    lists.clear()
+    assert projects.get('1') == 'project'
+    assert lists.get('1') is None
+
+
+def test_build_cache_should_return_an_in_process_cache_by_default():
+    cache = build_cache('memory', 'projects', max_size=2, ttl=10)
+    assert isinstance(cache, TTLCache)
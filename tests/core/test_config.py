@@ -7,3 +7,25 @@ def test_normalize_database_dialect(mocker):
     mocker.patch.dict(os.environ, {'DATABASE_URL': 'postgres://'})
     settings = Settings()
     assert settings.DATABASE_URL == 'postgresql://'
+
+
+def test_derive_async_database_url(mocker):
+    mocker.patch.dict(
+        os.environ, {'DATABASE_URL': 'postgres://user:pass@db/pet_projects'}
+    )
+    settings = Settings()
+    assert settings.ASYNC_DATABASE_URL == (
+        'postgresql+asyncpg://user:pass@db/pet_projects'
+    )
+
+
+def test_explicit_async_database_url_is_not_derived(mocker):
+    mocker.patch.dict(
+        os.environ,
+        {
+            'DATABASE_URL': 'sqlite:///./db.sqlite',
+            'ASYNC_DATABASE_URL': 'sqlite+aiosqlite:///./other.sqlite',
+        },
+    )
+    settings = Settings()
+    assert settings.ASYNC_DATABASE_URL == 'sqlite+aiosqlite:///./other.sqlite'
@@ -0,0 +1,35 @@
+from app.core.etag import compute_etag, etag_matches
+
+
+def test_compute_etag_should_be_stable_for_the_same_content():
+    content = {'id': 1, 'email': 'user@mail.com'}
+    assert compute_etag(content) == compute_etag(
+        {'email': 'user@mail.com', 'id': 1}
+    )
+
+
+def test_compute_etag_should_change_when_the_content_changes():
+    content = {'id': 1, 'email': 'user@mail.com', 'first_name': None}
+    etag = compute_etag(content)
+    content['first_name'] = 'User'
+    assert compute_etag(content) != etag
+
+
+def test_compute_etag_should_change_when_nested_content_changes():
+    content = {'id': 1, 'owner': {'id': 1, 'email': 'user@mail.com'}}
+    etag = compute_etag(content)
+    content['owner']['email'] = 'owner@mail.com'
+    assert compute_etag(content) != etag
+
+
+def test_compute_etag_should_return_a_weak_quoted_tag():
+    etag = compute_etag({'id': 1})
+    assert etag.startswith('W/"') and etag.endswith('"')
+
+
+def test_etag_matches_should_compare_against_every_given_tag():
+    assert etag_matches('"a", W/"b"', 'W/"b"')
+    assert etag_matches('"b"', 'W/"b"')
+    assert etag_matches('*', 'W/"b"')
+    assert not etag_matches('W/"a"', 'W/"b"')
+    assert not etag_matches(None, 'W/"b"')
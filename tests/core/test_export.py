@@ -0,0 +1,38 @@
+import asyncio
+
+from app.core.export import encode_rows, encode_rows_async
+
+ROWS = [
+    {'id': 1, 'title': 'Project1', 'url': 'http://myproject1.com'},
+    {'id': 2, 'title': 'Project, "2"', 'url': 'http://myproject2.com'},
+]
+
+
+def test_encode_rows_should_write_one_json_document_per_line():
+    content = ''.join(encode_rows([ROWS[:1], ROWS[1:]], 'ndjson'))
+    assert content.splitlines() == [
+        '{"id":1,"title":"Project1","url":"http://myproject1.com"}',
+        '{"id":2,"title":"Project, \\"2\\"","url":"http://myproject2.com"}',
+    ]
+
+
+def test_encode_rows_should_write_the_csv_header_only_once():
+    chunks = list(encode_rows([ROWS[:1], ROWS[1:]], 'csv'))
+    assert chunks == [
+        'id,title,url\r\n1,Project1,http://myproject1.com\r\n',
+        '2,"Project, ""2""",http://myproject2.com\r\n',
+    ]
+
+
+def test_encode_rows_should_not_write_anything_if_there_are_no_rows():
+    assert ''.join(encode_rows([], 'csv')) == ''
+
+
+def test_encode_rows_async_should_encode_each_batch():
+    async def batches():
+        yield ROWS
+
+    async def scenario():
+        return [chunk async for chunk in encode_rows_async(batches(), 'csv')]
+
+    assert asyncio.run(scenario()) == list(encode_rows([ROWS], 'csv'))
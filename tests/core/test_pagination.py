@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.pagination import (
+    Cursor,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+)
+from app.exceptions import InvalidCursorError
+from app.models import Project
+
+
+def test_decode_cursor_should_return_the_encoded_cursor():
+    cursor = Cursor('title', 'Project1', 1)
+    assert decode_cursor(encode_cursor(cursor), 'title') == cursor
+
+
+def test_decode_cursor_should_raise_an_error_if_token_is_malformed():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('not-a-cursor', 'id')
+
+
+def test_decode_cursor_should_raise_an_error_if_ordering_does_not_match():
+    token = encode_cursor(Cursor('title', 'Project1', 1))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, 'id')
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    [
+        Cursor('title', None, 1),
+        Cursor('title', 1, 1),
+        Cursor('rank', 'high', 1),
+        Cursor('rank', True, 1),
+        Cursor('id', 1, '1'),
+    ],
+)
+def test_decode_cursor_should_raise_an_error_if_a_position_has_wrong_type(
+    cursor,
+):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(cursor), cursor.order_by)
+
+
+def test_decode_cursor_should_accept_an_integer_rank():
+    cursor = Cursor('rank', 0, 1)
+    assert decode_cursor(encode_cursor(cursor), 'rank') == cursor
+
+
+def test_next_cursor_should_point_to_the_last_item_of_a_full_page():
+    items = [Project(id=1, title='A'), Project(id=2, title='B')]
+    token = next_cursor(items, limit=2, order_by='title')
+    assert decode_cursor(token, 'title') == Cursor('title', 'B', 2)
+
+
+def test_next_cursor_should_return_none_on_the_last_page():
+    items = [Project(id=1, title='A')]
+    assert next_cursor(items, limit=2, order_by='id') is None
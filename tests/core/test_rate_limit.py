@@ -0,0 +1,108 @@
+import pytest
+
+from app.core.rate_limit import (
+    TOKEN_BUCKET_SCRIPT,
+    LoginRateLimiter,
+    RedisTokenBucketLimiter,
+    TokenBucketLimiter,
+    build_rate_limiter,
+)
+from app.exceptions import TooManyRequestsError
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_acquire_should_admit_a_burst_up_to_the_capacity():
+    limiter = TokenBucketLimiter(max_keys=10, timer=FakeTimer())
+    assert [limiter.acquire('key', 3, 1.0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire('key', 3, 1.0) == pytest.approx(1.0)
+
+
+def test_acquire_should_refill_tokens_over_time():
+    timer = FakeTimer()
+    limiter = TokenBucketLimiter(max_keys=10, timer=timer)
+    limiter.acquire('key', 1, 0.5)
+    assert limiter.acquire('key', 1, 0.5) == pytest.approx(2.0)
+    timer.now = 2.0
+    assert limiter.acquire('key', 1, 0.5) == 0
+
+
+def test_acquire_should_keep_buckets_apart():
+    limiter = TokenBucketLimiter(max_keys=10, timer=FakeTimer())
+    limiter.acquire('one', 1, 1.0)
+    assert limiter.acquire('two', 1, 1.0) == 0
+
+
+def test_acquire_should_forget_the_least_recently_used_bucket():
+    limiter = TokenBucketLimiter(max_keys=1, timer=FakeTimer())
+    limiter.acquire('one', 1, 1.0)
+    limiter.acquire('two', 1, 1.0)
+    assert limiter.acquire('one', 1, 1.0) == 0
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.limiter = TokenBucketLimiter(max_keys=10, timer=FakeTimer())
+        self.calls = []
+
+    def register_script(self, script):
+        assert script == TOKEN_BUCKET_SCRIPT
+
+        def run(keys, args):
+            self.calls.append((keys, args))
+            return str(self.limiter.acquire(keys[0], *args)).encode()
+
+        return run
+
+
+def test_redis_limiter_should_run_the_script_under_its_namespace():
+    client = FakeRedis()
+    limiter = RedisTokenBucketLimiter(None, 'login-attempts', client=client)
+    assert limiter.acquire('username:a', 1, 1.0) == 0
+    assert limiter.acquire('username:a', 1, 1.0) == pytest.approx(1.0)
+    assert client.calls[0] == (['login-attempts:username:a'], [1, 1.0])
+
+
+def test_build_rate_limiter_should_return_an_in_process_limiter_by_default():
+    limiter = build_rate_limiter('memory', 'login-attempts', max_keys=10)
+    assert isinstance(limiter, TokenBucketLimiter)
+
+
+def test_login_rate_limiter_should_limit_usernames_and_clients():
+    login_limiter = LoginRateLimiter(
+        TokenBucketLimiter(max_keys=10, timer=FakeTimer()),
+        username_limit=(1, 1.0),
+        client_limit=(2, 1.0),
+    )
+    login_limiter.check('User@mail.com', '10.0.0.1')
+    with pytest.raises(TooManyRequestsError):
+        login_limiter.check('user@mail.com ', '10.0.0.2')
+    login_limiter.check('other@mail.com', '10.0.0.1')
+    with pytest.raises(TooManyRequestsError) as exc_info:
+        login_limiter.check('another@mail.com', '10.0.0.1')
+    assert exc_info.value.retry_after == pytest.approx(1.0)
+    assert login_limiter.stats() == {
+        'backend': 'memory',
+        'enabled': True,
+        'admitted': 2,
+        'rejected': 2,
+        'rejection_ratio': 0.5,
+    }
+
+
+def test_login_rate_limiter_should_admit_everything_if_disabled():
+    login_limiter = LoginRateLimiter(
+        TokenBucketLimiter(max_keys=10, timer=FakeTimer()),
+        username_limit=(1, 1.0),
+        client_limit=(1, 1.0),
+        enabled=False,
+    )
+    for _ in range(3):
+        login_limiter.check('user@mail.com', '10.0.0.1')
+    assert login_limiter.stats()['admitted'] == 0
@@ -0,0 +1,27 @@
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.responses import get_json_response_class
+from app.main import app
+
+
+def test_get_json_response_class_should_map_backends():
+    assert get_json_response_class('json') is JSONResponse
+    assert get_json_response_class('orjson') is ORJSONResponse
+
+
+def test_get_json_response_class_should_fail_if_orjson_is_missing(mocker):
+    mocker.patch.dict('sys.modules', {'orjson': None})
+    with pytest.raises(ImportError):
+        get_json_response_class('orjson')
+
+
+def test_orjson_response_should_render_the_same_json_as_the_default():
+    content = [{'id': 1, 'title': 'Projeto', 'owner': {'is_active': True}}]
+    assert ORJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_app_should_use_the_configured_response_class(settings):
+    assert app.router.default_response_class is get_json_response_class(
+        settings.JSON_RESPONSE_BACKEND
+    )
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from app.core.config import Settings
+from app.core.security import (
+    PasswordHasher,
+    ProcessPoolPasswordHasher,
+    calibrate_rounds,
+    get_password_context_options,
+    get_password_hasher,
+)
+from app.exceptions import PasswordHashingBusyError
+
+
+@pytest.fixture(scope='module')
+def process_hasher():
+    hasher = ProcessPoolPasswordHasher(workers=1, queue_size=2)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_get_password_hasher_should_return_inline_hasher_by_default(
+    settings,
+):
+    assert type(get_password_hasher(settings)) is PasswordHasher
+
+
+def test_get_password_hasher_should_return_process_hasher_if_configured():
+    settings = Settings(
+        SECRET_KEY='secret',
+        DATABASE_URL='sqlite://',
+        DEFAULT_SUPERUSER_EMAIL='admin@mail.com',
+        PASSWORD_HASHING_BACKEND='process',
+        PASSWORD_HASHING_WORKERS=2,
+    )
+    hasher = get_password_hasher(settings)
+    assert isinstance(hasher, ProcessPoolPasswordHasher)
+    assert hasher.workers == 2
+
+
+def test_inline_hasher_should_count_its_work():
+    hasher = PasswordHasher()
+    hasher.verify('123456', hasher.hash('123456'))
+    stats = hasher.stats()
+    assert stats['submitted'] == stats['completed'] == 2
+    assert stats['queue_depth'] == 0
+
+
+def test_process_hasher_should_hash_and_verify_password(process_hasher):
+    hashed_password = process_hasher.hash('123456')
+    assert process_hasher.verify('123456', hashed_password) is True
+    assert process_hasher.verify('wrong-password', hashed_password) is False
+
+
+def test_process_hasher_should_hash_and_verify_password_asynchronously(
+    process_hasher,
+):
+    async def hash_and_verify():
+        hashed_password = await process_hasher.hash_async('123456')
+        return await process_hasher.verify_async('123456', hashed_password)
+
+    assert asyncio.run(hash_and_verify()) is True
+
+
+def test_process_hasher_should_record_queue_metrics(process_hasher):
+    process_hasher.hash('123456')
+    stats = process_hasher.stats()
+    assert stats['backend'] == 'process'
+    assert stats['completed'] >= 1
+    assert stats['queue_depth'] == 0
+    assert stats['max_queue_depth'] >= 1
+
+
+def test_process_hasher_should_hash_with_the_configured_policy():
+    options = {'schemes': ['bcrypt'], 'bcrypt__rounds': 5}
+    hasher = ProcessPoolPasswordHasher(workers=1, context_options=options)
+    try:
+        assert hasher.hash('123456').startswith('$2b$05$')
+        hasher.configure({**options, 'bcrypt__rounds': 6})
+        assert hasher.hash('123456').startswith('$2b$06$')
+    finally:
+        hasher.shutdown()
+
+
+def test_process_hasher_should_reject_work_if_queue_is_full():
+    hasher = ProcessPoolPasswordHasher(workers=1, queue_size=1)
+    hasher.queue_timeout = 0
+    hasher._slots.acquire()
+    with pytest.raises(PasswordHashingBusyError):
+        hasher.hash('123456')
+    assert hasher.rejected == 1
+
+
+def test_password_context_options_should_use_the_configured_policy(settings):
+    settings = settings.copy(
+        update={
+            'PASSWORD_HASHING_SCHEMES': ['pbkdf2_sha256', 'bcrypt'],
+            'PASSWORD_HASHING_ROUNDS': 50000,
+            'PASSWORD_HASHING_PROFILE': 'default',
+        }
+    )
+    assert get_password_context_options(settings) == {
+        'schemes': ['pbkdf2_sha256', 'bcrypt'],
+        'deprecated': ['auto'],
+        'pbkdf2_sha256__rounds': 50000,
+        'pbkdf2_sha256__min_rounds': 50000,
+    }
+
+
+def test_password_context_options_should_use_the_minimum_cost_if_unsafe(
+    settings,
+):
+    options = get_password_context_options(settings)
+    assert options['bcrypt__rounds'] == 4
+
+
+def test_password_context_options_should_keep_the_scheme_default_cost():
+    settings = Settings(
+        SECRET_KEY='secret',
+        DATABASE_URL='sqlite://',
+        DEFAULT_SUPERUSER_EMAIL='admin@mail.com',
+    )
+    assert get_password_context_options(settings) == {
+        'schemes': ['bcrypt'],
+        'deprecated': ['auto'],
+    }
+
+
+def test_calibrate_rounds_should_stop_below_the_target_latency():
+    rounds, elapsed = calibrate_rounds('bcrypt', target_seconds=0.0)
+    assert rounds == 4
+    assert elapsed > 0
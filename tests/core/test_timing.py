@@ -0,0 +1,26 @@
+from app.core.timing import (
+    ServerTiming,
+    _server_timing,
+    get_server_timing,
+    timed,
+)
+
+
+def test_timed_should_do_nothing_outside_of_a_request():
+    with timed('auth'):
+        pass
+    assert get_server_timing() is None
+
+
+def test_timed_should_accumulate_each_phase():
+    server_timing = ServerTiming()
+    token = _server_timing.set(server_timing)
+    try:
+        for _ in range(2):
+            with timed('db'):
+                pass
+    finally:
+        _server_timing.reset(token)
+    assert server_timing.counts == {'db': 2}
+    assert server_timing.fields()['db_queries'] == 2
+    assert server_timing.header().startswith('db;dur=')
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.database.config import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    get_engine_options,
+    get_pool_stats,
+    ping_idle_connections,
+)
+
+
+@pytest.fixture
+def pool_engine(db):
+    engine = create_engine(
+        db.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_get_engine_options_should_configure_pool_from_settings():
+    settings = Settings(
+        SECRET_KEY='secret',
+        DATABASE_URL='postgresql://user:pass@db/pet_projects',
+        DEFAULT_SUPERUSER_EMAIL='admin@mail.com',
+        DATABASE_POOL_SIZE=20,
+        DATABASE_POOL_PING_POLICY='idle',
+    )
+    options = get_engine_options(settings)
+    assert options['pool_size'] == 20
+    assert options['max_overflow'] == settings.DATABASE_MAX_OVERFLOW
+    assert options['pool_pre_ping'] is False
+
+
+def test_get_engine_options_should_not_size_sqlite_pools(settings):
+    options = get_engine_options(settings)
+    assert 'pool_size' not in options
+    assert options['pool_pre_ping'] is True
+
+
+def test_instrumented_pool_should_record_checkouts(pool_engine):
+    with pool_engine.connect() as connection:
+        stats = get_pool_stats(pool_engine)
+        assert stats['checked_out'] == 1
+        connection.execute(text('SELECT 1'))
+    stats = get_pool_stats(pool_engine)
+    assert stats['checked_out'] == 0
+    assert stats['checkouts'] == 1
+
+
+def test_instrumented_pool_should_record_checkout_timeouts(pool_engine):
+    with pool_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            pool_engine.connect()
+    assert get_pool_stats(pool_engine)['timeouts'] == 1
+
+
+def test_ping_idle_connections_should_replace_dead_connections(pool_engine):
+    ping_idle_connections(pool_engine, idle_seconds=0)
+    with pool_engine.connect() as connection:
+        dbapi_connection = connection.connection.connection
+    dbapi_connection.close()
+    with pool_engine.connect() as connection:
+        assert connection.execute(text('SELECT 1')).scalar() == 1
+
+
+def test_instrumented_async_pool_should_record_checkouts(db):
+    async_engine = create_async_engine(
+        db.url.set(drivername='sqlite+aiosqlite'),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    async def checkout():
+        async with async_engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+        stats = get_pool_stats(async_engine.sync_engine)
+        await async_engine.dispose()
+        return stats
+
+    stats = asyncio.run(checkout())
+    assert stats['checkouts'] == 1
+    assert stats['checked_out'] == 0
@@ -1,4 +1,13 @@
-from app.models import Project
+import asyncio
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import Cursor, decode_cursor, next_cursor
+from app.database import AsyncSessionLocal
+from app.models import Project, User
+from app.repositories import AsyncProjectRepository
+from app.repositories.project import _search_query
 
 
 def test_add_should_save_a_new_project_in_db(project_repository, user):
@@ -32,6 +41,27 @@ def test_list_should_limit_the_retrieved_projects(
     assert len(result) == 1
 
 
+def test_list_should_seek_after_the_cursor(project_repository, projects):
+    after = Cursor('id', projects[0].id, projects[0].id)
+    result = project_repository.list(skip=0, limit=10, after=after)
+    assert [project.id for project in result] == [
+        project.id for project in projects[1:]
+    ]
+
+
+def test_list_should_seek_after_the_cursor_on_a_sortable_column(
+    project_repository, projects
+):
+    after = Cursor('title', projects[0].title, projects[0].id)
+    result = project_repository.list(
+        skip=0, limit=10, order_by='title', after=after
+    )
+    assert [project.id for project in result] == [
+        projects[1].id,
+        projects[2].id,
+    ]
+
+
 def test_filter_should_retrieve_a_filtered_list_of_projects(
     project_repository, projects, users
 ):
@@ -41,10 +71,123 @@ def test_filter_should_retrieve_a_filtered_list_of_projects(
     assert len(result) == 2
 
 
+def test_stream_should_yield_projects_in_batches(project_repository, projects):
+    batches = list(project_repository.stream(batch_size=2))
+    assert [len(rows) for rows in batches] == [2, 1]
+    assert [row['id'] for rows in batches for row in rows] == [
+        project.id for project in projects
+    ]
+    assert dict(batches[0][0]) == {
+        'id': projects[0].id,
+        'title': 'Project1',
+        'description': 'My First project',
+        'url': 'http://myproject1.com',
+        'owner_id': projects[0].owner_id,
+    }
+
+
+def test_search_should_rank_title_matches_first(project_repository, user):
+    in_description = project_repository.add(
+        Project(title='Blog', description='Written with fastapi')
+    )
+    in_title = project_repository.add(
+        Project(title='Fastapi starter', description='A template')
+    )
+    project_repository.add(Project(title='Django', description='A site'))
+    result = project_repository.search('fastapi', limit=10)
+    assert result == [in_title, in_description]
+    assert result[0].rank > result[1].rank
+
+
+def test_search_should_seek_after_the_cursor(project_repository, user):
+    projects = [
+        project_repository.add(Project(title='api', description='api'))
+        for _ in range(3)
+    ]
+    first_page = project_repository.search('api', limit=2)
+    last = first_page[-1]
+    second_page = project_repository.search(
+        'api', limit=2, after=Cursor('rank', last.rank, last.id)
+    )
+    assert first_page + second_page == projects
+
+
+def test_search_should_seek_after_an_encoded_cursor(project_repository, user):
+    projects = [
+        project_repository.add(Project(title='api', description='api'))
+        for _ in range(3)
+    ]
+    first_page = project_repository.search('api', limit=2)
+    token = next_cursor(first_page, 2, 'rank')
+    second_page = project_repository.search(
+        'api', limit=2, after=decode_cursor(token, 'rank')
+    )
+    assert first_page + second_page == projects
+
+
+def test_search_should_rank_in_double_precision_on_postgresql():
+    query = _search_query('postgresql', 'api', 10, Cursor('rank', 0.1, 1))
+    compiled = str(query.compile(dialect=postgresql.dialect()))
+    assert 'CAST(ts_rank_cd(' in compiled
+    assert 'AS FLOAT)' in compiled
+
+
+def test_search_should_treat_query_syntax_as_plain_terms(
+    project_repository, projects
+):
+    assert project_repository.search('"Project1 OR', limit=10) == []
+    assert project_repository.search('   ', limit=10) == []
+
+
+def test_search_should_follow_updates_and_deletes(project_repository, project):
+    project.title = 'Renamed'
+    project_repository.update(project)
+    assert project_repository.search('renamed', limit=10) == [project]
+    project_repository.remove(project)
+    assert project_repository.search('renamed', limit=10) == []
+
+
+def test_filter_by_owner_should_use_the_owner_index(
+    project_repository, db_session, users
+):
+    query = (
+        project_repository._query()
+        .filter_by(owner_id=users[0].id)
+        .filter(Project.id > 0)
+        .order_by(Project.id)
+        .limit(10)
+    )
+    statement = query.statement.compile(
+        db_session.get_bind(), compile_kwargs={'literal_binds': True}
+    )
+    plan = db_session.execute(text(f'EXPLAIN QUERY PLAN {statement}'))
+    assert any(
+        'USING INDEX ix_projects_owner_id_id' in row.detail for row in plan
+    )
+
+
+def test_count_should_return_the_number_of_projects(
+    project_repository, projects
+):
+    assert project_repository.count() == len(projects)
+    assert project_repository.count(estimate=True) == len(projects)
+
+
 def test_get_should_retrieve_project_if_exists(project_repository, project):
     assert project_repository.get(id=project.id) == project
 
 
+def test_list_should_load_only_the_requested_fields(
+    project_repository, projects, db_session
+):
+    db_session.expire_all()
+    retrieved = project_repository.list(0, 10, fields=['title'])
+    assert [project.title for project in retrieved] == [
+        project.title for project in projects
+    ]
+    assert {'description', 'url', 'owner'} <= inspect(retrieved[0]).unloaded
+
+
 def test_get_should_return_none_if_project_does_not_exist(
     project_repository, projects
 ):
@@ -61,3 +204,35 @@ def test_update_should_update_project_in_db(project_repository, project):
 def test_remove_should_delete_project_in_db(project_repository, project):
     project_repository.remove(project)
     assert project_repository.get(id=project.id) is None
+
+
+def test_async_repository_should_manage_projects(async_db):
+    async def scenario():
+        async with AsyncSessionLocal(bind=async_db) as db:
+            user = User(email='user@mail.com')
+            db.add(user)
+            await db.commit()
+            project_repository = AsyncProjectRepository(db)
+            project = await project_repository.add(
+                Project(
+                    title='Project1',
+                    description='My project',
+                    url='myproject.com',
+                    owner_id=user.id,
+                )
+            )
+            project.title = 'My Best Project'
+            await project_repository.update(project)
+            listed = await project_repository.list(skip=0, limit=10)
+            filtered = await project_repository.filter(
+                skip=0, limit=10, owner_id=user.id
+            )
+            await project_repository.remove(project)
+            removed = await project_repository.get(id=project.id)
+            return project, listed, filtered, removed
+
+    project, listed, filtered, removed = asyncio.run(scenario())
+    assert project.owner.email == 'user@mail.com'
+    assert listed == filtered == [project]
+    assert listed[0].title == 'My Best Project'
+    assert removed is None
@@ -1,4 +1,12 @@
+import asyncio
+
+import pytest
+
+from app.core.pagination import Cursor
+from app.database import AsyncSessionLocal
+from app.exceptions import EmailAlreadyRegistredError
 from app.models import User
+from app.repositories import AsyncUserRepository
 
 
 def test_add_should_save_a_new_user_in_db(user_repository):
@@ -8,6 +16,23 @@ def test_add_should_save_a_new_user_in_db(user_repository):
     assert saved_user.id is not None
 
 
+def test_add_should_raise_an_error_if_email_already_exists(
+    user_repository, user
+):
+    with pytest.raises(EmailAlreadyRegistredError):
+        user_repository.add(User(email=user.email))
+    assert user_repository.get(email=user.email) == user
+
+
+def test_update_should_raise_an_error_if_email_already_exists(
+    user_repository, users
+):
+    users[1].email = users[0].email
+    with pytest.raises(EmailAlreadyRegistredError):
+        user_repository.update(users[1])
+    assert users[1].email == 'user2@mail.com'
+
+
 def test_list_should_retrieve_a_list_of_users(user_repository, users):
     result = user_repository.list(skip=0, limit=10)
     assert isinstance(result, list)
@@ -25,6 +50,14 @@ def test_list_should_limit_the_retrieved_users(user_repository, users):
     assert len(result) == 1
 
 
+def test_list_should_seek_after_the_cursor(user_repository, users):
+    after = Cursor('email', users[1].email, users[1].id)
+    result = user_repository.list(
+        skip=0, limit=10, order_by='email', after=after
+    )
+    assert result == [users[2]]
+
+
 def test_filter_should_retrieve_a_filtered_list_of_users(
     user_repository, users
 ):
@@ -52,3 +85,48 @@ def test_update_should_update_user_in_db(user_repository, user):
 def test_remove_should_delete_user_in_db(user_repository, user):
     user_repository.remove(user)
     assert user_repository.get(id=user.id) is None
+
+
+def test_snapshot_should_return_a_detached_copy_of_user(user_repository, user):
+    copy = user_repository.snapshot(user)
+    assert copy is not user
+    assert copy.id == user.id
+    assert copy.password == user.password
+
+
+def test_attach_should_merge_user_into_session(user_repository, user):
+    copy = user_repository.snapshot(user)
+    assert user_repository.attach(copy) is user
+
+
+def test_async_repository_should_add_and_get_user(async_db):
+    async def scenario():
+        async with AsyncSessionLocal(bind=async_db) as db:
+            user_repository = AsyncUserRepository(db)
+            saved_user = await user_repository.add(
+                User(first_name='user', email='user@mail.com')
+            )
+            return saved_user, await user_repository.get(id=saved_user.id)
+
+    saved_user, retrieved_user = asyncio.run(scenario())
+    assert saved_user.id is not None
+    assert retrieved_user is saved_user
+
+
+def test_async_repository_should_attach_snapshot_without_queries(
+    async_db, assert_num_queries
+):
+    async def scenario():
+        async with AsyncSessionLocal(bind=async_db) as db:
+            user_repository = AsyncUserRepository(db)
+            user = await user_repository.add(User(email='user@mail.com'))
+            snapshot = user_repository.snapshot(user)
+        async with AsyncSessionLocal(bind=async_db) as db:
+            user_repository = AsyncUserRepository(db)
+            with assert_num_queries(0, engine=async_db.sync_engine):
+                attached_user = await user_repository.attach(snapshot)
+            return snapshot, attached_user
+
+    snapshot, attached_user = asyncio.run(scenario())
+    assert attached_user is not snapshot
+    assert attached_user.email == snapshot.email
@@ -0,0 +1,44 @@
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app import schemas
+from app.models import Project, User
+
+
+def test_serialize_project_out_should_match_the_pydantic_output(projects):
+    expected = jsonable_encoder(
+        [schemas.ProjectOut.from_orm(project) for project in projects]
+    )
+    assert [
+        schemas.serialize_project_out(project) for project in projects
+    ] == expected
+
+
+def test_serialize_user_out_should_match_the_pydantic_output(users):
+    expected = jsonable_encoder([schemas.UserOut.from_orm(u) for u in users])
+    assert [schemas.serialize_user_out(u) for u in users] == expected
+
+
+def test_serialize_user_out_should_keep_unset_optional_values():
+    user = User(
+        id=1, email='user@mail.com', is_active=None, is_superuser=False
+    )
+    assert schemas.serialize_user_out(user) == jsonable_encoder(
+        schemas.UserOut.from_orm(user)
+    )
+
+
+def test_serialize_project_out_should_serialize_a_missing_owner_as_null():
+    project = Project(id=1, title='A', description='B', url='http://a.com')
+    assert schemas.serialize_project_out(project)['owner'] is None
+
+
+def test_compile_serializer_should_reject_collection_fields():
+    class Tagged(BaseModel):
+        tags: List[str]
+
+    with pytest.raises(TypeError):
+        schemas.compile_serializer(Tagged)
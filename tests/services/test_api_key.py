@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.exceptions import (
+    AuthenticationError,
+    InactiveUserError,
+    NotFoundError,
+)
+from app.models import ApiKey
+from app.repositories import ApiKeyRepository
+from app.schemas import ApiKeyIn
+from app.services import ApiKeyService
+
+
+@pytest.fixture
+def api_key_service(db_session) -> ApiKeyService:
+    return ApiKeyService(ApiKeyRepository(db_session))
+
+
+def test_create_should_store_only_the_prefix_and_the_key_hash(
+    api_key_service, user, db_session
+):
+    api_key, key = api_key_service.create(ApiKeyIn(name='ci'), user)
+    stored = db_session.query(ApiKey).one()
+    assert key.startswith(f'ppa_{api_key.prefix}_')
+    assert stored.user_id == user.id
+    assert len(stored.key_hash) == 64
+    assert key not in stored.key_hash
+
+
+def test_authenticate_should_return_the_owner_in_one_query(
+    api_key_service, user, db_session, assert_num_queries, mocker
+):
+    _, key = api_key_service.create(ApiKeyIn(name='ci'), user)
+    db_session.expunge_all()
+    verify = mocker.patch('app.core.security.password_hasher.verify')
+    with assert_num_queries(1):
+        owner = api_key_service.authenticate(key)
+        assert owner.email == user.email
+    assert not verify.called
+
+
+@pytest.mark.parametrize(
+    'key', ['ppa_unknown_secret', 'ppa_missing-secret', 'not-a-key']
+)
+def test_authenticate_should_reject_unknown_keys(api_key_service, key):
+    with pytest.raises(AuthenticationError, match='Invalid API key'):
+        api_key_service.authenticate(key)
+
+
+def test_authenticate_should_reject_a_wrong_secret(api_key_service, user):
+    api_key, _ = api_key_service.create(ApiKeyIn(name='ci'), user)
+    with pytest.raises(AuthenticationError, match='Invalid API key'):
+        api_key_service.authenticate(f'ppa_{api_key.prefix}_wrong')
+
+
+def test_authenticate_should_reject_revoked_keys(api_key_service, user):
+    api_key, key = api_key_service.create(ApiKeyIn(name='ci'), user)
+    api_key_service.revoke(api_key.id, user)
+    with pytest.raises(AuthenticationError, match='revoked'):
+        api_key_service.authenticate(key)
+
+
+def test_authenticate_should_reject_keys_of_inactive_users(
+    api_key_service, inactive_user
+):
+    _, key = api_key_service.create(ApiKeyIn(name='ci'), inactive_user)
+    with pytest.raises(InactiveUserError):
+        api_key_service.authenticate(key)
+
+
+def test_revoke_should_raise_not_found_for_keys_of_other_users(
+    api_key_service, users
+):
+    api_key, _ = api_key_service.create(ApiKeyIn(name='ci'), users[0])
+    with pytest.raises(NotFoundError):
+        api_key_service.revoke(api_key.id, users[1])
+
+
+def test_purge_should_delete_only_keys_revoked_before_the_cutoff(
+    api_key_service, user, db_session
+):
+    revoked, _ = api_key_service.create(ApiKeyIn(name='old'), user)
+    api_key_service.create(ApiKeyIn(name='active'), user)
+    api_key_service.revoke(revoked.id, user)
+    assert api_key_service.purge(datetime.utcnow() - timedelta(days=1)) == 0
+    assert api_key_service.purge(datetime.utcnow()) == 1
+    assert [key.name for key in db_session.query(ApiKey)] == ['active']
@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 
+from app.core.security import configure_password_context, password_hasher
 from app.exceptions import AuthenticationError, InactiveUserError
 from app.services import AuthenticationService
 
@@ -9,9 +12,13 @@ def auth_service(user_repository):
     return AuthenticationService(user_repository)
 
 
+def authenticate(auth_service, **kwargs):
+    return asyncio.run(auth_service.authenticate(**kwargs))
+
+
 def test_authenticate_should_return_the_user_authenticated(auth_service, user):
-    user_authenticated = auth_service.authenticate(
-        username=user.email, password='123456'
+    user_authenticated = authenticate(
+        auth_service, username=user.email, password='123456'
     )
     assert user_authenticated == user
 
@@ -20,20 +27,62 @@ def test_authenticate_should_raise_an_error_if_user_does_not_exist(
     auth_service,
 ):
     with pytest.raises(AuthenticationError):
-        auth_service.authenticate(username='user@mail.com', password='123456')
+        authenticate(auth_service, username='user@mail.com', password='123456')
 
 
 def test_authenticate_should_raise_an_error_if_password_is_invalid(
     auth_service, user
 ):
     with pytest.raises(AuthenticationError):
-        auth_service.authenticate(username=user.email, password='wrong-pass')
+        authenticate(auth_service, username=user.email, password='wrong-pass')
 
 
 def test_authenticate_should_raise_an_error_if_user_is_inactive(
     auth_service, inactive_user
 ):
     with pytest.raises(InactiveUserError):
-        auth_service.authenticate(
-            username=inactive_user.email, password='123456'
+        authenticate(
+            auth_service, username=inactive_user.email, password='123456'
         )
+
+
+@pytest.fixture
+def stronger_password_policy(settings):
+    configure_password_context(
+        settings.copy(
+            update={
+                'PASSWORD_HASHING_PROFILE': 'default',
+                'PASSWORD_HASHING_ROUNDS': 5,
+            }
+        )
+    )
+    yield
+    configure_password_context(settings)
+
+
+def test_authenticate_should_rehash_passwords_below_the_policy(
+    auth_service, user, stronger_password_policy
+):
+    assert user.password.startswith('$2b$04$')
+    authenticate(auth_service, username=user.email, password='123456')
+    assert user.password.startswith('$2b$05$')
+    assert user.verify_password('123456')
+    assert not user.password_needs_update()
+
+
+def test_authenticate_should_keep_passwords_that_meet_the_policy(
+    auth_service, user
+):
+    hashed_password = user.password
+    authenticate(auth_service, username=user.email, password='123456')
+    assert user.password == hashed_password
+
+
+def test_authenticate_should_not_block_on_the_sync_hasher(
+    auth_service, user, mocker
+):
+    check_password = mocker.patch('app.models.user.check_password')
+    verify_async = mocker.spy(password_hasher, 'verify_async')
+    authenticate(auth_service, username=user.email, password='123456')
+    assert verify_async.called
+    assert not check_password.called
@@ -4,6 +4,7 @@ from app.exceptions import NotFoundError
 from app.models import Project
 from app.schemas import ProjectIn
 from app.services import ProjectService
+from app.services.project import project_cache, project_list_cache
 
 
 @pytest.fixture
@@ -21,6 +22,25 @@ def test_create_project_should_return_a_project(project_service, user):
     assert isinstance(project_created, Project)
 
 
+def test_create_many_projects_should_return_the_projects_created(
+    project_service, user
+):
+    payloads = [
+        ProjectIn(
+            title=f'Project {number}',
+            description='A project',
+            url=f'http://project{number}.com',
+        )
+        for number in range(3)
+    ]
+    projects = project_service.create_many(payloads, owner_id=user.id)
+    assert [project.title for project in projects] == [
+        payload.title for payload in payloads
+    ]
+    assert all(project.id for project in projects)
+    assert all(project.owner_id == user.id for project in projects)
+
+
 def test_get_project_by_id_should_return_a_project(project_service, project):
     assert project_service.get_by_id(project.id) == project
 
@@ -60,3 +80,84 @@ def test_update_project_should_return_the_project_updated(
 def test_delete_project(project_service, project):
     project_service.delete(project)
     assert project not in project_service.list(skip=0, limit=10)
+
+
+def test_get_project_by_id_should_cache_the_project(
+    project_service, project, mocker
+):
+    project_service.get_by_id(project.id)
+    hits = project_cache.hits
+    spy = mocker.spy(project_service.repository, 'get')
+    cached_project = project_service.get_by_id(project.id)
+    assert spy.call_count == 0
+    assert project_cache.hits == hits + 1
+    assert cached_project.owner.email == project.owner.email
+
+
+def test_get_project_by_id_should_not_merge_cached_projects_into_the_session(
+    project_service, project
+):
+    project_service.get_by_id(project.id)
+    owner = project.owner
+    owner.first_name = 'Unsaved'
+    cached_project = project_service.get_by_id(project.id)
+    assert cached_project not in project_service.repository.db
+    assert cached_project.owner is not owner
+    assert owner.first_name == 'Unsaved'
+
+
+def test_get_project_by_id_should_bypass_the_cache_if_asked(
+    project_service, project_repository, project
+):
+    project_service.get_by_id(project.id)
+    # deleted by another worker, whose invalidation this one never sees
+    project_repository.remove(project)
+    with pytest.raises(NotFoundError):
+        project_service.get_by_id(project.id, cached=False)
+
+
+def test_list_projects_should_cache_the_page(
+    project_service, projects, mocker
+):
+    project_service.list(skip=0, limit=10)
+    spy = mocker.spy(project_service.repository, 'list')
+    result = project_service.list(skip=0, limit=10)
+    assert spy.call_count == 0
+    assert [p.id for p in result] == [p.id for p in projects]
+
+
+def test_create_project_should_invalidate_cached_pages(
+    project_service, projects, user
+):
+    project_service.list(skip=0, limit=10)
+    payload = ProjectIn(
+        title='New Project',
+        description='A new project',
+        url='http://newproject.com',
+    )
+    project_service.create(payload, owner_id=user.id)
+    assert len(project_list_cache) == 0
+    assert len(project_service.list(skip=0, limit=10)) == 4
+
+
+def test_update_project_should_invalidate_the_cached_project(
+    project_service, project
+):
+    project_service.get_by_id(project.id)
+    payload = ProjectIn(
+        title='Updated Project',
+        description='An updated project',
+        url='http://updatedproject.com',
+    )
+    project_service.update(project, payload)
+    assert project_cache.get(str(project.id)) is None
+    assert project_service.get_by_id(project.id).title == 'Updated Project'
+
+
+def test_delete_project_should_invalidate_the_cached_project(
+    project_service, project
+):
+    project_service.get_by_id(project.id)
+    project_service.delete(project)
+    with pytest.raises(NotFoundError):
+        project_service.get_by_id(project.id)
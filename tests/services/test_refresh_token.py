@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.exceptions import AuthenticationError, InactiveUserError
+from app.models import RefreshToken
+from app.repositories import RefreshTokenRepository
+from app.schemas import UserUpdate
+from app.services import RefreshTokenService
+
+
+@pytest.fixture
+def refresh_token_service(db_session, settings) -> RefreshTokenService:
+    return RefreshTokenService(RefreshTokenRepository(db_session), settings)
+
+
+def test_issue_should_store_only_the_token_hash(
+    refresh_token_service, user, db_session
+):
+    token = refresh_token_service.issue(user)
+    stored = db_session.query(RefreshToken).one()
+    assert stored.user_id == user.id
+    assert len(stored.token_hash) == 64
+    assert token not in stored.token_hash
+
+
+def test_rotate_should_exchange_the_token_for_a_new_one(
+    refresh_token_service, user
+):
+    token = refresh_token_service.issue(user)
+    owner, new_token = refresh_token_service.rotate(token)
+    assert owner.id == user.id
+    assert new_token != token
+    assert refresh_token_service.rotate(new_token)[0].id == user.id
+
+
+def test_rotate_should_revoke_the_whole_chain_if_a_token_is_reused(
+    refresh_token_service, user
+):
+    token = refresh_token_service.issue(user)
+    _, new_token = refresh_token_service.rotate(token)
+    with pytest.raises(AuthenticationError, match='revoked'):
+        refresh_token_service.rotate(token)
+    with pytest.raises(AuthenticationError, match='revoked'):
+        refresh_token_service.rotate(new_token)
+
+
+def test_rotate_should_reject_unknown_tokens(refresh_token_service, user):
+    with pytest.raises(AuthenticationError, match='Invalid refresh token'):
+        refresh_token_service.rotate('unknown')
+
+
+def test_rotate_should_reject_expired_tokens(
+    refresh_token_service, user, mocker
+):
+    mocker.patch.object(
+        refresh_token_service.settings, 'REFRESH_TOKEN_EXPIRATION_DAYS', 0
+    )
+    token = refresh_token_service.issue(user)
+    with pytest.raises(AuthenticationError, match='expired'):
+        refresh_token_service.rotate(token)
+
+
+def test_rotate_should_reject_tokens_issued_before_a_password_change(
+    refresh_token_service, user, user_service
+):
+    token = refresh_token_service.issue(user)
+    user_service.update(user, UserUpdate(password='654321'))
+    with pytest.raises(AuthenticationError, match='revoked'):
+        refresh_token_service.rotate(token)
+
+
+def test_rotate_should_reject_inactive_users(
+    refresh_token_service, inactive_user
+):
+    token = refresh_token_service.issue(inactive_user)
+    with pytest.raises(InactiveUserError):
+        refresh_token_service.rotate(token)
+
+
+def test_rotate_should_not_touch_the_password_hasher(
+    refresh_token_service, user, mocker
+):
+    token = refresh_token_service.issue(user)
+    verify = mocker.patch('app.core.security.password_hasher.verify')
+    refresh_token_service.rotate(token)
+    assert not verify.called
+
+
+def test_purge_should_delete_expired_and_long_revoked_tokens(
+    refresh_token_service, user, db_session
+):
+    now = datetime.utcnow()
+    rotated = refresh_token_service.issue(user)
+    _, kept = refresh_token_service.rotate(rotated)
+    expired = RefreshToken(
+        token_hash='0' * 64,
+        user_id=user.id,
+        token_version=user.token_version,
+        expires_at=now - timedelta(seconds=1),
+    )
+    db_session.add(expired)
+    db_session.commit()
+    assert refresh_token_service.purge(now - timedelta(days=1)) == 1
+    assert refresh_token_service.purge(now + timedelta(seconds=1)) == 1
+    assert db_session.query(RefreshToken).count() == 1
+    assert refresh_token_service.rotate(kept)[0].id == user.id
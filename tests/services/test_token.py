@@ -1,7 +1,9 @@
 import pytest
+from jose import jwt
 
 from app.exceptions import AuthenticationError
 from app.services import TokenService
+from app.services.token import Principal, token_cache
 
 
 @pytest.fixture
@@ -54,3 +56,57 @@ def test_invalid_token(user, token_service):
     invalid_token = f'{token}-invalid-part'
     with pytest.raises(AuthenticationError, match='Invalid token'):
         token_service.decode_access_token(invalid_token)
+
+
+def test_decode_should_skip_verification_of_cached_tokens(
+    user, token_service, mocker
+):
+    token = token_service.generate_access_token({'sub': user.email})
+    spy = mocker.spy(jwt, 'decode')
+    hits = token_cache.hits
+    token_service.decode_access_token(token)
+    decoded_token = token_service.decode_access_token(token)
+    assert decoded_token['sub'] == user.email
+    assert spy.call_count == 1
+    assert token_cache.hits == hits + 1
+
+
+def test_decode_should_not_cache_tokens_past_their_expiration(
+    user, token_service, mocker
+):
+    mocker.patch.object(
+        token_service.settings, 'ACCESS_TOKEN_EXPIRATION_MINUTES', 1
+    )
+    token = token_service.generate_access_token({'sub': user.email})
+    spy = mocker.spy(token_cache, 'set')
+    token_service.decode_access_token(token)
+    assert 0 < spy.call_args.kwargs['ttl'] <= 60
+
+
+def test_decode_should_reverify_tokens_after_the_secret_key_rotates(
+    user, token_service, mocker
+):
+    token = token_service.generate_access_token({'sub': user.email})
+    token_service.decode_access_token(token)
+    mocker.patch.object(token_service.settings, 'SECRET_KEY', 'rotated')
+    with pytest.raises(AuthenticationError, match='Invalid token'):
+        token_service.decode_access_token(token)
+    assert len(token_cache) == 0
+
+
+def test_user_claims_should_embed_the_principal_in_stateless_mode(
+    user, token_service, mocker
+):
+    assert token_service.user_claims(user) == {'sub': user.email}
+    mocker.patch.object(token_service.settings, 'STATELESS_AUTH_ENABLED', True)
+    token = token_service.generate_access_token(
+        token_service.user_claims(user)
+    )
+    principal = Principal.from_claims(token_service.decode_access_token(token))
+    assert principal == Principal(
+        id=user.id,
+        email=user.email,
+        is_active=True,
+        is_superuser=False,
+        token_version=0,
+    )
@@ -1,8 +1,19 @@
 import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 
-from app.exceptions import EmailAlreadyRegistredError, NotFoundError
-from app.models import User
-from app.schemas import UserBase
+from app.exceptions import (
+    AuthenticationError,
+    EmailAlreadyRegistredError,
+    NotFoundError,
+)
+from app.models import ApiKey, RefreshToken, User
+from app.repositories import ApiKeyRepository, RefreshTokenRepository
+from app.schemas import ApiKeyIn, UserBase, UserCreate, UserUpdate
+from app.services import ApiKeyService, ProjectService, RefreshTokenService
+from app.services.project import project_cache, project_owner_cache
+from app.services.token import Principal
+from app.services.user import principal_cache, user_count_cache
 
 
 def test_create_user_should_return_an_user(user_service):
@@ -11,8 +22,24 @@ def test_create_user_should_return_an_user(user_service):
     assert isinstance(user_created, User)
 
 
-def test_email_exists(user_service, user):
-    assert user_service._email_exists(user.email) is True
+def test_create_user_should_store_a_password_hashed_by_the_caller(
+    user_service, mocker
+):
+    hash_password = mocker.patch('app.models.user.hash_password')
+    payload = UserCreate(email='user@mail.com', password='123456')
+    user_created = user_service.create(payload, hashed_password='hashed')
+    assert user_created.password == 'hashed'
+    assert not hash_password.called
+
+
+def test_update_user_should_store_a_password_hashed_by_the_caller(
+    user_service, user
+):
+    token_version = user.token_version
+    payload = UserUpdate(password='new-password')
+    user_service.update(user, payload, hashed_password='hashed')
+    assert user.password == 'hashed'
+    assert user.token_version == token_version + 1
 
 
 def test_create_user_should_raise_an_error_if_email_already_exists(
@@ -23,6 +50,12 @@ def test_create_user_should_raise_an_error_if_email_already_exists(
         user_service.create(payload)
 
 
+def test_update_should_not_hide_other_integrity_errors(user_service, user):
+    user.token_version = None
+    with pytest.raises(IntegrityError):
+        user_service.update(user, UserUpdate())
+
+
 def test_get_user_by_id_should_return_user(user_service, user):
     assert user_service.get_by_id(user.id) == user
 
@@ -87,3 +120,199 @@ def test_delete_user(user_service, user):
 def test_delete_user_by_id(user_service, user):
     user_service.delete_by_id(user.id)
     assert user not in user_service.list(skip=0, limit=10)
+
+
+def test_get_principal_should_cache_the_user(user_service, user, mocker):
+    user_service.get_principal(user.email)
+    spy = mocker.spy(user_service.repository, 'get')
+    principal = user_service.get_principal(user.email)
+    assert principal.id == user.id
+    assert spy.call_count == 0
+    assert principal_cache.get(user.email).id == user.id
+
+
+def test_get_principal_should_raise_an_error_if_user_does_not_exist(
+    user_service,
+):
+    with pytest.raises(NotFoundError):
+        user_service.get_principal('does_not_exists@mail.com')
+
+
+def test_update_user_should_invalidate_cached_principal(user_service, user):
+    user_service.get_principal(user.email)
+    payload = UserBase(first_name='Other')
+    user_service.update(user, payload)
+    assert principal_cache.get(user.email) is None
+
+
+def test_update_user_should_refresh_the_owner_of_cached_projects(
+    user_service, project_repository, project
+):
+    project_service = ProjectService(project_repository)
+    project_service.get_by_id(project.id)
+    payload = UserBase(first_name='Other')
+    user_service.update(project.owner, payload)
+    assert project_cache.get(str(project.id)) is not None
+    assert project_owner_cache.get(str(project.owner_id)) is None
+    assert project_service.get_by_id(project.id).owner.first_name == 'Other'
+
+
+def test_change_password_should_invalidate_the_cached_project_owner(
+    user_service, project_repository, project
+):
+    ProjectService(project_repository).get_by_id(project.id)
+    user_service.change_password(
+        username=project.owner.email, new_password='new-password'
+    )
+    assert project_owner_cache.get(str(project.owner_id)) is None
+
+
+def test_delete_user_should_invalidate_only_their_cached_projects(
+    user_service, project_repository, projects
+):
+    project_service = ProjectService(project_repository)
+    for project in projects:
+        project_service.get_by_id(project.id)
+    deleted, *kept = projects
+    user_service.delete(deleted.owner)
+    assert project_cache.get(str(deleted.id)) is None
+    assert all(project_cache.get(str(project.id)) for project in kept)
+
+
+def test_change_password_should_invalidate_cached_principal(
+    user_service, user
+):
+    user_service.get_principal(user.email)
+    user_service.change_password(
+        username=user.email, new_password='new-password'
+    )
+    assert principal_cache.get(user.email) is None
+
+
+def test_delete_user_should_invalidate_cached_principal(user_service, user):
+    email = user.email
+    user_service.get_principal(email)
+    user_service.delete_by_id(user.id)
+    assert principal_cache.get(email) is None
+
+
+def test_delete_user_should_leave_their_tokens_to_the_database(
+    user_service, user, db_session, settings, assert_num_queries
+):
+    refresh_token_repository = RefreshTokenRepository(db_session)
+    RefreshTokenService(refresh_token_repository, settings).issue(user)
+    ApiKeyService(ApiKeyRepository(db_session)).create(
+        ApiKeyIn(name='ci'), user
+    )
+    assert user.projects == []
+    # only the user row: the foreign keys cascade to the tokens
+    with assert_num_queries(1):
+        user_service.delete(user)
+    assert db_session.query(RefreshToken).count() == 0
+    assert db_session.query(ApiKey).count() == 0
+
+
+def test_count_users_should_cache_the_total(user_service, users, mocker):
+    user_service.count()
+    spy = mocker.spy(user_service.repository, 'count')
+    assert user_service.count() == len(users)
+    assert spy.call_count == 0
+
+
+def test_create_user_should_invalidate_the_cached_total(user_service, users):
+    user_service.count()
+    user_service.create(UserBase(email='new@mail.com'))
+    assert user_count_cache.get('count') is None
+    assert user_service.count() == len(users) + 1
+
+
+def _principal(user: User, token_version: int = 0) -> Principal:
+    return Principal(
+        id=user.id,
+        email=user.email,
+        is_active=True,
+        is_superuser=False,
+        token_version=token_version,
+    )
+
+
+def test_check_token_principal_should_cache_the_token_version(
+    user_service, user, assert_num_queries
+):
+    principal = _principal(user)
+    user_service.check_token_principal(principal)
+    with assert_num_queries(0):
+        assert user_service.check_token_principal(principal) == principal
+
+
+def test_update_user_should_revoke_tokens_if_credentials_change(
+    user_service, user
+):
+    principal = _principal(user)
+    user_service.check_token_principal(principal)
+    user_service.update(user, UserUpdate(password='654321'))
+    with pytest.raises(AuthenticationError, match='revoked'):
+        user_service.check_token_principal(principal)
+
+
+def test_update_user_should_bump_the_stored_token_version(
+    user_service, user, db_session
+):
+    # another worker bumped the version behind this stale instance
+    db_session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=5)
+        .execution_options(synchronize_session=False)
+    )
+    user_service.update(user, UserUpdate(password='654321'))
+    assert user.token_version == 6
+    with pytest.raises(AuthenticationError, match='revoked'):
+        user_service.check_token_principal(_principal(user, 5))
+
+
+def test_update_user_should_keep_tokens_if_only_the_profile_changes(
+    user_service, user
+):
+    user_service.update(user, UserUpdate(first_name='New', is_active=True))
+    assert user.token_version == 0
+
+
+@pytest.mark.parametrize(
+    'payload, revoked',
+    [
+        (UserUpdate(password='654321'), True),
+        (UserUpdate(first_name='New'), False),
+    ],
+)
+def test_update_user_should_revoke_api_keys_with_the_tokens(
+    user_service, user, db_session, payload, revoked
+):
+    api_key_service = ApiKeyService(ApiKeyRepository(db_session))
+    _, key = api_key_service.create(ApiKeyIn(name='ci'), user)
+    user_service.update(user, payload)
+    db_session.expire_all()
+    if revoked:
+        with pytest.raises(AuthenticationError, match='revoked'):
+            api_key_service.authenticate(key)
+    else:
+        assert api_key_service.authenticate(key) == user
+
+
+def test_change_password_should_revoke_api_keys(
+    user_service, user, db_session
+):
+    api_key_service = ApiKeyService(ApiKeyRepository(db_session))
+    _, key = api_key_service.create(ApiKeyIn(name='ci'), user)
+    user_service.change_password(user.email, '654321')
+    db_session.expire_all()
+    with pytest.raises(AuthenticationError, match='revoked'):
+        api_key_service.authenticate(key)
+
+
+def test_delete_user_should_revoke_tokens(user_service, user):
+    principal = _principal(user)
+    user_service.check_token_principal(principal)
+    user_service.delete(user)
+    with pytest.raises(AuthenticationError, match='revoked'):
+        user_service.check_token_principal(principal)